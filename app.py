@@ -68,6 +68,9 @@ except ImportError:
 
 # Ініціалізація SQLAlchemy та Flask-Login - імпортуємо з extensions для уникнення дублювання
 from extensions import db, login_manager, migrate, csrf, limiter
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 
 
 def create_app():
@@ -185,12 +188,30 @@ def create_app():
     
     # Для PostgreSQL - налаштування пулу з'єднань та схеми
     engine_options = {
-        "pool_recycle": 300,
+        "pool_recycle": 1800,
         "pool_pre_ping": True,
     }
     # Додаємо search_path для PostgreSQL
     if "postgresql" in database_url:
         engine_options["connect_args"] = {"options": f"-csearch_path={db_schema}"}
+        if os.environ.get("DB_NULL_POOL", "false").lower() == "true":
+            # Serverless / fork після створення engine: без пулу, кожен
+            # запит відкриває і закриває своє з'єднання - жодних "чужих"
+            # сокетів, успадкованих від батьківського процесу.
+            from sqlalchemy.pool import NullPool
+            engine_options["poolclass"] = NullPool
+        else:
+            # Окрім потоку запиту, з'єднання беруть фонові потоки (листи,
+            # перевірки CRM, генерація блогу, паралельні AI-запити) - пул
+            # за замовчуванням (5 + 10) на них замалий. Ліміт Postgres
+            # max_connections має бути не менше
+            # (DB_POOL_SIZE + DB_MAX_OVERFLOW) * кількість gunicorn-воркерів.
+            engine_options.update(
+                pool_size=int(os.environ.get("DB_POOL_SIZE", 10)),
+                max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", 20)),
+                # Краще швидка помилка, ніж запит, що 30 с чекає на з'єднання
+                pool_timeout=int(os.environ.get("DB_POOL_TIMEOUT", 5)),
+            )
     app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options
 
     # Stripe налаштування
@@ -294,7 +315,7 @@ def create_app():
     # ----- МОДЕЛІ (імпорт з models/) -----
     from models.settings import SiteSettings, ContactMessage
     from models.product import Product, Category
-    from models.order import Order, OrderItem
+    from models.order import Order, OrderItem, ORDER_STATUS_DISPLAY
     from models.user import User, UserRole
     from models.company import Company, CompanyStatus
     from models.warehouse import (
@@ -583,6 +604,8 @@ def create_app():
                     ('reliability_level', "VARCHAR(20) DEFAULT 'critical'"),
                     ('last_verification_at', 'TIMESTAMP'),
                     ('last_verification_data', 'JSON'),
+                    ('last_vat_name', 'TEXT'),
+                    ('last_whois_owner', 'TEXT'),
                     ('is_whois_verified', 'BOOLEAN DEFAULT FALSE'),
                     ('is_hr_verified', 'BOOLEAN DEFAULT FALSE'),
                     ('created_at', 'TIMESTAMP DEFAULT NOW()'),
@@ -789,6 +812,8 @@ def create_app():
                     ('blog_post_id', 'INTEGER'),
                     ('additional_instructions', 'TEXT'),
                     ('target_audience', 'VARCHAR(255)'),
+                    ('generation_started_at', 'TIMESTAMP'),
+                    ('batch_id', 'VARCHAR(64)'),
                     ('created_at', 'TIMESTAMP DEFAULT NOW()'),
                 ]
                 
@@ -1045,22 +1070,19 @@ def create_app():
                 db.session.rollback()
                 print(f"⚠️ Multi-tenancy bootstrap: схема ще не мігрована ({e}), пропускаю (застосується після flask db upgrade)")
             
-            # Автопублікація scheduled постів блогу
+            # Автопублікація scheduled постів блогу - той самий
+            # _publish_due_posts, що й у планувальника: цей код виконується в
+            # кожному gunicorn-воркері, а SKIP LOCKED дає кожен пост рівно
+            # одному з них.
             try:
-                from models.blog import BlogPost, BlogPostStatus
-                scheduled_posts = BlogPost.query.filter(
-                    BlogPost.status == BlogPostStatus.SCHEDULED,
-                    BlogPost.publish_date <= datetime.utcnow()
-                ).all()
-                
-                if scheduled_posts:
-                    for post in scheduled_posts:
-                        post.status = BlogPostStatus.PUBLISHED
-                        print(f"📰 Автопублікація: {post.title}")
-                    db.session.commit()
-                    print(f"✅ Опубліковано {len(scheduled_posts)} заплановані статті")
+                from routes.blog import _publish_due_posts
+                published_titles = _publish_due_posts()
+                db.session.commit()
+                if published_titles:
+                    app.logger.info(f"📰 Auto-published {len(published_titles)} scheduled blog post(s) at startup")
             except Exception as e:
-                print(f"⚠️ Помилка автопублікації: {e}")
+                db.session.rollback()
+                app.logger.warning(f"Blog auto-publish at startup failed: {e}")
 
     # DEMO MODE: Авторизація вимкнена для демонстрації
     # is_admin_logged_in/admin_required винесені в services/admin_auth.py,
@@ -1075,6 +1097,7 @@ def create_app():
     from routes.signup import signup_bp
     from routes.platform_admin import platform_admin_bp
     from routes.blog import blog_bp, start_blog_scheduler
+    from services.cache_invalidation import start_cache_listener
     from routes.crm import crm_bp
     from routes.warehouse import warehouse_bp
     from routes.accounting import accounting_bp
@@ -1900,14 +1923,12 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
                     
                     # Створюємо завдання для складу
                     try:
-                        from models.warehouse import WarehouseTask
-                        existing_task = WarehouseTask.query.filter_by(order_id=order.id).first()
-                        if not existing_task:
-                            task = WarehouseTask.create_from_order(
-                                order_id=order.id,
-                                priority=2 if getattr(order, 'is_b2b', False) else 3,
-                                notes=getattr(order, 'notes', ''),
-                            )
+                        task = WarehouseTask.create_from_order(
+                            order_id=order.id,
+                            priority=2 if getattr(order, 'is_b2b', False) else 3,
+                            notes=getattr(order, 'notes', ''),
+                        )
+                        if task:
                             metadata = checkout_session.metadata or {}
                             _auto_create_shipment(
                                 order, task,
@@ -1993,14 +2014,12 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
 
                     # Створюємо завдання для складу
                     try:
-                        from models.warehouse import WarehouseTask
-                        existing_task = WarehouseTask.query.filter_by(order_id=order.id).first()
-                        if not existing_task:
-                            task = WarehouseTask.create_from_order(
-                                order_id=order.id,
-                                priority=2 if getattr(order, 'is_b2b', False) else 3,
-                                notes=getattr(order, 'notes', ''),
-                            )
+                        task = WarehouseTask.create_from_order(
+                            order_id=order.id,
+                            priority=2 if getattr(order, 'is_b2b', False) else 3,
+                            notes=getattr(order, 'notes', ''),
+                        )
+                        if task:
                             webhook_metadata = session_data.get("metadata") or {}
                             _auto_create_shipment(
                                 order, task,
@@ -2026,6 +2045,13 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
 
         return jsonify({"status": "success"}), 200
 
+    @app.template_filter("order_status")
+    def order_status_filter(status):
+        """{{ order.status | order_status }} - людська назва статусу мовою
+        сторінки. Мапінг - спільний ORDER_STATUS_DISPLAY (models/order.py),
+        його значення вже lazy_gettext - вдруге в _() не загортаємо."""
+        return ORDER_STATUS_DISPLAY.get(status, status)
+
     @app.context_processor
     def cart_context():
         """Додає cart_count у всі шаблони."""
@@ -2201,7 +2227,8 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
             if user and user.check_password(password):
                 if not user.is_active:
                     flash(_("Ваш акаунт деактивовано. Зверніться до підтримки."), "danger")
-                    return render_template("auth/login.html")
+                    settings = SiteSettings.get_or_create(g.store.id)
+                    return render_template("auth/login.html", settings=settings)
 
                 if user.totp_enabled:
                     # Пароль правильний, але потрібен ще другий фактор - НЕ
@@ -2293,6 +2320,29 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
         flash(_("Ви успішно вийшли з системи."), "info")
         return redirect(url_for("user_login"))
 
+    def _registration_errors(email, password, password_confirm, min_password_length, form_errors=()):
+        """Помилки форми реєстрації. Спершу всі локальні перевірки (разом,
+        щоб користувач виправив усе за раз); запит до БД про зайнятий email
+        робимо лише коли форма сама по собі валідна."""
+        errors = []
+        if not email:
+            errors.append(_("Email обов'язковий"))
+        if not password:
+            errors.append(_("Пароль обов'язковий"))
+        elif len(password) < min_password_length:
+            # Окремі msgid під кожну довжину - під них уже є переклади
+            if min_password_length >= 8:
+                errors.append(_("Пароль має бути не менше 8 символів"))
+            else:
+                errors.append(_("Пароль має бути не менше 6 символів"))
+        elif password != password_confirm:
+            errors.append(_("Паролі не співпадають"))
+        errors.extend(form_errors)
+
+        if not errors and User.email_exists(email):
+            errors.append(_("Користувач з таким email вже існує"))
+        return errors
+
     @app.route("/register", methods=["GET", "POST"])
     @limiter.limit("10 per minute;30 per hour")
     def user_register():
@@ -2308,52 +2358,48 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
             last_name = request.form.get("last_name", "").strip()
             phone = request.form.get("phone", "").strip()
             
-            errors = []
-            
-            if not email:
-                errors.append(_("Email обов'язковий"))
-            elif User.get_by_email(email):
-                errors.append(_("Користувач з таким email вже існує"))
-            
-            if not password:
-                errors.append(_("Пароль обов'язковий"))
-            elif len(password) < 6:
-                errors.append(_("Пароль має бути не менше 6 символів"))
-            elif password != password_confirm:
-                errors.append(_("Паролі не співпадають"))
-            
+            errors = _registration_errors(email, password, password_confirm, min_password_length=6)
+            user = None
+
             if errors:
                 for error in errors:
                     flash(error, "danger")
-                settings = SiteSettings.get_or_create(g.store.id)
-                return render_template("auth/register.html", settings=settings)
-            
-            user = User.create_user(
-                email=email,
-                password=password,
-                role=UserRole.CUSTOMER,
-                first_name=first_name or None,
-                last_name=last_name or None,
-                phone=phone or None,
-                store_id=g.store.id,
-            )
-            
-            # Відправити welcome email
-            try:
-                from services.email_service import send_registration_email
-                user_name = f"{first_name} {last_name}".strip() or "Клієнт"
-                send_registration_email(email, user_name, locale=str(get_locale()))
-                app.logger.info(f'Registration email sent to {email}')
-            except Exception as e:
-                app.logger.error(f'Failed to send registration email: {str(e)}')
+            else:
+                try:
+                    user = User.create_user(
+                        email=email,
+                        password=password,
+                        role=UserRole.CUSTOMER,
+                        first_name=first_name or None,
+                        last_name=last_name or None,
+                        phone=phone or None,
+                        store_id=g.store.id,
+                    )
+                except IntegrityError:
+                    # Паралельна реєстрація з тим самим email проскочила перевірку
+                    # вище - UNIQUE(users.email) у БД все одно не пропустить дубль.
+                    db.session.rollback()
+                    flash(_("Користувач з таким email вже існує"), "danger")
 
-            _send_verification_email_for(user, locale=str(get_locale()))
+            if user:
+                # Відправити welcome email
+                try:
+                    from services.email_service import send_registration_email
+                    user_name = f"{first_name} {last_name}".strip() or "Клієнт"
+                    send_registration_email(email, user_name, locale=str(get_locale()))
+                    app.logger.info(f'Registration email sent to {email}')
+                except Exception as e:
+                    app.logger.error(f'Failed to send registration email: {str(e)}')
 
-            from flask_login import login_user as flask_login_user
-            flask_login_user(user)
-            flash(_("Реєстрація успішна! Ласкаво просимо!"), "success")
-            return redirect(url_for("user_cabinet"))
-        
+                _send_verification_email_for(user, locale=str(get_locale()))
+
+                from flask_login import login_user as flask_login_user
+                flask_login_user(user)
+                flash(_("Реєстрація успішна! Ласкаво просимо!"), "success")
+                return redirect(url_for("user_cabinet"))
+
+        # GET і всі невдалі POST (помилки вже у flash) рендерять форму тут -
+        # налаштування магазину читаються один раз і лише коли справді потрібні.
         settings = SiteSettings.get_or_create(g.store.id)
         return render_template("auth/register.html", settings=settings)
 
@@ -2387,105 +2433,92 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
             website = request.form.get("website", "").strip()
             
             # Валідація
-            errors = []
-            
-            if not email:
-                errors.append(_("Email обов'язковий"))
-            elif User.get_by_email(email):
-                errors.append(_("Користувач з таким email вже існує"))
-            
-            if not password:
-                errors.append(_("Пароль обов'язковий"))
-            elif len(password) < 8:
-                errors.append(_("Пароль має бути не менше 8 символів"))
-            elif password != password_confirm:
-                errors.append(_("Паролі не співпадають"))
-            
+            form_errors = []
             if not company_name:
-                errors.append(_("Назва компанії обов'язкова"))
-            
+                form_errors.append(_("Назва компанії обов'язкова"))
             if not first_name or not last_name:
-                errors.append(_("Ім'я та прізвище контактної особи обов'язкові"))
+                form_errors.append(_("Ім'я та прізвище контактної особи обов'язкові"))
+
+            errors = _registration_errors(
+                email, password, password_confirm, min_password_length=8, form_errors=form_errors
+            )
             
             if errors:
                 for error in errors:
                     flash(error, "danger")
                 return render_template("auth/register_b2b.html", settings=settings)
             
-            # Перевірка VAT (опціонально)
-            vat_verified = False
-            vat_data = None
-            if vat_number:
-                try:
-                    from services.vat_checker import VATChecker
-                    checker = VATChecker()
-                    vat_result = checker.check_vat(vat_number)
-                    vat_verified = vat_result.get("valid", False)
-                    vat_data = vat_result
-                    if vat_verified:
-                        flash(_("✅ VAT номер підтверджено!"), "success")
-                    else:
-                        flash(_("⚠️ VAT не підтверджено: %(error)s") % {"error": vat_result.get('error', '')}, "warning")
-                except Exception as e:
-                    flash(_("⚠️ Помилка перевірки VAT: %(error)s") % {"error": str(e)}, "warning")
-            
-            # Створення компанії
-            company = Company(
-                store_id=g.store.id,
-                name=company_name,
-                vat_number=vat_number or None,
-                vat_country=country[:2].upper() if country else None,
-                vat_verified=vat_verified,
-                vat_verified_at=datetime.utcnow() if vat_verified else None,
-                vat_data=vat_data,
-                address=address or None,
-                city=city or None,
-                country=country or None,
-                website=website or None,
-                contact_person=f"{first_name} {last_name}",
-                contact_email=email,
-                contact_phone=phone or None,
-                status=CompanyStatus.VERIFIED.value if (getattr(settings, 'b2b_auto_approve', False) and vat_verified) else CompanyStatus.PENDING.value,
-            )
-            db.session.add(company)
-            db.session.flush()
-            
-            # Створення користувача
-            user = User(
-                email=email,
-                role=UserRole.PARTNER.value,
-                first_name=first_name,
-                last_name=last_name,
-                phone=phone or None,
-                company_id=company.id,
-                store_id=g.store.id,
-            )
-            user.set_password(password)
-            db.session.add(user)
-            db.session.commit()
+            # Компанія створюється одразу в статусі PENDING; VAT (опціонально)
+            # перевіряється у фоні (services/b2b_verification.py) - запит не
+            # чекає на VIES. Автосхвалення (b2b_auto_approve) і лист про
+            # нього теж робить фонова перевірка.
+            from services.passwords import hash_password
+
+            # Два рядки (компанія + користувач) - двома Core INSERT ... RETURNING
+            # в одній транзакції, без ORM unit-of-work і проміжного flush.
+            # Колонкові default-и (created_at тощо) Core застосовує так само.
+            company_id = db.session.execute(
+                db.insert(Company).values(
+                    store_id=g.store.id,
+                    name=company_name,
+                    vat_number=vat_number or None,
+                    vat_country=country[:2].upper() if country else None,
+                    vat_verified=False,
+                    address=address or None,
+                    city=city or None,
+                    country=country or None,
+                    website=website or None,
+                    # Core INSERT оминає @validates("website") - домен явно
+                    domain=Company.domain_from_website(website),
+                    contact_person=f"{first_name} {last_name}",
+                    contact_email=email,
+                    contact_phone=phone or None,
+                    status=CompanyStatus.PENDING.value,
+                ).returning(Company.id)
+            ).scalar_one()
 
-            # Відправити email залежно від статусу
             try:
-                from services.email_service import send_b2b_verification_pending, send_b2b_verification_approved
-                reg_locale = str(get_locale())
-                if company.is_verified:
-                    send_b2b_verification_approved(email, company_name, company.discount_percent or 0, locale=reg_locale)
-                    app.logger.info(f'B2B approval email sent to {email}')
-                else:
-                    send_b2b_verification_pending(email, company_name, locale=reg_locale)
-                    app.logger.info(f'B2B pending email sent to {email}')
+                user_id = db.session.execute(
+                    db.insert(User).values(
+                        email=email,
+                        password_hash=hash_password(password),
+                        role=UserRole.PARTNER.value,
+                        first_name=first_name,
+                        last_name=last_name,
+                        phone=phone or None,
+                        company_id=company_id,
+                        store_id=g.store.id,
+                    ).returning(User.id)
+                ).scalar_one()
+                db.session.commit()
+            except IntegrityError:
+                # Див. user_register: гонка двох реєстрацій з одним email.
+                db.session.rollback()
+                flash(_("Користувач з таким email вже існує"), "danger")
+                return render_template("auth/register_b2b.html", settings=settings)
+
+            # ORM-об'єкт потрібен лише для листа верифікації і login_user
+            user = db.session.get(User, user_id)
+
+            reg_locale = str(get_locale())
+            try:
+                from services.email_service import send_b2b_verification_pending
+                send_b2b_verification_pending(email, company_name, locale=reg_locale)
+                app.logger.info(f'B2B pending email sent to {email}')
             except Exception as e:
                 app.logger.error(f'Failed to send B2B email: {str(e)}')
 
+            if vat_number:
+                from services.b2b_verification import start_company_vat_verification
+                start_company_vat_verification(company_id, locale=reg_locale)
+                flash(_("⏳ VAT номер перевіряється - результат з'явиться в кабінеті за кілька хвилин."), "info")
+
             _send_verification_email_for(user, reg_locale)
 
             from flask_login import login_user as flask_login_user
             flask_login_user(user)
             
-            if company.is_verified:
-                flash(_("✅ Реєстрація успішна! Ваша компанія верифікована."), "success")
-            else:
-                flash(_("📋 Реєстрація успішна! Ваша заявка на розгляді."), "info")
+            flash(_("📋 Реєстрація успішна! Ваша заявка на розгляді."), "info")
             
             return redirect(url_for("b2b_dashboard"))
         
@@ -2503,9 +2536,10 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
             return jsonify({"error": _("VAT номер обов'язковий")}), 400
         
         try:
-            from services.vat_checker import VATChecker
-            checker = VATChecker()
-            result = checker.check_vat(vat_number)
+            # check_full_vat сам визначає країну з префікса номера;
+            # повторні перевірки того ж номера віддаються з кешу VIES.
+            from services.vat_checker import check_vat_number
+            result = check_vat_number(vat_number)
             return jsonify(result)
         except Exception as e:
             return jsonify({"error": str(e), "valid": False}), 500
@@ -2525,17 +2559,7 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
         total_orders = Order.query.filter_by(customer_email=current_user.email, store_id=g.store.id).count()
         recent_orders = Order.query.filter_by(customer_email=current_user.email, store_id=g.store.id)\
             .order_by(Order.created_at.desc()).limit(5).all()
-        
-        for order in recent_orders:
-            order.status_display = {
-                "created": "Створено",
-                "pending": "Очікує оплати",
-                "paid": "Оплачено",
-                "shipped": "Відправлено",
-                "delivered": "Доставлено",
-                "cancelled": "Скасовано",
-            }.get(order.status, order.status)
-        
+
         return render_template(
             "cabinet/b2c/dashboard.html",
             settings=settings,
@@ -2556,26 +2580,18 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
         company = current_user.company
         
         # Статистика (в межах поточного магазину)
-        total_orders = Order.query.filter_by(customer_email=current_user.email, store_id=g.store.id).count()
-        pending_orders = Order.query.filter_by(customer_email=current_user.email, status="pending", store_id=g.store.id).count()
-        total_spent = db.session.query(db.func.coalesce(db.func.sum(Order.amount), 0.0))\
-            .filter_by(customer_email=current_user.email, status="paid", store_id=g.store.id).scalar()
+        # Три агрегати одним проходом (COUNT/SUM ... FILTER) замість трьох запитів.
+        total_orders, pending_orders, total_spent = db.session.query(
+            db.func.count(Order.id),
+            db.func.count(Order.id).filter(Order.status == "pending"),
+            db.func.coalesce(db.func.sum(Order.amount).filter(Order.status == "paid"), 0.0),
+        ).filter(Order.customer_email == current_user.email, Order.store_id == g.store.id).one()
 
         discount = company.discount_percent if company else 0
 
         recent_orders = Order.query.filter_by(customer_email=current_user.email, store_id=g.store.id)\
             .order_by(Order.created_at.desc()).limit(5).all()
-        
-        for order in recent_orders:
-            order.status_display = {
-                "created": "Створено",
-                "pending": "Очікує оплати",
-                "paid": "Оплачено",
-                "shipped": "Відправлено",
-                "delivered": "Доставлено",
-                "cancelled": "Скасовано",
-            }.get(order.status, order.status)
-        
+
         return render_template(
             "cabinet/b2b/dashboard.html",
             settings=settings,
@@ -2597,24 +2613,54 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
             return redirect(url_for("user_cabinet"))
         
         settings = SiteSettings.get_or_create(g.store.id)
-        
-        orders = Order.query.filter_by(customer_email=current_user.email, store_id=g.store.id)\
-            .order_by(Order.created_at.desc()).all()
-        
-        for order in orders:
-            order.status_display = {
-                "created": "Створено",
-                "pending": "Очікує оплати",
-                "paid": "Оплачено",
-                "shipped": "Відправлено",
-                "delivered": "Доставлено",
-                "cancelled": "Скасовано",
-            }.get(order.status, order.status)
-        
+
+        # Keyset-пагінація замість .all(): у активного оптовика за роки
+        # набираються тисячі замовлень, а OFFSET на глибоких сторінках все
+        # одно перебирає всі попередні рядки. Курсор "<created_at>,<id>" -
+        # останнє замовлення попередньої сторінки; id розриває нічию при
+        # однаковому created_at. Беремо на один рядок більше, щоб знати,
+        # чи є наступна сторінка, без окремого COUNT.
+        page_size = 50
+        query = Order.query.options(selectinload(Order.items))\
+            .filter_by(customer_email=current_user.email, store_id=g.store.id)
+
+        cursor = request.args.get("cursor", "")
+        if cursor:
+            try:
+                cursor_ts, cursor_id = cursor.rsplit(",", 1)
+                query = query.filter(
+                    tuple_(Order.created_at, Order.id) < (datetime.fromisoformat(cursor_ts), int(cursor_id))
+                )
+            except ValueError:
+                # Зіпсований курсор - просто показуємо першу сторінку
+                cursor = ""
+
+        orders = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(page_size + 1).all()
+        next_cursor = None
+        if len(orders) > page_size:
+            orders = orders[:page_size]
+            last = orders[-1]
+            next_cursor = f"{last.created_at.isoformat()},{last.id}"
+
+        # Підсумки над карткою - по всій історії партнера, одним агрегатом
+        # у БД (шаблон більше не рахує їх по списку, який тепер лише сторінка).
+        total_orders, in_progress_orders, total_amount = db.session.query(
+            db.func.count(Order.id),
+            db.func.count(Order.id).filter(Order.status.in_(["pending", "processing"])),
+            db.func.coalesce(db.func.sum(Order.amount), 0.0),
+        ).filter(Order.customer_email == current_user.email, Order.store_id == g.store.id).one()
+
         return render_template(
             "cabinet/b2b/orders.html",
             settings=settings,
             orders=orders,
+            next_cursor=next_cursor,
+            is_first_page=not cursor,
+            order_totals={
+                "count": total_orders,
+                "in_progress": in_progress_orders,
+                "amount": total_amount,
+            },
         )
 
     @app.route("/cabinet/b2b/company", methods=["GET", "POST"])
@@ -2650,6 +2696,7 @@ SmartShop AI is a monthly subscription (from €19/month) aimed at small and med
     # Ініціалізація БД при старті
     init_db()
     start_blog_scheduler(app, DEMO_MODE)
+    start_cache_listener(app)
     return app
 
 
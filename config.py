@@ -22,7 +22,10 @@ class Config:
         SQLALCHEMY_DATABASE_URI = DATABASE_URL
         SQLALCHEMY_ENGINE_OPTIONS = {
             "pool_pre_ping": True,
-            "pool_recycle": 300,
+            "pool_recycle": 1800,
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_timeout": 5,
             "connect_args": {"options": f"-c search_path={DB_SCHEMA}"}
         }
     else:
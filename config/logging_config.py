@@ -6,15 +6,42 @@
 - Ротація файлів логів
 - Різні рівні логування для dev/prod
 - Інтеграція з Sentry для error tracking
+- Запис логів у фоновому потоці (QueueHandler/QueueListener): запит лише
+  кладе запис у чергу, а не чекає на stdout і файли
 """
 
+import atexit
+import copy
 import os
+import queue
 import sys
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pythonjsonlogger import jsonlogger
 
 
+# Одна черга і один QueueListener на процес: повторний setup_logging
+# (кілька create_app у тестах чи скриптах) лише під'єднує логер нового
+# app до вже запущеного слухача, а не плодить потоки і файлові дескриптори.
+_log_queue = queue.Queue(-1)
+_listener = None
+
+
+class _StructuredQueueHandler(QueueHandler):
+    """QueueHandler, що не форматує запис перед чергою.
+
+    Стандартний prepare() склеює повідомлення з трасою і обнуляє exc_info -
+    JSON formatter у потоці слухача тоді втрачав структуроване поле
+    exc_info. Черга в межах процесу (без pickle), тож запис можна
+    передати як є: підставляємо лише args у повідомлення."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 def setup_logging(app):
     """
     Налаштовує систему логування для Flask додатку.
@@ -22,14 +49,38 @@ def setup_logging(app):
     Args:
         app: Flask application instance
     """
-    # Створюємо директорію для логів якщо не існує
-    log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    
     # Визначаємо рівень логування
     log_level = os.environ.get('LOG_LEVEL', 'INFO').upper()
     app.logger.setLevel(getattr(logging, log_level))
-    
+
+    global _listener
+    if _listener is None:
+        _listener = QueueListener(_log_queue, *_build_handlers(app), respect_handler_level=True)
+        _listener.start()
+        # Дописати чергу при зупинці процесу
+        atexit.register(_listener.stop)
+
+    # Обробники (stdout, файли з ротацією) пишуть у потоці QueueListener -
+    # запит чи фоновий потік генерації лише кладе запис у чергу і не
+    # блокується на записі у stdout/файл, за який конкурують потоки воркера.
+    if not any(isinstance(handler, _StructuredQueueHandler) for handler in app.logger.handlers):
+        app.logger.addHandler(_StructuredQueueHandler(_log_queue))
+
+    app.logger.info('Logging configured successfully', extra={
+        'environment': app.config.get('ENV'),
+        'log_level': log_level
+    })
+
+
+def _build_handlers(app):
+    """Обробники, у які пише QueueListener: JSON-файли в production,
+    stdout і dev.log у розробці."""
+    # Створюємо директорію для логів якщо не існує
+    log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+
+    handlers = []
+
     # Structured JSON logging для production
     if app.config.get('ENV') == 'production':
         # JSON formatter
@@ -47,7 +98,7 @@ def setup_logging(app):
         )
         file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(json_formatter)
-        app.logger.addHandler(file_handler)
+        handlers.append(file_handler)
         
         # Error file handler (окремий файл для помилок)
         error_handler = RotatingFileHandler(
@@ -58,7 +109,7 @@ def setup_logging(app):
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(json_formatter)
-        app.logger.addHandler(error_handler)
+        handlers.append(error_handler)
         
     else:
         # Readable format для development
@@ -71,7 +122,7 @@ def setup_logging(app):
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.DEBUG)
         console_handler.setFormatter(formatter)
-        app.logger.addHandler(console_handler)
+        handlers.append(console_handler)
         
         # File handler для dev
         file_handler = RotatingFileHandler(
@@ -82,12 +133,9 @@ def setup_logging(app):
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        app.logger.addHandler(file_handler)
-    
-    app.logger.info('Logging configured successfully', extra={
-        'environment': app.config.get('ENV'),
-        'log_level': log_level
-    })
+        handlers.append(file_handler)
+
+    return handlers
 
 
 def setup_sentry(app):
@@ -0,0 +1,23 @@
+"""
+Налаштування gunicorn (підхоплюються автоматично з робочої директорії -
+і в Docker, і з Procfile).
+
+Воркери - gthread: кожен процес обслуговує кілька запитів потоками. З
+sync-воркерами запит, що чекає на OpenAI (чат, генерація/переклад статті
+в редакторі), займав увесь процес, і вже три такі запити зупиняли сайт.
+Потік на очікуванні мережі відпускає GIL, тож решта потоків воркера
+обслуговують інші запити. Повний перехід на ASGI (Quart/uvicorn) не
+потрібен: код синхронний, довгі операції блогу і так ідуть у фонових
+потоках.
+
+Пул з'єднань з БД (DB_POOL_SIZE) має бути не меншим за кількість потоків.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 3))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+# gthread тримає keep-alive з'єднання клієнтів у своєму циклі подій
+keepalive = 5
@@ -0,0 +1,34 @@
+"""Add range indexes for shipped-today and contacts-today counters
+
+Revision ID: 0b7e5a9c3d61
+Revises: f4c8d1b6a203
+Create Date: 2026-10-16 16:00:00.000000
+
+Лічильники "сьогодні" тепер фільтрують півінтервалом по самій колонці
+(shipped_at / created_at), а не date(...) = сьогодні - під це btree-індекси.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0b7e5a9c3d61"
+down_revision = "f4c8d1b6a203"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_warehouse_tasks_store_shipped_at "
+        "ON warehouse_tasks (store_id, shipped_at) WHERE shipped_at IS NOT NULL"
+    ))
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_contact_messages_store_created "
+        "ON contact_messages (store_id, created_at)"
+    ))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_contact_messages_store_created"))
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_warehouse_tasks_store_shipped_at"))
@@ -0,0 +1,39 @@
+"""Add companies.last_vat_name / last_whois_owner
+
+Revision ID: 1c9e4f7a2b80
+Revises: 0b7e5a9c3d61
+Create Date: 2026-10-16 17:00:00.000000
+
+Для порівняння з наступною перевіркою partner_verifier потрібні лише назва
+компанії у VIES і власник домену з WHOIS - тепер вони в окремих колонках, а
+не лише всередині last_verification_data. Тут - колонки і заповнення з
+уже збережених результатів.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "1c9e4f7a2b80"
+down_revision = "0b7e5a9c3d61"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("ALTER TABLE companies ADD COLUMN IF NOT EXISTS last_vat_name TEXT"))
+    conn.execute(sa.text("ALTER TABLE companies ADD COLUMN IF NOT EXISTS last_whois_owner TEXT"))
+    conn.execute(sa.text("""
+        UPDATE companies
+        SET last_vat_name = last_verification_data -> 'vat_result' ->> 'name',
+            last_whois_owner = COALESCE(
+                NULLIF(last_verification_data -> 'whois_result' ->> 'registrant_org', ''),
+                NULLIF(last_verification_data -> 'whois_result' ->> 'registrant_name', '')
+            )
+        WHERE last_verification_data IS NOT NULL
+    """))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("ALTER TABLE companies DROP COLUMN IF EXISTS last_whois_owner"))
+    conn.execute(sa.text("ALTER TABLE companies DROP COLUMN IF EXISTS last_vat_name"))
@@ -0,0 +1,30 @@
+"""Add (product_id, created_at, id) index for stock movement history
+
+Revision ID: 2d5b8e0f3a17
+Revises: 1c9e4f7a2b80
+Create Date: 2026-10-16 18:00:00.000000
+
+Історія руху товару тепер гортається курсором (created_at, id) від нових
+до старих - під це індекс у тому ж порядку, щоб кожна сторінка була
+коротким проходом по індексу, а не сортуванням усього журналу товару.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "2d5b8e0f3a17"
+down_revision = "1c9e4f7a2b80"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_stock_movements_product_created "
+        "ON stock_movements (product_id, created_at DESC, id DESC)"
+    ))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_stock_movements_product_created"))
@@ -0,0 +1,29 @@
+"""Add (store_id, created_at, id) index for the admin blog list
+
+Revision ID: 3f7a1c6d9e24
+Revises: 2d5b8e0f3a17
+Create Date: 2026-10-16 19:00:00.000000
+
+Список статей в адмінці гортається курсором (created_at, id) від нових до
+старих - індекс у тому ж порядку в межах магазину.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "3f7a1c6d9e24"
+down_revision = "2d5b8e0f3a17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_blog_posts_store_created "
+        "ON blog_posts (store_id, created_at DESC, id DESC)"
+    ))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_blog_posts_store_created"))
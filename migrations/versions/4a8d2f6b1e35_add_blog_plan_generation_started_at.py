@@ -0,0 +1,29 @@
+"""Add blog_plans.generation_started_at
+
+Revision ID: 4a8d2f6b1e35
+Revises: 3f7a1c6d9e24
+Create Date: 2026-10-16 20:00:00.000000
+
+Генерація статті з плану тепер іде у фоновому потоці: план атомарно
+переводиться в processing, а час старту дозволяє знову взяти план, чий
+потік загинув разом з воркером.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "4a8d2f6b1e35"
+down_revision = "3f7a1c6d9e24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "ALTER TABLE blog_plans ADD COLUMN IF NOT EXISTS generation_started_at TIMESTAMP"
+    ))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("ALTER TABLE blog_plans DROP COLUMN IF EXISTS generation_started_at"))
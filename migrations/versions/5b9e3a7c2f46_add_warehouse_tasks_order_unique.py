@@ -0,0 +1,53 @@
+"""Add unique constraint on warehouse_tasks.order_id
+
+Revision ID: 5b9e3a7c2f46
+Revises: 4a8d2f6b1e35
+Create Date: 2026-10-16 21:00:00.000000
+
+WarehouseTask.create_from_order робить INSERT ... ON CONFLICT (order_id)
+DO NOTHING - для цього потрібне унікальне обмеження. Дублікати, що могли
+з'явитися через гонку checkout_success / Stripe webhook, прибираємо,
+залишаючи найперше завдання замовлення; витрати складу, прив'язані до
+дубліката, переносимо на нього.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "5b9e3a7c2f46"
+down_revision = "4a8d2f6b1e35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        UPDATE warehouse_expenses e
+        SET warehouse_task_id = first_task.id
+        FROM warehouse_tasks wt
+        JOIN LATERAL (
+            SELECT MIN(id) AS id FROM warehouse_tasks WHERE order_id = wt.order_id
+        ) first_task ON TRUE
+        WHERE e.warehouse_task_id = wt.id AND wt.id <> first_task.id
+    """))
+    conn.execute(sa.text("""
+        DELETE FROM warehouse_tasks wt
+        USING warehouse_tasks earlier
+        WHERE wt.order_id = earlier.order_id AND wt.id > earlier.id
+    """))
+    conn.execute(sa.text("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = 'uq_warehouse_tasks_order_id'
+                AND conrelid = 'warehouse_tasks'::regclass
+            ) THEN
+                ALTER TABLE warehouse_tasks ADD CONSTRAINT uq_warehouse_tasks_order_id UNIQUE (order_id);
+            END IF;
+        END $$;
+    """))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("ALTER TABLE warehouse_tasks DROP CONSTRAINT IF EXISTS uq_warehouse_tasks_order_id"))
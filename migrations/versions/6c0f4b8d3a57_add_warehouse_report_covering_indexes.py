@@ -0,0 +1,39 @@
+"""Add covering indexes for the warehouse report aggregates
+
+Revision ID: 6c0f4b8d3a57
+Revises: 5b9e3a7c2f46
+Create Date: 2026-10-16 22:00:00.000000
+
+Звіт складу рахує поповнення (COUNT/SUM ... FILTER по created_at і
+received_at) та суми витрат за категоріями з дати. INCLUDE-колонки
+покривають ці запити повністю - index-only scan замість читання таблиць.
+Будуються CONCURRENTLY, як індекси CRM у c6f0a2d89b15, щоб не блокувати
+запис на проді.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "6c0f4b8d3a57"
+down_revision = "5b9e3a7c2f46"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        conn.execute(sa.text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_replenishment_orders_store_created "
+            "ON replenishment_orders (store_id, created_at) INCLUDE (received_at, total)"
+        ))
+        conn.execute(sa.text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_warehouse_expenses_store_date "
+            "ON warehouse_expenses (store_id, expense_date) INCLUDE (category, amount)"
+        ))
+
+
+def downgrade():
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        conn.execute(sa.text("DROP INDEX CONCURRENTLY IF EXISTS ix_warehouse_expenses_store_date"))
+        conn.execute(sa.text("DROP INDEX CONCURRENTLY IF EXISTS ix_replenishment_orders_store_created"))
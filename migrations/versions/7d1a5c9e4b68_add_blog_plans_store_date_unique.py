@@ -0,0 +1,60 @@
+"""Add unique (store_id, plan_date) on blog_plans
+
+Revision ID: 7d1a5c9e4b68
+Revises: 6c0f4b8d3a57
+Create Date: 2026-10-16 23:00:00.000000
+
+BlogPlan.create_weekly_plan робить INSERT ... ON CONFLICT (store_id,
+plan_date): повторне збереження тижня оновлює теми замість дублікатів.
+Наявні дублікати (сторінка плану й так показувала лише один план на день)
+прибираємо, залишаючи той, що вже має статтю / пішов у генерацію, інакше
+найновіший. Статті, що посилаються на видалений дублікат
+(blog_posts.blog_plan_id без ON DELETE), переносимо на план, що лишається.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "7d1a5c9e4b68"
+down_revision = "6c0f4b8d3a57"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        CREATE TEMPORARY TABLE blog_plan_survivors AS
+        SELECT id, FIRST_VALUE(id) OVER (
+            PARTITION BY store_id, plan_date
+            ORDER BY (blog_post_id IS NULL), (status = 'pending'), id DESC
+        ) AS survivor_id
+        FROM blog_plans
+        WHERE store_id IS NOT NULL
+    """))
+    conn.execute(sa.text("""
+        UPDATE blog_posts bp
+        SET blog_plan_id = s.survivor_id
+        FROM blog_plan_survivors s
+        WHERE bp.blog_plan_id = s.id AND s.id <> s.survivor_id
+    """))
+    conn.execute(sa.text("""
+        DELETE FROM blog_plans
+        WHERE id IN (SELECT id FROM blog_plan_survivors WHERE id <> survivor_id)
+    """))
+    conn.execute(sa.text("DROP TABLE blog_plan_survivors"))
+    conn.execute(sa.text("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = 'uq_blog_plans_store_date'
+                AND conrelid = 'blog_plans'::regclass
+            ) THEN
+                ALTER TABLE blog_plans ADD CONSTRAINT uq_blog_plans_store_date UNIQUE (store_id, plan_date);
+            END IF;
+        END $$;
+    """))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("ALTER TABLE blog_plans DROP CONSTRAINT IF EXISTS uq_blog_plans_store_date"))
@@ -0,0 +1,28 @@
+"""Add blog_plans.batch_id
+
+Revision ID: 8e2b6d0f5c79
+Revises: 7d1a5c9e4b68
+Create Date: 2026-10-17 09:00:00.000000
+
+"Згенерувати всі pending" пакетом через OpenAI Batch API: план у
+processing пам'ятає id пакета, поки його результати не забрано.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "8e2b6d0f5c79"
+down_revision = "7d1a5c9e4b68"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("ALTER TABLE blog_plans ADD COLUMN IF NOT EXISTS batch_id VARCHAR(64)"))
+    conn.execute(sa.text("CREATE INDEX IF NOT EXISTS ix_blog_plans_batch_id ON blog_plans (batch_id)"))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_blog_plans_batch_id"))
+    conn.execute(sa.text("ALTER TABLE blog_plans DROP COLUMN IF EXISTS batch_id"))
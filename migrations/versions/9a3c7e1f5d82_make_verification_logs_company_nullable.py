@@ -0,0 +1,28 @@
+"""Make verification_logs.company_id nullable
+
+Revision ID: 9a3c7e1f5d82
+Revises: 8e2b6d0f5c79
+Create Date: 2026-10-17 10:00:00.000000
+
+Щоденна перевірка CRM пише лог помилки і для компанії, яку видалили між
+запуском і перевіркою: без цього рядка адмінка не дорахується компаній
+і опитує прогрес без кінця. Такий лог не має компанії - company_id NULL.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "9a3c7e1f5d82"
+down_revision = "8e2b6d0f5c79"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("ALTER TABLE verification_logs ALTER COLUMN company_id DROP NOT NULL"))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("DELETE FROM verification_logs WHERE company_id IS NULL"))
+    conn.execute(sa.text("ALTER TABLE verification_logs ALTER COLUMN company_id SET NOT NULL"))
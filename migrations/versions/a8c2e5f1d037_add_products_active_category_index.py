@@ -0,0 +1,30 @@
+"""Add partial index on products(store_id, category_id) WHERE is_active
+
+Revision ID: a8c2e5f1d037
+Revises: f209a3c8e412
+Create Date: 2026-10-16 10:00:00.000000
+
+images.filename індексу не потребує - колонка вже UNIQUE (Postgres сам
+створює для неї унікальний індекс images_filename_key), тож serve_image
+і так шукає за індексом; робити filename первинним ключем немає сенсу.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "a8c2e5f1d037"
+down_revision = "f209a3c8e412"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_products_store_active_category "
+        "ON products (store_id, category_id) WHERE is_active"
+    ))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_products_store_active_category"))
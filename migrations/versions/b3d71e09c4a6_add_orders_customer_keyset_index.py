@@ -0,0 +1,30 @@
+"""Add orders(store_id, customer_email, created_at DESC, id DESC) index
+
+Revision ID: b3d71e09c4a6
+Revises: a8c2e5f1d037
+Create Date: 2026-10-16 11:00:00.000000
+
+Під keyset-пагінацію b2b_orders: фільтр за магазином і email клієнта,
+порядок і порівняння курсора за (created_at, id) - усе читається з
+індексу без сортування.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "b3d71e09c4a6"
+down_revision = "a8c2e5f1d037"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_orders_store_customer_created "
+        "ON orders (store_id, customer_email, created_at DESC, id DESC)"
+    ))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_orders_store_customer_created"))
@@ -0,0 +1,45 @@
+"""Add CRM search (pg_trgm) and listing indexes on companies
+
+Revision ID: c6f0a2d89b15
+Revises: b3d71e09c4a6
+Create Date: 2026-10-16 12:00:00.000000
+
+Пошук у CRM фільтрує ILIKE '%...%' по name/vat_number/domain - звичайний
+btree тут не допомагає, лише триграмний GIN. Індекси будуються
+CONCURRENTLY (поза транзакцією міграції), щоб не блокувати запис у
+companies на проді. Індекс orders(store_id, customer_email, created_at, id)
+для кабінету партнера вже додано в b3d71e09c4a6.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "c6f0a2d89b15"
+down_revision = "b3d71e09c4a6"
+branch_labels = None
+depends_on = None
+
+TRGM_COLUMNS = ("name", "vat_number", "domain")
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    with op.get_context().autocommit_block():
+        for column in TRGM_COLUMNS:
+            conn.execute(sa.text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_companies_{column}_trgm "
+                f"ON companies USING gin ({column} gin_trgm_ops)"
+            ))
+        conn.execute(sa.text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_companies_store_status_created "
+            "ON companies (store_id, status, created_at DESC)"
+        ))
+
+
+def downgrade():
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        conn.execute(sa.text("DROP INDEX CONCURRENTLY IF EXISTS ix_companies_store_status_created"))
+        for column in TRGM_COLUMNS:
+            conn.execute(sa.text(f"DROP INDEX CONCURRENTLY IF EXISTS ix_companies_{column}_trgm"))
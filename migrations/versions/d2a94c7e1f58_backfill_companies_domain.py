@@ -0,0 +1,35 @@
+"""Backfill companies.domain from website
+
+Revision ID: d2a94c7e1f58
+Revises: c6f0a2d89b15
+Create Date: 2026-10-16 13:00:00.000000
+
+Колонка domain існувала, але ніде не заповнювалась - верифікація щоразу
+парсила website. Тепер Company тримає domain у синхроні з website при
+записі; тут - разове заповнення для вже існуючих компаній тим самим
+правилом (без схеми, www, порту і шляху, нижній регістр).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "d2a94c7e1f58"
+down_revision = "c6f0a2d89b15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text(r"""
+        UPDATE companies
+        SET domain = NULLIF(
+            regexp_replace(lower(trim(website)), '^([a-z][a-z0-9+.-]*://)?(www\.)?([^/:?#]*).*$', '\3'),
+            ''
+        )
+        WHERE domain IS NULL AND website IS NOT NULL AND trim(website) <> ''
+    """))
+
+
+def downgrade():
+    # Дані, не схема - нічого відкочувати
+    pass
@@ -0,0 +1,34 @@
+"""Add admin_alerts listing and counter indexes
+
+Revision ID: e81b3f6a2c94
+Revises: d2a94c7e1f58
+Create Date: 2026-10-16 14:00:00.000000
+
+admin_crm_alerts сортує алерти магазину від нових і рахує невирішені по
+severity - раніше на admin_alerts був лише індекс по store_id.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "e81b3f6a2c94"
+down_revision = "d2a94c7e1f58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_admin_alerts_store_created "
+        "ON admin_alerts (store_id, created_at DESC)"
+    ))
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_admin_alerts_store_resolved_severity "
+        "ON admin_alerts (store_id, is_resolved, severity)"
+    ))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_admin_alerts_store_resolved_severity"))
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_admin_alerts_store_created"))
@@ -0,0 +1,31 @@
+"""Add partial index for the active warehouse task queue
+
+Revision ID: f4c8d1b6a203
+Revises: e81b3f6a2c94
+Create Date: 2026-10-16 15:00:00.000000
+
+admin_warehouse за замовчуванням показує лише активні завдання магазину,
+відсортовані за (priority, created_at DESC) - частковий індекс рівно під
+цей порядок, без відправлених/доставлених завдань, що накопичуються.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "f4c8d1b6a203"
+down_revision = "e81b3f6a2c94"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_warehouse_tasks_store_active_queue "
+        "ON warehouse_tasks (store_id, priority, created_at DESC) "
+        "WHERE status IN ('pending', 'processing', 'packed', 'ready')"
+    ))
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_warehouse_tasks_store_active_queue"))
@@ -2,8 +2,37 @@
 Моделі для блогу та плану публікацій
 """
 from datetime import datetime, date, timedelta
+from functools import lru_cache
 from extensions import db
+from services.blog_views import record_view
+from services.cache_invalidation import notify_cache_dirty, register_cache
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import re
+import time
+import uuid
+
+# Налаштування ШІ читає кожне повідомлення чату і кожна генерація статті, а
+# змінюються вони лише з форми admin_ai_settings - кешуємо в процесі на
+# коротке вікно (як лічильники в routes/warehouse.py). Збереження форми
+# скидає кеш усіх gunicorn-воркерів через notify_cache_dirty. Redis тут не
+# потрібен: він є лише з REDIS_URL (VAT, покоління SiteSettings), а кеш
+# процесу з TTL працює в кожному розгортанні.
+AI_SETTINGS_CACHE_TTL_SECONDS = 30
+
+# Транслітерація українських (і російських) літер для slug - одна таблиця
+# str.translate замість 33 проходів str.replace по заголовку
+_SLUG_TRANSLIT = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'h', 'ґ': 'g', 'д': 'd', 'е': 'e',
+    'є': 'ye', 'ж': 'zh', 'з': 'z', 'и': 'y', 'і': 'i', 'ї': 'yi', 'й': 'y',
+    'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r',
+    'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch',
+    'ш': 'sh', 'щ': 'shch', 'ь': '', 'ю': 'yu', 'я': 'ya', 'ы': 'y', 'э': 'e',
+    'ё': 'yo', 'ъ': ''
+})
+_SLUG_INVALID_RE = re.compile(r'[^a-z0-9\-]')
+_SLUG_DASHES_RE = re.compile(r'-+')
 
 
 class BlogPostStatus:
@@ -18,6 +47,8 @@ class BlogPost(db.Model):
     __tablename__ = "blog_posts"
     __table_args__ = (
         db.UniqueConstraint('store_id', 'slug', name='uq_blog_posts_store_slug'),
+        # Список статей в адмінці - keyset-пагінація від нових до старих
+        db.Index('ix_blog_posts_store_created', 'store_id', db.text('created_at DESC'), db.text('id DESC')),
         {'extend_existing': True},
     )
 
@@ -86,37 +117,33 @@ class BlogPost(db.Model):
         return [t.strip() for t in self.tags.split(',') if t.strip()]
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def generate_slug(title):
-        """Генерує slug з заголовка."""
-        # Транслітерація українських символів
-        translit_map = {
-            'а': 'a', 'б': 'b', 'в': 'v', 'г': 'h', 'ґ': 'g', 'д': 'd', 'е': 'e',
-            'є': 'ye', 'ж': 'zh', 'з': 'z', 'и': 'y', 'і': 'i', 'ї': 'yi', 'й': 'y',
-            'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r',
-            'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch',
-            'ш': 'sh', 'щ': 'shch', 'ь': '', 'ю': 'yu', 'я': 'ya', 'ы': 'y', 'э': 'e',
-            'ё': 'yo', 'ъ': ''
-        }
-        
-        slug = title.lower()
-        for ukr, lat in translit_map.items():
-            slug = slug.replace(ukr, lat)
-        
+        """Генерує slug з заголовка (чиста функція - кешується для тем,
+        що повторюються в планах)."""
+        slug = title.lower().translate(_SLUG_TRANSLIT)
+
         # Залишаємо тільки букви, цифри, дефіси
-        slug = re.sub(r'[^a-z0-9\-]', '-', slug)
-        slug = re.sub(r'-+', '-', slug)  # Прибираємо повтори дефісів
+        slug = _SLUG_INVALID_RE.sub('-', slug)
+        slug = _SLUG_DASHES_RE.sub('-', slug)  # Прибираємо повтори дефісів
         slug = slug.strip('-')
         
         return slug[:200] if slug else 'post'
     
     def increment_views(self):
-        """Збільшує кількість переглядів."""
-        self.views += 1
-        db.session.commit()
+        """Збільшує кількість переглядів.
+
+        Без запису в БД: перегляд іде в буфер процесу (services/blog_views),
+        який скидається раз на пів хвилини. На сторінці одразу показуємо
+        +1 - set_committed_value, щоб об'єкт не став "брудним" і autoflush
+        не відправив UPDATE."""
+        record_view(self.id)
+        set_committed_value(self, "views", (self.views or 0) + 1)
     
     @classmethod
-    def get_published(cls, store_id=None, limit=None):
-        """Отримати опубліковані пости (в межах магазину, якщо store_id заданий)."""
+    def published_query(cls, store_id=None):
+        """Запит опублікованих постів (умова is_published у SQL) - в межах
+        магазину, якщо store_id заданий."""
         query = cls.query.filter(
             cls.status == BlogPostStatus.PUBLISHED,
             db.or_(
@@ -126,12 +153,36 @@ class BlogPost(db.Model):
         )
         if store_id is not None:
             query = query.filter(cls.store_id == store_id)
-        query = query.order_by(cls.publish_date.desc(), cls.created_at.desc())
+        return query
+
+    @classmethod
+    def get_published(cls, store_id=None, limit=None):
+        """Отримати опубліковані пости (в межах магазину, якщо store_id заданий)."""
+        query = cls.published_query(store_id).order_by(cls.publish_date.desc(), cls.created_at.desc())
 
         if limit:
             return query.limit(limit).all()
         return query.all()
 
+    @classmethod
+    def insert_with_unique_slug(cls, **values):
+        """Створює статтю одним INSERT ... ON CONFLICT (store_id, slug) DO
+        NOTHING RETURNING замість SELECT-перевірки slug + INSERT: на один
+        запит менше і без гонки двох одночасних збережень з тим самим slug.
+        Якщо slug у магазині вже зайнятий - ще одна спроба з випадковим
+        суфіксом. Повертає ORM-об'єкт у сесії (не закомічений)."""
+        slug = values.pop("slug")
+        for candidate in (slug, f"{slug}-{uuid.uuid4().hex[:6]}"):
+            post = db.session.scalars(
+                pg_insert(cls)
+                .values(slug=candidate, **values)
+                .on_conflict_do_nothing(constraint="uq_blog_posts_store_slug")
+                .returning(cls)
+            ).first()
+            if post is not None:
+                return post
+        raise ValueError(f"Slug '{slug}' вже зайнятий")
+
     @classmethod
     def get_by_slug(cls, slug, store_id=None):
         """Знайти пост за slug (в межах магазину, якщо store_id заданий)."""
@@ -168,7 +219,11 @@ class BlogPost(db.Model):
 class BlogPlan(db.Model):
     """План публікацій на 7 днів."""
     __tablename__ = "blog_plans"
-    __table_args__ = {'extend_existing': True}
+    # Один план на день магазину - create_weekly_plan робить upsert по ньому
+    __table_args__ = (
+        db.UniqueConstraint('store_id', 'plan_date', name='uq_blog_plans_store_date'),
+        {'extend_existing': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), nullable=True, index=True)
@@ -181,7 +236,13 @@ class BlogPlan(db.Model):
     keywords = db.Column(db.String(255), nullable=True)  # SEO ключові слова
     
     # Статус
-    status = db.Column(db.String(20), default="pending")  # pending, generated, published
+    status = db.Column(db.String(20), default="pending")  # pending, processing, generated, published
+    # Коли план взято в генерацію (status=processing) - щоб план, чий потік
+    # загинув разом з воркером, можна було запустити знову (див. claim_for_generation)
+    generation_started_at = db.Column(db.DateTime, nullable=True)
+    # Id пакета OpenAI Batch API, в якому зараз генерується текст статті
+    # (status=processing); знімається, коли результати пакета забрано
+    batch_id = db.Column(db.String(64), nullable=True, index=True)
     
     # Зв'язок з постом
     blog_post_id = db.Column(db.Integer, db.ForeignKey('blog_posts.id'), nullable=True)
@@ -193,6 +254,9 @@ class BlogPlan(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Довше за будь-яку реальну генерацію (текст + обкладинка + переклади)
+    GENERATION_TIMEOUT = timedelta(minutes=15)
+
     def __repr__(self):
         return f"<BlogPlan {self.plan_date} - {self.topic[:30]}>"
     
@@ -206,26 +270,118 @@ class BlogPlan(db.Model):
         """
         Створює план на 7 днів.
         topics_list: список словників з topic, keywords, etc.
+
+        Один INSERT ... ON CONFLICT на весь тиждень. Повторне збереження
+        плану перезаписує теми днів, що ще чекають генерації; дні, для яких
+        статтю вже згенеровано (або генерують зараз), не чіпаються і не
+        потрапляють у результат.
         """
-        plans = []
         today = date.today()
+        rows = [
+            {
+                "store_id": store_id,
+                "plan_date": today + timedelta(days=i),
+                "topic": topic_data.get('topic', f'Тема {i+1}'),
+                "keywords": topic_data.get('keywords', ''),
+                "additional_instructions": topic_data.get('instructions', ''),
+                "target_audience": topic_data.get('audience', ''),
+                "status": "pending",
+                "created_at": datetime.utcnow(),
+            }
+            for i, topic_data in enumerate(topics_list[:7])
+        ]
+        if not rows:
+            return []
 
-        for i, topic_data in enumerate(topics_list[:7]):
-            plan_date = today + timedelta(days=i)
+        insert = pg_insert(cls).values(rows)
+        plans = db.session.scalars(
+            insert.on_conflict_do_update(
+                constraint="uq_blog_plans_store_date",
+                set_={
+                    "topic": insert.excluded.topic,
+                    "keywords": insert.excluded.keywords,
+                    "additional_instructions": insert.excluded.additional_instructions,
+                    "target_audience": insert.excluded.target_audience,
+                },
+                where=cls.status == "pending",
+            ).returning(cls)
+        ).all()
+        db.session.commit()
+        return plans
 
-            plan = cls(
-                store_id=store_id,
-                plan_date=plan_date,
-                topic=topic_data.get('topic', f'Тема {i+1}'),
-                keywords=topic_data.get('keywords', ''),
-                additional_instructions=topic_data.get('instructions', ''),
-                target_audience=topic_data.get('audience', ''),
-            )
-            db.session.add(plan)
-            plans.append(plan)
+    @classmethod
+    def claim_for_generation(cls, plan_id, store_id=None):
+        """Атомарно бере план у генерацію (pending -> processing) одним
+        UPDATE ... RETURNING. True - план забрав саме цей виклик; повторний
+        клік, інший воркер чи планувальник отримають False. План, що
+        "завис" у processing довше GENERATION_TIMEOUT, можна взяти знову
+        (крім планів у пакеті Batch API - той має власне вікно до 24 год)."""
+        return bool(cls.claim_many_for_generation([plan_id], store_id=store_id))
+
+    @classmethod
+    def claim_many_for_generation(cls, plan_ids, store_id=None):
+        """Як claim_for_generation, але для кількох планів - одним UPDATE і
+        одним комітом замість пари на кожен план. Повертає множину id
+        взятих планів."""
+        if not plan_ids:
+            return set()
+        now = datetime.utcnow()
+        query = db.update(cls).where(
+            cls.id.in_(plan_ids),
+            db.or_(
+                cls.status == "pending",
+                db.and_(
+                    cls.status == "processing",
+                    cls.batch_id.is_(None),
+                    cls.generation_started_at < now - cls.GENERATION_TIMEOUT,
+                ),
+            ),
+        )
+        if store_id is not None:
+            query = query.where(cls.store_id == store_id)
+        claimed_ids = set(db.session.scalars(
+            query.values(status="processing", generation_started_at=now).returning(cls.id),
+            execution_options={"synchronize_session": False},
+        ))
+        db.session.commit()
+        return claimed_ids
 
+    @classmethod
+    def release_after_failure(cls, plan_id):
+        """Повертає план, генерація якого впала, назад у pending."""
+        db.session.execute(
+            db.update(cls)
+            .where(cls.id == plan_id, cls.status == "processing")
+            .values(status="pending", generation_started_at=None, batch_id=None),
+            execution_options={"synchronize_session": False},
+        )
         db.session.commit()
-        return plans
+
+    @classmethod
+    def attach_batch(cls, plan_ids, batch_id):
+        """Позначає взяті в генерацію плани як такі, що чекають пакета batch_id."""
+        db.session.execute(
+            db.update(cls)
+            .where(cls.id.in_(plan_ids), cls.status == "processing")
+            .values(batch_id=batch_id),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+
+    @classmethod
+    def take_batch(cls, batch_id):
+        """Атомарно відв'язує плани від завершеного пакета і повертає їх id.
+        Лише один виклик (опитування адмінки чи планувальник) отримає плани -
+        решта побачить порожній список і не згенерує статті вдруге."""
+        plan_ids = db.session.execute(
+            db.update(cls)
+            .where(cls.batch_id == batch_id, cls.status == "processing")
+            .values(batch_id=None, generation_started_at=datetime.utcnow())
+            .returning(cls.id),
+            execution_options={"synchronize_session": False},
+        ).scalars().all()
+        db.session.commit()
+        return plan_ids
 
     @classmethod
     def get_pending_for_date(cls, target_date=None, store_id=None):
@@ -324,6 +480,11 @@ class AISettings(db.Model):
     
     def __repr__(self):
         return f"<AISettings id={self.id}>"
+
+    @property
+    def publish_time_parsed(self):
+        """publish_time ("HH:MM") як datetime.time."""
+        return _parse_publish_time(self.publish_time)
     
     @staticmethod
     def get_or_create(store_id=None):
@@ -352,6 +513,19 @@ class AISettings(db.Model):
             db.session.add(settings)
             db.session.commit()
         return settings
+
+    @staticmethod
+    def get_cached(store_id=None):
+        """Налаштування AI магазину лише для читання - з кешу процесу.
+
+        Повертає від'єднаний (detached) об'єкт, спільний для всіх запитів і
+        потоків: міняти його не можна, для редагування - get_or_create()."""
+        return _cached_ai_settings(store_id, int(time.time() // AI_SETTINGS_CACHE_TTL_SECONDS))
+
+    @staticmethod
+    def invalidate_cache():
+        """Скидає кеш get_cached в усіх воркерах - після коміту змін."""
+        notify_cache_dirty("ai_settings")
     
     def get_blogger_prompt(self, topic, keywords=""):
         """Формує промпт для генерації статті."""
@@ -383,3 +557,30 @@ class AISettings(db.Model):
 5. Висновок з закликом до дії""")
         
         return "\n".join(parts)
+
+
+@lru_cache(maxsize=256)
+def _cached_ai_settings(store_id, _time_bucket):
+    settings = _load_detached_ai_settings(store_id)
+    if settings is None:
+        # Рядка ще немає - створюємо звичайним шляхом і перечитуємо
+        AISettings.get_or_create(store_id)
+        settings = _load_detached_ai_settings(store_id)
+    return settings
+
+
+def _load_detached_ai_settings(store_id):
+    # Окрема коротка сесія, а не expunge із сесії запиту: той самий об'єкт
+    # запит міг уже взяти через get_or_create, і після expunge його зміни
+    # тихо не зберігалися б. Закриття сесії від'єднує вже завантажений об'єкт.
+    with Session(db.engine) as session:
+        return session.scalars(db.select(AISettings).filter_by(store_id=store_id)).first()
+
+
+register_cache("ai_settings", _cached_ai_settings.cache_clear)
+
+
+@lru_cache(maxsize=64)
+def _parse_publish_time(value):
+    # strptime повільний, а значень publish_time у магазинів - одиниці
+    return datetime.strptime(value, "%H:%M").time()
@@ -3,7 +3,9 @@
 """
 from datetime import datetime
 from enum import Enum
+from sqlalchemy.orm import validates
 from extensions import db
+from services.whois_checker import WHOISChecker
 
 
 class CompanyStatus(str, Enum):
@@ -40,7 +42,14 @@ class AlertSeverity(str, Enum):
 class Company(db.Model):
     """Модель компанії для B2B партнерів."""
     __tablename__ = "companies"
-    __table_args__ = {'extend_existing': True}
+    # Список CRM: фільтр магазину (+ статус), сортування від нових. Триграмні
+    # GIN-індекси під пошук ILIKE '%...%' по name/vat_number/domain створює
+    # лише міграція - вони потребують розширення pg_trgm, якого create_all
+    # у тестовій БД не має.
+    __table_args__ = (
+        db.Index('ix_companies_store_status_created', 'store_id', 'status', db.text('created_at DESC')),
+        {'extend_existing': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), nullable=True, index=True)
@@ -93,6 +102,10 @@ class Company(db.Model):
     reliability_level = db.Column(db.String(20), default=ReliabilityLevel.CRITICAL.value)
     last_verification_at = db.Column(db.DateTime, nullable=True)
     last_verification_data = db.Column(db.JSON, nullable=True)  # Повний результат верифікації
+    # Те з останньої перевірки, з чим порівнюється наступна (див.
+    # previous_verification) - щоб не читати заради цього весь JSON вище.
+    last_vat_name = db.Column(db.Text, nullable=True)
+    last_whois_owner = db.Column(db.Text, nullable=True)
     
     # WHOIS верифікація
     is_whois_verified = db.Column(db.Boolean, default=False)
@@ -131,6 +144,43 @@ class Company(db.Model):
             return f"{self.vat_country.upper()}{self.vat_number}"
         return self.vat_number
     
+    @property
+    def previous_verification(self):
+        """Базовий результат для partner_verifier.full_verification(previous_result=...):
+        лише поля, які той порівнює (назва у VAT, власник домену, score).
+        None, якщо компанію ще не перевіряли."""
+        if self.last_verification_at is None:
+            return None
+        previous = {"reliability_score": self.reliability_score or 0}
+        if self.last_vat_name is not None:
+            previous["vat_result"] = {"name": self.last_vat_name}
+        if self.last_whois_owner:
+            previous["whois_result"] = {"registrant_org": self.last_whois_owner}
+        return previous
+
+    def remember_verification(self, result):
+        """Зберігає повний результат перевірки і базові поля для наступного
+        порівняння (previous_verification)."""
+        self.last_verification_data = result
+        self.last_vat_name = (result.get("vat_result") or {}).get("name")
+        whois_result = result.get("whois_result") or {}
+        self.last_whois_owner = whois_result.get("registrant_org") or whois_result.get("registrant_name")
+
+    @staticmethod
+    def domain_from_website(website):
+        """Нормалізований домен з довільного URL сайту (без схеми, www, порту)."""
+        website = (website or "").strip()
+        if not website:
+            return None
+        return WHOISChecker.extract_domain(website.rstrip("/")).split("/")[0] or None
+
+    @validates("website")
+    def _sync_domain(self, key, website):
+        # domain рахується один раз при записі сайту, а не при кожній
+        # WHOIS-перевірці; по ньому ж шукає CRM.
+        self.domain = self.domain_from_website(website)
+        return website
+
     @property
     def full_address(self):
         """Повна адреса."""
@@ -163,7 +213,8 @@ class VerificationLog(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), nullable=True, index=True)
-    company_id = db.Column(db.Integer, db.ForeignKey("companies.id"), nullable=False)
+    # NULL - компанію видалено до перевірки (лог помилки щоденної перевірки)
+    company_id = db.Column(db.Integer, db.ForeignKey("companies.id"), nullable=True)
     
     # Тип перевірки
     check_type = db.Column(db.String(30), nullable=False)  # vat, handelsregister, whois
@@ -193,8 +244,12 @@ class VerificationLog(db.Model):
     @staticmethod
     def log_check(company_id, check_type, status, is_valid=None,
                   request_data=None, response_data=None, error_message=None,
-                  changes_detected=False, changes_description=None, store_id=None):
-        """Створює запис логу. store_id за замовчуванням береться з компанії."""
+                  changes_detected=False, changes_description=None, store_id=None,
+                  commit=True):
+        """Створює запис логу. store_id за замовчуванням береться з компанії.
+
+        commit=False - лише додати в сесію, щоб викликач закомітив лог разом
+        з рештою змін (оновлення компанії, алерти) однією транзакцією."""
         if store_id is None:
             company = Company.query.get(company_id)
             store_id = company.store_id if company else None
@@ -211,14 +266,21 @@ class VerificationLog(db.Model):
             changes_description=changes_description,
         )
         db.session.add(log)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return log
 
 
 class AdminAlert(db.Model):
     """Алерти для адміністраторів в CRM."""
     __tablename__ = "admin_alerts"
-    __table_args__ = {'extend_existing': True}
+    # Список алертів магазину (від нових) і лічильники по невирішених/
+    # непрочитаних у CRM.
+    __table_args__ = (
+        db.Index('ix_admin_alerts_store_created', 'store_id', db.text('created_at DESC')),
+        db.Index('ix_admin_alerts_store_resolved_severity', 'store_id', 'is_resolved', 'severity'),
+        {'extend_existing': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), nullable=True, index=True)
@@ -278,6 +340,36 @@ class AdminAlert(db.Model):
         db.session.commit()
         return alert
 
+    @staticmethod
+    def bulk_create_from_verification(alerts, company_id, store_id, data=None, title_prefix=None):
+        """Додає алерти з результату partner_verifier (список dict з
+        type/message/severity) одним executemany через bulk_insert_mappings,
+        замість окремого INSERT + commit на кожен алерт у create_alert().
+        title_prefix (напр. назва компанії) додається перед повідомленням у
+        заголовку. НЕ комітить - викликач комітить разом з рештою змін."""
+        now = datetime.utcnow()
+        rows = [
+            {
+                "store_id": store_id,
+                "company_id": company_id,
+                "alert_type": alert_data.get("type"),
+                "title": (
+                    f"{title_prefix}: {alert_data.get('message', 'Алерт')}"
+                    if title_prefix else alert_data.get("message", "Алерт верифікації")
+                ),
+                "message": alert_data.get("message"),
+                "severity": alert_data.get("severity", "info"),
+                "data": data,
+                "is_read": False,
+                "is_resolved": False,
+                "created_at": now,
+            }
+            for alert_data in alerts
+        ]
+        if rows:
+            db.session.bulk_insert_mappings(AdminAlert, rows)
+        return len(rows)
+
     @staticmethod
     def get_unread_count(store_id=None):
         """Повертає кількість непрочитаних алертів (в межах магазину, якщо задано)."""
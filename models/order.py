@@ -3,6 +3,10 @@
 """
 from datetime import datetime
 from enum import Enum
+from types import MappingProxyType
+
+from flask_babel import lazy_gettext as _l
+
 from extensions import db
 
 
@@ -18,6 +22,21 @@ class OrderStatus(str, Enum):
     REFUNDED = "refunded"      # Повернено
 
 
+# Людські назви статусів - один незмінний словник на процес, а не новий dict
+# на кожне звернення до Order.status_display. lazy_gettext - щоб pybabel
+# витяг msgid, а переклад стався при рендері, мовою запиту.
+ORDER_STATUS_DISPLAY = MappingProxyType({
+    OrderStatus.CREATED.value: _l("Створено"),
+    OrderStatus.PENDING.value: _l("Очікує оплати"),
+    OrderStatus.PAID.value: _l("Оплачено"),
+    OrderStatus.PROCESSING.value: _l("В обробці"),
+    OrderStatus.SHIPPED.value: _l("Відправлено"),
+    OrderStatus.DELIVERED.value: _l("Доставлено"),
+    OrderStatus.CANCELLED.value: _l("Скасовано"),
+    OrderStatus.REFUNDED.value: _l("Повернено"),
+})
+
+
 class PaymentMethod(str, Enum):
     """Способи оплати."""
     CARD = "card"              # Карткою (Stripe)
@@ -98,18 +117,8 @@ class Order(db.Model):
     
     @property
     def status_display(self):
-        """Людський статус."""
-        statuses = {
-            "created": "Створено",
-            "pending": "Очікує оплати",
-            "paid": "Оплачено",
-            "processing": "В обробці",
-            "shipped": "Відправлено",
-            "delivered": "Доставлено",
-            "cancelled": "Скасовано",
-            "refunded": "Повернено",
-        }
-        return statuses.get(self.status, self.status)
+        """Людський статус мовою поточного запиту."""
+        return str(ORDER_STATUS_DISPLAY.get(self.status, self.status))
     
     @property
     def items_count(self):
@@ -130,6 +139,14 @@ class Order(db.Model):
         db.session.commit()
 
 
+# Keyset-пагінація замовлень партнера в кабінеті (b2b_orders): фільтр за
+# магазином і email, порядок (created_at, id) від нових до старих.
+db.Index(
+    "ix_orders_store_customer_created",
+    Order.store_id, Order.customer_email, Order.created_at.desc(), Order.id.desc(),
+)
+
+
 class OrderItem(db.Model):
     """Позиція замовлення."""
     __tablename__ = "order_items"
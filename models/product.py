@@ -85,6 +85,10 @@ class Product(db.Model):
     __tablename__ = "products"
     __table_args__ = (
         db.UniqueConstraint('store_id', 'sku', name='uq_products_store_sku'),
+        # Каталог вітрини/чат-бота завжди фільтрує активні товари магазину і
+        # групує їх за категорією - частковий індекс лише по is_active.
+        db.Index('ix_products_store_active_category', 'store_id', 'category_id',
+                 postgresql_where=db.text('is_active')),
         {'extend_existing': True},
     )
 
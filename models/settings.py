@@ -1,8 +1,60 @@
 """
 Моделі налаштувань сайту та контактних повідомлень
 """
+import os
+import time
 from datetime import datetime
+
+from flask import g, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
 from extensions import db
+from services.cache_invalidation import broadcast_cache_dirty, register_cache
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Міжзапитний кеш налаштувань магазину: SiteSettings читаються на кожній
+# сторінці (маршрут + context processor теми), а змінюються рідко. У
+# процесі тримаємо знімок значень колонок (не ORM-об'єкт - він прив'язаний
+# до сесії запиту) і на кожен запит приєднуємо його до сесії без SELECT.
+# Знімок живе SETTINGS_CACHE_TTL_SECONDS; зміна налаштувань (ORM UPDATE)
+# скидає його одразу - у цьому воркері локально, а в інших через лічильник
+# поколінь у Redis (якщо REDIS_URL налаштований), або, без Redis, через
+# Postgres LISTEN/NOTIFY (services/cache_invalidation) - тоді скидаються
+# знімки всіх магазинів, зате інші воркери не чекають кінця TTL.
+SETTINGS_CACHE_TTL_SECONDS = 60
+_SETTINGS_GENERATION_KEY = "site_settings:gen:{}"
+
+_redis_url = os.environ.get("REDIS_URL", "")
+_redis_client = redis.Redis.from_url(_redis_url) if (REDIS_AVAILABLE and _redis_url) else None
+_settings_snapshots = {}
+register_cache("site_settings", _settings_snapshots.clear)
+
+
+def _settings_generation(store_id):
+    """Поточне покоління налаштувань магазину (0 без Redis)."""
+    if _redis_client is None:
+        return 0
+    try:
+        return int(_redis_client.get(_SETTINGS_GENERATION_KEY.format(store_id)) or 0)
+    except redis.RedisError:
+        return None
+
+
+def invalidate_site_settings_cache(store_id):
+    """Скидає знімок налаштувань магазину в цьому процесі та (через Redis)
+    в усіх інших воркерах."""
+    _settings_snapshots.pop(store_id, None)
+    if _redis_client is not None:
+        try:
+            _redis_client.incr(_SETTINGS_GENERATION_KEY.format(store_id))
+        except redis.RedisError:
+            pass
 
 
 class SiteSettings(db.Model):
@@ -116,7 +168,51 @@ class SiteSettings(db.Model):
     
     @staticmethod
     def get_or_create(store_id=None):
-        """Отримує або створює налаштування для магазину store_id."""
+        """Отримує або створює налаштування для магазину store_id.
+
+        Результат запам'ятовується на g до кінця запиту: get_or_create
+        викликається в кожному маршруті, context processor-і теми та ще й
+        повторно в гілках помилок валідації - тепер це один SELECT на запит.
+        Закешований об'єкт перевіряємо на приналежність до поточної сесії
+        (після db.session.remove() він відʼєднаний - тоді читаємо заново)."""
+        cache = g.setdefault("_site_settings", {}) if has_app_context() else None
+        if cache is not None:
+            cached = cache.get(store_id)
+            if cached is not None and cached in db.session:
+                return cached
+        settings = SiteSettings._from_snapshot(store_id)
+        if settings is None:
+            settings = SiteSettings._get_or_create_uncached(store_id)
+            SiteSettings._store_snapshot(store_id, settings)
+        if cache is not None:
+            cache[store_id] = settings
+        return settings
+
+    @staticmethod
+    def _from_snapshot(store_id):
+        """Налаштування зі знімка процесу, приєднані до поточної сесії без
+        SELECT (merge(load=False)), або None, якщо знімка немає/застарів."""
+        snapshot = _settings_snapshots.get(store_id)
+        if snapshot is None:
+            return None
+        expires_at, generation, values = snapshot
+        if expires_at < time.monotonic() or generation != _settings_generation(store_id):
+            _settings_snapshots.pop(store_id, None)
+            return None
+        detached = SiteSettings(**values)
+        make_transient_to_detached(detached)
+        return db.session.merge(detached, load=False)
+
+    @staticmethod
+    def _store_snapshot(store_id, settings):
+        generation = _settings_generation(store_id)
+        if generation is None:
+            return
+        values = {attr.key: getattr(settings, attr.key) for attr in inspect(SiteSettings).column_attrs}
+        _settings_snapshots[store_id] = (time.monotonic() + SETTINGS_CACHE_TTL_SECONDS, generation, values)
+
+    @staticmethod
+    def _get_or_create_uncached(store_id=None):
         query = SiteSettings.query
         query = query.filter_by(store_id=store_id) if store_id is not None else query.filter_by(store_id=None)
         settings = query.first()
@@ -144,10 +240,33 @@ class SiteSettings(db.Model):
         return settings
 
 
+@event.listens_for(SiteSettings, "after_update")
+@event.listens_for(SiteSettings, "after_delete")
+def _invalidate_settings_snapshot(mapper, connection, target):
+    invalidate_site_settings_cache(target.store_id)
+    # Ще раз після коміту: між flush і commit паралельний запит міг знову
+    # закешувати старі (ще закомічені) значення.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("_site_settings_changed", set()).add(target.store_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_settings(session):
+    changed = session.info.pop("_site_settings_changed", ())
+    for store_id in changed:
+        invalidate_site_settings_cache(store_id)
+    if changed and _redis_client is None:
+        broadcast_cache_dirty("site_settings")
+
+
 class ContactMessage(db.Model):
     """Повідомлення з форми контактів."""
     __tablename__ = "contact_messages"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        db.Index('ix_contact_messages_store_created', 'store_id', 'created_at'),
+        {'extend_existing': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), nullable=True, index=True)
@@ -7,7 +7,9 @@ from datetime import datetime
 from enum import Enum
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+from sqlalchemy.orm.attributes import set_committed_value
 from extensions import db
+from services.passwords import hash_password, verify_password, needs_rehash
 
 
 class UserRole(str, Enum):
@@ -71,11 +73,17 @@ class User(UserMixin, db.Model):
     
     def set_password(self, password):
         """Хешує та зберігає пароль."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        """Перевіряє пароль."""
-        return check_password_hash(self.password_hash, password)
+        """Перевіряє пароль. Старий (pbkdf2/scrypt) хеш після успішної
+        перевірки замінюється на поточний формат - закомітить викликач
+        разом з рештою змін запиту (напр. last_login)."""
+        if not verify_password(self.password_hash, password):
+            return False
+        if needs_rehash(self.password_hash):
+            self.password_hash = hash_password(password)
+        return True
     
     @property
     def full_name(self):
@@ -127,8 +135,16 @@ class User(UserMixin, db.Model):
         return self.role == UserRole.CUSTOMER.value
     
     def update_last_login(self):
-        """Оновлює час останнього входу."""
-        self.last_login = datetime.utcnow()
+        """Оновлює час останнього входу одним адресним UPDATE за id, без
+        ORM-відстеження змін цього атрибута. Коміт усе одно закриває й інші
+        зміни запиту (напр. перехешований у check_password пароль)."""
+        now = datetime.utcnow()
+        db.session.execute(
+            db.update(User).where(User.id == self.id).values(last_login=now),
+            execution_options={"synchronize_session": False},
+        )
+        # Значення в пам'яті - як уже збережене, щоб не позначати об'єкт брудним
+        set_committed_value(self, "last_login", now)
         db.session.commit()
 
     # ----- Двофакторна автентифікація (TOTP) -----
@@ -209,6 +225,12 @@ class User(UserMixin, db.Model):
     def get_by_email(email):
         """Знаходить користувача за email."""
         return User.query.filter_by(email=email.lower().strip()).first()
+
+    @staticmethod
+    def email_exists(email):
+        """Чи зайнятий email. Для перевірки при реєстрації достатньо id -
+        не вантажимо весь рядок users в ORM-об'єкт."""
+        return db.session.query(User.id).filter_by(email=email.lower().strip()).first() is not None
     
     @staticmethod
     def create_user(email, password, role=UserRole.CUSTOMER, **kwargs):
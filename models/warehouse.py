@@ -4,6 +4,7 @@
 from datetime import datetime
 from enum import Enum
 from extensions import db
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 
 class ShipmentStatus(str, Enum):
@@ -19,6 +20,17 @@ class ShipmentStatus(str, Enum):
     CANCELLED = "cancelled"          # Скасовано
 
 
+# Завдання, що ще в черзі складу (список за замовчуванням). Кортеж рядків
+# один раз на процес, а не новий список з .value на кожен запит; той самий
+# набір - в умові часткового індексу ix_warehouse_tasks_store_active_queue.
+ACTIVE_SHIPMENT_STATUSES = (
+    ShipmentStatus.PENDING.value,
+    ShipmentStatus.PROCESSING.value,
+    ShipmentStatus.PACKED.value,
+    ShipmentStatus.READY.value,
+)
+
+
 class ReplenishmentStatus(str, Enum):
     """Статуси поповнення."""
     DRAFT = "draft"                  # Чернетка
@@ -42,7 +54,19 @@ class ExpenseCategory(str, Enum):
 class WarehouseTask(db.Model):
     """Завдання для складу (на відправку посилки)."""
     __tablename__ = "warehouse_tasks"
-    __table_args__ = {'extend_existing': True}
+    # Черга активних завдань складу (admin_warehouse без фільтра статусу):
+    # частковий індекс у порядку сортування списку, лише по активних.
+    __table_args__ = (
+        db.Index('ix_warehouse_tasks_store_active_queue', 'store_id', 'priority', db.text('created_at DESC'),
+                 postgresql_where=db.text("status IN ('pending', 'processing', 'packed', 'ready')")),
+        # "Відправлено сьогодні" - діапазон по shipped_at
+        db.Index('ix_warehouse_tasks_store_shipped_at', 'store_id', 'shipped_at',
+                 postgresql_where=db.text('shipped_at IS NOT NULL')),
+        # Одне завдання на замовлення - на цьому тримається ідемпотентність
+        # create_from_order при повторних доставках Stripe webhook
+        db.UniqueConstraint('order_id', name='uq_warehouse_tasks_order_id'),
+        {'extend_existing': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), nullable=True, index=True)
@@ -174,38 +198,52 @@ class WarehouseTask(db.Model):
     
     @staticmethod
     def create_from_order(order_id, priority=3, notes=None):
-        """Створює завдання для замовлення. store_id береться із самого замовлення."""
+        """Створює завдання для замовлення. store_id береться із самого замовлення.
+
+        Ідемпотентно: INSERT ... ON CONFLICT (order_id) DO NOTHING замість
+        SELECT-then-INSERT, тож повторний Stripe webhook, що прийшов
+        паралельно з checkout_success, не створить друге завдання. Повертає
+        нове завдання або None, якщо завдання для замовлення вже існує."""
         from models.order import Order
 
-        order = Order.query.get(order_id)
+        # Викликачі щойно оновили замовлення - get() бере його з identity map
+        order = db.session.get(Order, order_id)
         if not order:
             raise ValueError(f"Order #{order_id} not found")
 
-        task = WarehouseTask(
-            store_id=order.store_id,
-            order_id=order_id,
-            priority=priority,
-            notes=notes,
-            # Копіюємо дані з замовлення
-            customer_name=getattr(order, 'customer_name', None) or getattr(order, 'name', None),
-            customer_phone=getattr(order, 'customer_phone', None) or getattr(order, 'phone', None),
-            customer_email=getattr(order, 'customer_email', None) or getattr(order, 'email', None),
-            shipping_address=getattr(order, 'shipping_address', None) or getattr(order, 'address', None),
-            shipping_method=getattr(order, 'shipping_method', None),
-            is_b2b=getattr(order, 'is_b2b', False),
-            is_pickup=getattr(order, 'is_pickup', False),
-        )
-        db.session.add(task)
-        db.session.flush()
+        task = db.session.scalars(
+            pg_insert(WarehouseTask)
+            .values(
+                store_id=order.store_id,
+                order_id=order_id,
+                priority=priority,
+                notes=notes,
+                # Копіюємо дані з замовлення
+                customer_name=getattr(order, 'customer_name', None) or getattr(order, 'name', None),
+                customer_phone=getattr(order, 'customer_phone', None) or getattr(order, 'phone', None),
+                customer_email=getattr(order, 'customer_email', None) or getattr(order, 'email', None),
+                shipping_address=getattr(order, 'shipping_address', None) or getattr(order, 'address', None),
+                shipping_method=getattr(order, 'shipping_method', None),
+                is_b2b=getattr(order, 'is_b2b', False),
+                is_pickup=getattr(order, 'is_pickup', False),
+            )
+            .on_conflict_do_nothing(index_elements=['order_id'])
+            .returning(WarehouseTask)
+        ).first()
+        if task is None:
+            return None
         task.generate_task_number()
-        db.session.commit()
         return task
 
 
 class StockMovement(db.Model):
     """Рух товарів на складі."""
     __tablename__ = "stock_movements"
-    __table_args__ = {'extend_existing': True}
+    # Історія руху товару - keyset-пагінація від нових до старих
+    __table_args__ = (
+        db.Index('ix_stock_movements_product_created', 'product_id', db.text('created_at DESC'), db.text('id DESC')),
+        {'extend_existing': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), nullable=True, index=True)
@@ -249,10 +287,12 @@ class StockMovement(db.Model):
         магазину (захист від зміни залишків чужого товару за підібраним ID).
         """
         from models.product import Product
-        if store_id is not None:
-            product = Product.query.filter_by(id=product_id, store_id=store_id).first()
-        else:
-            product = Product.query.get(product_id)
+        # session.get() бере товар з identity map, якщо обробник уже
+        # завантажив його (перевірка доступу в admin_warehouse_stock_adjust),
+        # замість другого SELECT; належність магазину перевіряємо в Python.
+        product = db.session.get(Product, product_id)
+        if product is not None and store_id is not None and product.store_id != store_id:
+            product = None
         if not product:
             raise ValueError(f"Product #{product_id} not found")
 
@@ -283,7 +323,13 @@ class StockMovement(db.Model):
 class ReplenishmentOrder(db.Model):
     """Замовлення на поповнення складу."""
     __tablename__ = "replenishment_orders"
-    __table_args__ = {'extend_existing': True}
+    # Звіт складу (COUNT/SUM ... FILTER по created_at/received_at) читає
+    # лише ці колонки - index-only scan без звернень до таблиці.
+    __table_args__ = (
+        db.Index('ix_replenishment_orders_store_created', 'store_id', 'created_at',
+                 postgresql_include=['received_at', 'total']),
+        {'extend_existing': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), nullable=True, index=True)
@@ -343,16 +389,10 @@ class ReplenishmentOrder(db.Model):
         return statuses.get(self.status, self.status)
     
     def generate_order_number(self):
-        """Генерує номер замовлення."""
+        """Генерує номер замовлення з id (потрібен flush). Не комітить -
+        номер зберігається разом із замовленням і його позиціями."""
         year = datetime.utcnow().year
         self.order_number = f"REP-{year}-{self.id:05d}"
-        db.session.commit()
-    
-    def calculate_totals(self):
-        """Перераховує суми."""
-        self.subtotal = sum(item.total for item in self.items)
-        self.total = self.subtotal + self.shipping_cost
-        db.session.commit()
     
     def mark_received(self):
         """Позначає як отримано та оновлює залишки."""
@@ -410,7 +450,13 @@ class ReplenishmentItem(db.Model):
 class WarehouseExpense(db.Model):
     """Витрати складу."""
     __tablename__ = "warehouse_expenses"
-    __table_args__ = {'extend_existing': True}
+    # Суми за категоріями з дати (звіт складу, зведення на сторінці витрат) -
+    # index-only scan по діапазону дат магазину.
+    __table_args__ = (
+        db.Index('ix_warehouse_expenses_store_date', 'store_id', 'expense_date',
+                 postgresql_include=['category', 'amount']),
+        {'extend_existing': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     store_id = db.Column(db.Integer, db.ForeignKey("stores.id"), nullable=True, index=True)
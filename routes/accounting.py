@@ -6,7 +6,7 @@
 четвертий крок Phase 2 плану (SWOT 2026-08-08), тим самим підходом, що
 й Blog/CRM/Warehouse.
 """
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 from flask import Blueprint, request, render_template, g, Response
 from extensions import db
@@ -19,7 +19,6 @@ accounting_bp = Blueprint("accounting", __name__)
 
 def _accounting_period():
     """Читає ?from=&to= з рядка запиту, за замовчуванням - поточний місяць."""
-    from datetime import date
     today = date.today()
     default_from = today.replace(day=1)
     try:
@@ -33,6 +32,15 @@ def _accounting_period():
     return date_from, date_to
 
 
+def _paid_in_period(date_from, date_to):
+    """Умови "оплачено в період [date_from, date_to]" як півінтервал по
+    paid_at - без date(paid_at), щоб працював індекс по колонці."""
+    return (
+        Order.paid_at >= datetime.combine(date_from, datetime.min.time()),
+        Order.paid_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()),
+    )
+
+
 def _csv_response(filename, header, rows):
     import csv
     from io import StringIO
@@ -56,8 +64,7 @@ def admin_accounting():
     paid_orders_q = Order.query.filter(
         Order.store_id == g.store.id,
         Order.status == "paid",
-        db.func.date(Order.paid_at) >= date_from,
-        db.func.date(Order.paid_at) <= date_to,
+        *_paid_in_period(date_from, date_to),
     )
     stats = {
         "orders_count": paid_orders_q.count(),
@@ -91,8 +98,7 @@ def admin_accounting_export_orders():
     orders = Order.query.filter(
         Order.store_id == g.store.id,
         Order.status.in_(["paid", "shipped", "delivered"]),
-        db.func.date(Order.paid_at) >= date_from,
-        db.func.date(Order.paid_at) <= date_to,
+        *_paid_in_period(date_from, date_to),
     ).order_by(Order.paid_at.asc()).all()
 
     rows = []
@@ -173,8 +179,7 @@ def admin_accounting_export_revenue_by_country():
     ).filter(
         Order.store_id == g.store.id,
         Order.status.in_(["paid", "shipped", "delivered"]),
-        db.func.date(Order.paid_at) >= date_from,
-        db.func.date(Order.paid_at) <= date_to,
+        *_paid_in_period(date_from, date_to),
     ).group_by(Order.shipping_country).order_by(Order.shipping_country.asc()).all()
 
     rows = [
@@ -8,6 +8,8 @@
 (SWOT 2026-08-08), тим самим підходом, що й Blog/CRM/Warehouse/Accounting.
 """
 import json as json_module
+import logging
+import time
 
 from flask import Blueprint, request, jsonify, session, g, current_app, redirect, url_for, flash, render_template
 from flask_babel import gettext as _
@@ -19,6 +21,7 @@ from models.blog import AISettings
 from models.order import Order
 from services.admin_auth import admin_required
 from services.openai_client import get_openai_client, OPENAI_AVAILABLE
+from services.chat_shortcuts import normalize_message, canned_reply, message_cache_key
 
 ai_bp = Blueprint("ai", __name__)
 
@@ -67,6 +70,118 @@ CHAT_TOOLS = [
     },
 ]
 CHAT_HISTORY_TURNS = 6  # зберігаємо останні N пар (user+assistant) у сесії
+CHAT_CATALOG_PER_CATEGORY = 15  # скільки товарів кожної категорії потрапляє в промпт
+
+# Кеш відповідей на ПЕРШЕ повідомлення розмови (без історії - інакше
+# відповідь залежить від контексту): (store_id, sha256 нормалізованого питання,
+# hash системного промпту) -> (expires_at, відповідь). Hash промпту в ключі
+# сам інвалідує кеш при зміні каталогу чи налаштувань чатбота.
+CHAT_ANSWER_CACHE_TTL = 300
+CHAT_ANSWER_CACHE_MAX = 1024
+_CHAT_ANSWER_CACHE = {}
+
+
+# store_id -> (ai_settings.updated_at, зібрані правила). Правила промпту
+# змінюються лише при збереженні /admin/ai (updated_at має onupdate), тож
+# не збираємо їх заново на кожне повідомлення в чаті.
+_CHAT_RULES_CACHE = {}
+
+
+def _chat_rules(ai_settings):
+    """build_chat_rules(ai_settings), закешоване до зміни ai_settings.updated_at."""
+    from services.ai_guardrails import build_chat_rules
+    cached = _CHAT_RULES_CACHE.get(ai_settings.store_id)
+    if cached and cached[0] == ai_settings.updated_at:
+        return cached[1]
+    rules = build_chat_rules(ai_settings)
+    _CHAT_RULES_CACHE[ai_settings.store_id] = (ai_settings.updated_at, rules)
+    return rules
+
+
+def _build_catalog_info(store_id):
+    """Текстовий каталог магазину для системного промпту чат-бота.
+
+    Порядок категорій і товарів фіксований: без ORDER BY Postgres повертає
+    рядки в довільному порядку, і рядок каталогу змінювався б від запиту до
+    запиту - а з ним і префікс промпту, тож prompt caching OpenAI не
+    спрацьовував би навіть при незмінному каталозі.
+
+    У кожній категорії показуємо не більше CHAT_CATALOG_PER_CATEGORY
+    товарів (спершу ті, що в наявності, потім новіші), решту - одним
+    рядком-підсумком. Відбір робить сама БД (ROW_NUMBER() OVER PARTITION
+    BY category_id), тож розмір промпту обмежений O(категорій * K)
+    незалежно від розміру каталогу."""
+    row_number = db.func.row_number().over(
+        partition_by=Product.category_id,
+        order_by=(Product.stock.desc(), Product.created_at.desc(), Product.id),
+    ).label("rn")
+    category_total = db.func.count(Product.id).over(partition_by=Product.category_id).label("category_total")
+    ranked = (
+        db.session.query(Product.id.label("id"), row_number, category_total)
+        .filter(Product.is_active.is_(True), Product.store_id == store_id)
+        .subquery()
+    )
+    # Лише колонки, потрібні для тексту промпту - без description,
+    # мультимовних полів, image_url тощо і без побудови ORM-об'єктів Product.
+    rows = (
+        db.session.query(
+            Product.category_id,
+            Product.name,
+            Product.price,
+            Product.currency,
+            Product.short_description,
+            Product.stock,
+            ranked.c.category_total,
+        )
+        .join(ranked, ranked.c.id == Product.id)
+        .filter(ranked.c.rn <= CHAT_CATALOG_PER_CATEGORY)
+        .order_by(ranked.c.rn)
+        .all()
+    )
+    # Один прохід по рядках замість [p for p in products if p.category_id == cat.id]
+    # на кожну категорію (O(категорій * товарів)).
+    by_category = {}
+    remaining = {}
+    for p in rows:
+        by_category.setdefault(p.category_id, []).append(p)
+        remaining[p.category_id] = p.category_total - CHAT_CATALOG_PER_CATEGORY
+    categories = (
+        db.session.query(Category.id, Category.name)
+        .filter(Category.store_id == store_id)
+        .order_by(Category.id)
+        .all()
+    )
+
+    catalog_info = "Каталог товарів:\n"
+    for cat in categories:
+        catalog_info += f"\nКатегорія: {cat.name}\n"
+        for p in by_category.get(cat.id, ()):
+            catalog_info += f"  - {p.name}: {p.price} {p.currency}"
+            if p.short_description:
+                catalog_info += f" ({p.short_description})"
+            if p.stock > 0:
+                catalog_info += f" [В наявності: {p.stock}]"
+            else:
+                catalog_info += " [Немає в наявності]"
+            catalog_info += "\n"
+        if remaining.get(cat.id, 0) > 0:
+            catalog_info += f"  ... ще {remaining[cat.id]} товарів у цій категорії\n"
+
+    no_cat_products = by_category.get(None, ())
+    if no_cat_products:
+        catalog_info += "\nІнші товари:\n"
+        for p in no_cat_products:
+            catalog_info += f"  - {p.name}: {p.price} {p.currency}\n"
+        if remaining.get(None, 0) > 0:
+            catalog_info += f"  ... ще {remaining[None]} товарів без категорії\n"
+
+    return catalog_info
+
+
+def _remember_chat_turn(history, user_message, ai_message):
+    history.append({"role": "user", "content": user_message})
+    history.append({"role": "assistant", "content": ai_message})
+    session["chat_history"] = history[-(CHAT_HISTORY_TURNS * 2):]
 
 
 @ai_bp.route("/api/chat", methods=["POST"])
@@ -76,7 +191,9 @@ def api_chat():
     openai_client = get_openai_client()
     if not OPENAI_AVAILABLE or not openai_client:
         error_msg = _("AI чатбот тимчасово недоступний. Будь ласка, спробуйте пізніше.")
-        print(f"❌ Chat API error: OpenAI not available (OPENAI_AVAILABLE={OPENAI_AVAILABLE}, client={openai_client})")
+        current_app.logger.error(
+            "Chat API error: OpenAI not available (OPENAI_AVAILABLE=%s, client=%s)", OPENAI_AVAILABLE, openai_client
+        )
         return jsonify({"error": error_msg}), 503
 
     data = request.get_json()
@@ -86,40 +203,40 @@ def api_chat():
         return jsonify({"error": _("Повідомлення порожнє")}), 400
 
     try:
-        ai_settings = AISettings.get_or_create(g.store.id)
+        ai_settings = AISettings.get_cached(g.store.id)
 
         if not ai_settings.chatbot_enabled:
             return jsonify({"error": _("Чатбот тимчасово недоступний")}), 503
     except Exception as e:
-        print(f"❌ Error getting AI settings: {e}")
+        current_app.logger.error("Error getting AI settings: %s", e)
         return jsonify({"error": _("Помилка налаштувань чатбота")}), 500
 
-    settings = SiteSettings.get_or_create(g.store.id)
-    products = Product.query.filter_by(is_active=True, store_id=g.store.id).all()
-    categories = Category.query.filter_by(store_id=g.store.id).all()
+    history = session.get("chat_history", [])
+    normalized_message = normalize_message(user_message)
 
-    catalog_info = "Каталог товарів:\n"
-    for cat in categories:
-        catalog_info += f"\nКатегорія: {cat.name}\n"
-        cat_products = [p for p in products if p.category_id == cat.id]
-        for p in cat_products:
-            catalog_info += f"  - {p.name}: {p.price} {p.currency}"
-            if p.short_description:
-                catalog_info += f" ({p.short_description})"
-            if p.stock > 0:
-                catalog_info += f" [В наявності: {p.stock}]"
-            else:
-                catalog_info += " [Немає в наявності]"
-            catalog_info += "\n"
+    # Привітання на початку розмови - шаблонна відповідь без OpenAI і без
+    # збирання каталогу.
+    if not history:
+        greeting = canned_reply(normalized_message)
+        if greeting:
+            _remember_chat_turn(history, user_message, greeting)
+            return jsonify({"message": greeting})
 
-    no_cat_products = [p for p in products if not p.category_id]
-    if no_cat_products:
-        catalog_info += "\nІнші товари:\n"
-        for p in no_cat_products:
-            catalog_info += f"  - {p.name}: {p.price} {p.currency}\n"
+    settings = SiteSettings.get_or_create(g.store.id)
+    catalog_info = _build_catalog_info(g.store.id)
 
     from services.ai_guardrails import build_chat_system_prompt
-    system_prompt = build_chat_system_prompt(ai_settings, catalog_info)
+    system_prompt = build_chat_system_prompt(ai_settings, catalog_info, rules=_chat_rules(ai_settings))
+
+    answer_cache_key = None
+    if not history:
+        answer_cache_key = (g.store.id, message_cache_key(user_message), hash(system_prompt))
+        cached = _CHAT_ANSWER_CACHE.get(answer_cache_key)
+        if cached and cached[0] > time.monotonic():
+            _remember_chat_turn(history, user_message, cached[1])
+            return jsonify({"message": cached[1]})
+
+    used_tools = False
 
     def _execute_chat_tool(tool_name, arguments_json):
         try:
@@ -161,7 +278,6 @@ def api_chat():
 
         return {"error": "unknown_tool"}
 
-    history = session.get("chat_history", [])
     messages = [{"role": "system", "content": system_prompt}] + history + [{"role": "user", "content": user_message}]
 
     try:
@@ -193,6 +309,7 @@ def api_chat():
                     for tc in choice_message.tool_calls
                 ],
             })
+            used_tools = True
             for tc in choice_message.tool_calls:
                 tool_result = _execute_chat_tool(tc.function.name, tc.function.arguments)
                 messages.append({
@@ -215,20 +332,31 @@ def api_chat():
             )
             ai_message = SAFE_REFUSAL
 
-        history.append({"role": "user", "content": user_message})
-        history.append({"role": "assistant", "content": ai_message or ""})
-        session["chat_history"] = history[-(CHAT_HISTORY_TURNS * 2):]
-
-        print(f"✅ Chat API success: User message length={len(user_message)}, AI response length={len(ai_message or '')}")
+        _remember_chat_turn(history, user_message, ai_message or "")
+
+        # Відповіді з викликом інструментів не кешуємо: вони мають побічні
+        # ефекти (ескалація створює заявку) або залежать від даних замовлення.
+        if answer_cache_key and ai_message and not used_tools:
+            if len(_CHAT_ANSWER_CACHE) >= CHAT_ANSWER_CACHE_MAX:
+                _CHAT_ANSWER_CACHE.clear()
+            _CHAT_ANSWER_CACHE[answer_cache_key] = (time.monotonic() + CHAT_ANSWER_CACHE_TTL, ai_message)
+
+        # Діагностика на кожен запит - лише в DEBUG: print() блокувався на
+        # stdout і форматував f-рядок навіть у проді.
+        if current_app.logger.isEnabledFor(logging.DEBUG):
+            current_app.logger.debug(
+                "Chat API success: user message length=%d, AI response length=%d",
+                len(user_message), len(ai_message or ""),
+            )
         return jsonify({"message": ai_message})
 
     except AttributeError as e:
         error_msg = _("Помилка ініціалізації AI клієнта")
-        print(f"❌ Chat API error (AttributeError): {e}")
+        current_app.logger.error("Chat API error (AttributeError): %s", e)
         return jsonify({"error": error_msg}), 500
     except Exception as e:
         error_msg = _("Помилка обробки запиту")
-        print(f"❌ Chat API error (Exception): {type(e).__name__}: {e}")
+        current_app.logger.error("Chat API error (Exception): %s: %s", type(e).__name__, e)
         return jsonify({"error": error_msg}), 500
 
 
@@ -297,6 +425,7 @@ def admin_ai_settings():
         ai_settings.auto_translate_languages = ",".join(translate_langs) if translate_langs else "en,de"
 
         db.session.commit()
+        AISettings.invalidate_cache()
         flash(_("✅ AI налаштування збережено!"), "success")
         return redirect(url_for(".admin_ai_settings"))
 
@@ -13,25 +13,110 @@ start_blog_scheduler(app) викликається один раз з create_app
 (на момент запуску ще немає активного app/request контексту, тож
 current_app там не спрацював би).
 """
+import json
 import os
+import queue
+import re
+import tempfile
+import time
 import uuid
-from datetime import datetime, date as date_cls
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date as date_cls, timedelta
+from functools import lru_cache
+from threading import Thread
 
+import requests
 from flask import (
     Blueprint, request, redirect, url_for, flash, render_template,
-    jsonify, abort, g, current_app,
+    jsonify, abort, g, current_app, Response, stream_with_context,
 )
 from flask_babel import gettext as _
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 
 from extensions import db
 from models.blog import BlogPost, BlogPlan, AISettings, BlogPostStatus
+from models.product import Image
 from models.settings import SiteSettings
 from services.admin_auth import admin_required
+from services.cache_invalidation import notify_cache_dirty, register_cache
 from services.openai_client import get_openai_client, OPENAI_AVAILABLE
+from services.openai_limits import CHARS_PER_TOKEN, limited_chat_completion, limited_image_generation
 from services.image_storage import delete_old_image
 
 blog_bp = Blueprint("blog", __name__)
 
+# Лічильники статей у шапці адмінки блогу змінюються рідко відносно
+# переглядів списку - кешуємо на коротке вікно, як зведення складу в
+# routes/warehouse.py. Будь-який POST/DELETE у blueprint-і (створення,
+# редагування, публікація, генерація), фонова генерація і планувальник
+# скидають його в усіх воркерах через notify_cache_dirty; TTL - страховка.
+BLOG_STATS_TTL_SECONDS = 60
+
+# Паралельні запити до OpenAI при генерації статті з плану: обкладинка +
+# по одному запиту перекладу на кожну з мов (en, de).
+BLOG_AI_WORKERS = 3
+# Скільки планів генерується одночасно ("Згенерувати всі pending"). Кожен
+# план сам робить до BLOG_AI_WORKERS паралельних запитів до OpenAI і тримає
+# з'єднання з БД - тож небагато, щоб не впертися в rate limit і пул.
+BLOG_PLAN_WORKERS = 3
+IMAGE_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+@lru_cache(maxsize=256)
+def _blog_stats(store_id, _time_bucket):
+    """Лічильники статей магазину - одним запитом з COUNT(*) FILTER."""
+    total, published, scheduled, draft = db.session.query(
+        db.func.count(BlogPost.id),
+        db.func.count(BlogPost.id).filter(BlogPost.status == BlogPostStatus.PUBLISHED),
+        db.func.count(BlogPost.id).filter(BlogPost.status == BlogPostStatus.SCHEDULED),
+        db.func.count(BlogPost.id).filter(BlogPost.status == BlogPostStatus.DRAFT),
+    ).filter(BlogPost.store_id == store_id).one()
+    return {"total": total, "published": published, "scheduled": scheduled, "draft": draft}
+
+
+# Добірка "схожі статті" на сторінці поста змінюється лише з публікацією чи
+# видаленням статей - ті самі записи, що скидають лічильники, тож і кеш
+# спільний ("blog_stats"); година TTL - страховка для переглядів у views.
+BLOG_RELATED_TTL_SECONDS = 3600
+
+
+@lru_cache(maxsize=1024)
+def _related_post_ids(store_id, post_id, category, _time_bucket):
+    """id до трьох схожих статей: з тієї ж категорії, а якщо таких немає -
+    найпопулярніші."""
+    related_ids = []
+    if category:
+        related_ids = db.session.scalars(
+            db.select(BlogPost.id).where(
+                BlogPost.status == BlogPostStatus.PUBLISHED,
+                BlogPost.category == category,
+                BlogPost.store_id == store_id,
+                BlogPost.id != post_id,
+            ).limit(3)
+        ).all()
+    if not related_ids:
+        related_ids = db.session.scalars(
+            db.select(BlogPost.id).where(
+                BlogPost.status == BlogPostStatus.PUBLISHED,
+                BlogPost.store_id == store_id,
+                BlogPost.id != post_id,
+            ).order_by(BlogPost.views.desc()).limit(3)
+        ).all()
+    return tuple(related_ids)
+
+
+register_cache("blog_stats", _blog_stats.cache_clear, _related_post_ids.cache_clear)
+
+
+@blog_bp.after_request
+def _invalidate_stats_after_write(response):
+    # Невдалі запити нічого не записали - кеш не чіпаємо
+    if response.status_code < 400 and request.method in ("POST", "DELETE"):
+        notify_cache_dirty("blog_stats")
+    return response
+
 
 # =====================================================================
 # BLOG ADMIN ROUTES
@@ -41,35 +126,53 @@ blog_bp = Blueprint("blog", __name__)
 @admin_required
 def admin_blog():
     """Список статей блогу."""
-    page = request.args.get("page", 1, type=int)
     status_filter = request.args.get("status", "")
     per_page = 20
 
-    query = BlogPost.query.filter_by(store_id=g.store.id)
+    # Лише колонки, які показує admin/blog.html (+ created_at для курсора):
+    # content/content_en/content_de - це сотні КБ на сторінку, які список
+    # ніколи не читає. Нова колонка в шаблоні = нова колонка тут, інакше
+    # кожен рядок дочитає її окремим SELECT.
+    query = BlogPost.query.options(load_only(
+        BlogPost.id, BlogPost.title, BlogPost.slug, BlogPost.status, BlogPost.author,
+        BlogPost.featured_image, BlogPost.is_ai_generated, BlogPost.tags,
+        BlogPost.publish_date, BlogPost.views, BlogPost.created_at,
+    )).filter_by(store_id=g.store.id)
 
     if status_filter:
         query = query.filter(BlogPost.status == status_filter)
 
-    query = query.order_by(BlogPost.created_at.desc())
+    # Keyset-пагінація (як у b2b_orders) замість paginate(): без COUNT(*)
+    # по всьому списку і без OFFSET, що на далеких сторінках перебирає всі
+    # новіші статті. Курсор "<created_at>,<id>" - остання стаття
+    # попередньої сторінки; +1 рядок показує, чи є наступна.
+    cursor = request.args.get("cursor", "")
+    if cursor:
+        try:
+            cursor_ts, cursor_id = cursor.rsplit(",", 1)
+            query = query.filter(
+                tuple_(BlogPost.created_at, BlogPost.id) < (datetime.fromisoformat(cursor_ts), int(cursor_id))
+            )
+        except ValueError:
+            # Зіпсований курсор - просто показуємо першу сторінку
+            cursor = ""
 
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    posts = pagination.items
+    posts = query.order_by(BlogPost.created_at.desc(), BlogPost.id.desc()).limit(per_page + 1).all()
+    next_cursor = None
+    if len(posts) > per_page:
+        posts = posts[:per_page]
+        last = posts[-1]
+        next_cursor = f"{last.created_at.isoformat()},{last.id}"
 
-    stats = {
-        "total": BlogPost.query.filter_by(store_id=g.store.id).count(),
-        "published": BlogPost.query.filter_by(status=BlogPostStatus.PUBLISHED, store_id=g.store.id).count(),
-        "scheduled": BlogPost.query.filter_by(status=BlogPostStatus.SCHEDULED, store_id=g.store.id).count(),
-        "draft": BlogPost.query.filter_by(status=BlogPostStatus.DRAFT, store_id=g.store.id).count(),
-    }
+    stats = _blog_stats(g.store.id, int(time.time() // BLOG_STATS_TTL_SECONDS))
 
     return render_template(
         "admin/blog.html",
         posts=posts,
-        pagination=pagination,
         stats=stats,
         status_filter=status_filter,
-        page=page,
-        total_pages=pagination.pages,
+        next_cursor=next_cursor,
+        is_first_page=not cursor,
     )
 
 
@@ -83,11 +186,17 @@ def admin_blog_new():
         title = request.form.get("title", "").strip()
         slug = request.form.get("slug", "").strip() or BlogPost.generate_slug(title)
 
-        existing = BlogPost.get_by_slug(slug, store_id=g.store.id)
-        if existing:
-            slug = f"{slug}-{uuid.uuid4().hex[:6]}"
+        if action == "publish":
+            status = BlogPostStatus.PUBLISHED
+            publish_date = datetime.utcnow()
+        else:
+            status = request.form.get("status", BlogPostStatus.DRAFT)
+            try:
+                publish_date = datetime.fromisoformat(request.form.get("publish_date", ""))
+            except ValueError:
+                publish_date = None
 
-        post = BlogPost(
+        post = BlogPost.insert_with_unique_slug(
             store_id=g.store.id,
             title=title,
             slug=slug,
@@ -107,21 +216,9 @@ def admin_blog_new():
             excerpt_de=request.form.get("excerpt_de", "").strip() or None,
             content_en=request.form.get("content_en", "").strip() or None,
             content_de=request.form.get("content_de", "").strip() or None,
+            status=status,
+            publish_date=publish_date,
         )
-
-        if action == "publish":
-            post.status = BlogPostStatus.PUBLISHED
-            post.publish_date = datetime.utcnow()
-        else:
-            post.status = request.form.get("status", BlogPostStatus.DRAFT)
-            publish_date = request.form.get("publish_date", "")
-            if publish_date:
-                try:
-                    post.publish_date = datetime.fromisoformat(publish_date)
-                except ValueError:
-                    pass
-
-        db.session.add(post)
         db.session.commit()
 
         flash(_("✅ Статтю створено!"), "success")
@@ -143,12 +240,14 @@ def admin_blog_edit(id):
 
         new_slug = request.form.get("slug", "").strip() or BlogPost.generate_slug(post.title)
         if new_slug != post.slug:
-            existing = BlogPost.query.filter(
-                BlogPost.slug == new_slug, BlogPost.store_id == g.store.id, BlogPost.id != id
-            ).first()
-            if existing:
-                new_slug = f"{new_slug}-{uuid.uuid4().hex[:6]}"
-            post.slug = new_slug
+            # Оптимістично: пробуємо записати slug у savepoint і лише при
+            # конфлікті з uq_blog_posts_store_slug додаємо суфікс - замість
+            # SELECT-перевірки, яка до того ж не захищала від гонки.
+            try:
+                with db.session.begin_nested():
+                    post.slug = new_slug
+            except IntegrityError:
+                post.slug = f"{new_slug}-{uuid.uuid4().hex[:6]}"
 
         post.excerpt = request.form.get("excerpt", "").strip() or None
         post.content = request.form.get("content", "").strip() or None
@@ -197,13 +296,28 @@ def admin_blog_edit(id):
 @admin_required
 def admin_blog_delete(id):
     """Видалення статті."""
-    post = BlogPost.query.filter_by(id=id, store_id=g.store.id).first_or_404()
+    # Без завантаження статті в сесію: відв'язуємо план (те, що ORM робив
+    # через backref BlogPost.plan) і видаляємо одним DELETE ... RETURNING.
+    db.session.execute(
+        db.update(BlogPlan)
+        .where(BlogPlan.blog_post_id == id, BlogPlan.store_id == g.store.id)
+        .values(blog_post_id=None),
+        execution_options={"synchronize_session": False},
+    )
+    deleted = db.session.execute(
+        db.delete(BlogPost)
+        .where(BlogPost.id == id, BlogPost.store_id == g.store.id)
+        .returning(BlogPost.featured_image),
+        execution_options={"synchronize_session": False},
+    ).first()
+    if deleted is None:
+        db.session.rollback()
+        abort(404)
+    db.session.commit()
 
-    if post.featured_image:
-        delete_old_image(post.featured_image)
+    if deleted.featured_image:
+        delete_old_image(deleted.featured_image)
 
-    db.session.delete(post)
-    db.session.commit()
     flash(_("Статтю видалено."), "info")
     return redirect(url_for(".admin_blog"))
 
@@ -212,12 +326,27 @@ def admin_blog_delete(id):
 @admin_required
 def admin_blog_publish(id):
     """Швидка публікація статті."""
-    post = BlogPost.query.filter_by(id=id, store_id=g.store.id).first_or_404()
-    post.status = BlogPostStatus.PUBLISHED
-    if not post.publish_date or post.publish_date > datetime.utcnow():
-        post.publish_date = datetime.utcnow()
+    # Один UPDATE ... RETURNING title (як _update_alert_or_404 у CRM) замість
+    # SELECT + зміни атрибутів; майбутня дата публікації зсувається на зараз.
+    now = datetime.utcnow()
+    title = db.session.execute(
+        db.update(BlogPost)
+        .where(BlogPost.id == id, BlogPost.store_id == g.store.id)
+        .values(
+            status=BlogPostStatus.PUBLISHED,
+            publish_date=db.case(
+                (db.or_(BlogPost.publish_date.is_(None), BlogPost.publish_date > now), now),
+                else_=BlogPost.publish_date,
+            ),
+        )
+        .returning(BlogPost.title),
+        execution_options={"synchronize_session": False},
+    ).scalar()
+    if title is None:
+        db.session.rollback()
+        abort(404)
     db.session.commit()
-    flash(_("✅ Статтю '%(title)s' опубліковано!") % {"title": post.title}, "success")
+    flash(_("✅ Статтю '%(title)s' опубліковано!") % {"title": title}, "success")
     return redirect(url_for(".admin_blog"))
 
 
@@ -225,8 +354,6 @@ def admin_blog_publish(id):
 @admin_required
 def admin_blog_plan():
     """План публікацій на 7 днів."""
-    from datetime import timedelta
-
     if request.method == "POST":
         topics_list = []
         target_audience = request.form.get("target_audience", "")
@@ -243,8 +370,8 @@ def admin_blog_plan():
                 })
 
         if topics_list:
-            BlogPlan.create_weekly_plan(topics_list, store_id=g.store.id)
-            flash(_("✅ Створено план на %(count)s днів!") % {"count": len(topics_list)}, "success")
+            plans = BlogPlan.create_weekly_plan(topics_list, store_id=g.store.id)
+            flash(_("✅ Створено план на %(count)s днів!") % {"count": len(plans)}, "success")
         else:
             flash(_("Введіть хоча б одну тему."), "warning")
 
@@ -253,10 +380,25 @@ def admin_blog_plan():
     today = date_cls.today()
     week_days = []
     day_names = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд"]
+    dates = [today + timedelta(days=i) for i in range(7)]
 
-    for i in range(7):
-        current_date = today + timedelta(days=i)
-        plan = BlogPlan.query.filter_by(plan_date=current_date, store_id=g.store.id).first()
+    # Плани створюються від сьогодні вперед, тож 30 найпізніших зазвичай уже
+    # містять увесь тиждень - тоді обидва блоки сторінки будуються з одного
+    # запиту. Окремий IN-запит по 7 датах - лише якщо список їх не покрив
+    # (раніше тут було 7 запитів, по одному на день).
+    all_plans = BlogPlan.query.filter_by(store_id=g.store.id).order_by(BlogPlan.plan_date.desc()).limit(30).all()
+    if len(all_plans) == 30 and all_plans[-1].plan_date > today:
+        week_plans = BlogPlan.query.filter(
+            BlogPlan.store_id == g.store.id, BlogPlan.plan_date.in_(dates)
+        ).all()
+    else:
+        week_plans = all_plans
+    plans_by_date = {}
+    for plan in week_plans:
+        plans_by_date.setdefault(plan.plan_date, plan)
+
+    for current_date in dates:
+        plan = plans_by_date.get(current_date)
 
         week_days.append({
             "date": current_date,
@@ -266,12 +408,18 @@ def admin_blog_plan():
             "plan": plan,
         })
 
-    all_plans = BlogPlan.query.filter_by(store_id=g.store.id).order_by(BlogPlan.plan_date.desc()).limit(30).all()
+    open_batch_ids = db.session.scalars(
+        db.select(BlogPlan.batch_id)
+        .where(BlogPlan.store_id == g.store.id, BlogPlan.batch_id.is_not(None))
+        .distinct()
+    ).all()
 
     return render_template(
         "admin/blog_plan.html",
         week_days=week_days,
         all_plans=all_plans,
+        open_batch_ids=open_batch_ids,
+        generation_timeout_ms=int(BlogPlan.GENERATION_TIMEOUT.total_seconds() * 1000),
     )
 
 
@@ -294,12 +442,12 @@ def api_blog_generate():
     if not topic:
         return jsonify({"error": _("Тема обов'язкова")}), 400
 
-    ai_settings = AISettings.get_or_create(g.store.id)
+    ai_settings = AISettings.get_cached(g.store.id)
 
     try:
         prompt = ai_settings.get_blogger_prompt(topic, keywords)
 
-        response = openai_client.chat.completions.create(
+        completion = dict(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": f"""Ти - досвідчений контент-райтер та SEO-спеціаліст.
@@ -322,64 +470,204 @@ def api_blog_generate():
             temperature=0.7,
         )
 
-        content = response.choices[0].message.content
+        if _wants_event_stream():
+            return _event_stream(_generate_article_events(openai_client, completion, topic))
 
-        import json
-        try:
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-
-            result = json.loads(content.strip())
-            result["success"] = True
-            return jsonify(result)
-        except json.JSONDecodeError:
-            return jsonify({
-                "success": True,
-                "title": topic,
-                "content": content,
-                "excerpt": content[:200] if content else "",
-            })
+        response = openai_client.chat.completions.create(**completion)
+        result = _parse_ai_article(response.choices[0].message.content, topic)
+        result["success"] = True
+        return jsonify(result)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-def _generate_post_from_plan(plan):
-    """
-    Генерує BlogPost з BlogPlan через OpenAI (текст + SEO meta + опційно
-    зображення й автопереклад). Викликається і з адмін-роута (клік
-    адміна), і з фонового планувальника (_run_blog_automation нижче) -
-    працює виключно з plan.store_id, без залежності від g.store/request,
-    тож придатна для виклику поза HTTP-запитом (лише в app-контексті).
-    """
-    openai_client = get_openai_client()
-    if not OPENAI_AVAILABLE or not openai_client:
-        raise RuntimeError("AI не налаштовано")
+# Довгі відповіді моделі (стаття, переклад з HTML) редактор може отримувати
+# потоком Server-Sent Events: перші токени з'являються за секунду-дві замість
+# очікування всієї відповіді. Клієнт просить потік заголовком
+# Accept: text/event-stream; скрипти без нього отримують звичайний JSON.
 
-    store_id = plan.store_id
+def _wants_event_stream():
+    return request.accept_mimetypes.best == "text/event-stream"
 
-    old_post = None
-    if plan.blog_post_id:
-        old_post = BlogPost.query.get(plan.blog_post_id)
-        if old_post and old_post.featured_image:
-            current_app.logger.info(f"🔄 Regenerating post, will delete old image: {old_post.featured_image}")
 
-    if plan.status != "pending":
-        raise ValueError("План вже оброблено")
+def _sse(payload):
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
 
-    ai_settings = AISettings.get_or_create(store_id)
 
-    topic = plan.topic
+def _event_stream(events):
+    # X-Accel-Buffering - щоб nginx не збирав потік у буфер
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _iter_deltas(stream):
+    """Шматки тексту з потокової відповіді chat.completions (stream=True)."""
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield delta
+
+
+def _generate_article_events(openai_client, completion, topic):
+    """SSE-потік для api_blog_generate: {"delta"} по мірі генерації, в кінці -
+    розібрана стаття (як у JSON-відповіді) або {"error"}."""
+    try:
+        parts = []
+        for delta in _iter_deltas(openai_client.chat.completions.create(**completion, stream=True)):
+            parts.append(delta)
+            yield _sse({"delta": delta})
+        result = _parse_ai_article("".join(parts), topic)
+        result["success"] = True
+        yield _sse(result)
+    except Exception as e:
+        yield _sse({"error": str(e)})
+
+
+# Модель часто загортає JSON у ```json ... ``` (інколи з текстом до/після) -
+# беремо вміст першого блоку одним проходом регулярки замість ланцюжка split()
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.S)
+
+
+def _parse_ai_article(content, topic):
+    """Розбирає відповідь моделі зі статтею (JSON з title/content/excerpt/...).
+    Якщо це не JSON - уся відповідь стає текстом статті з темою як заголовком."""
+    content = content or ""
+    fence = _JSON_FENCE_RE.search(content)
+    if fence:
+        content = fence.group(1)
+    try:
+        return json.loads(content.strip())
+    except json.JSONDecodeError:
+        return {
+            "title": topic,
+            "content": content,
+            "excerpt": content[:200],
+        }
+
+
+# Переклад - механічна задача: gpt-4o-mini дешевший і швидший за
+# gpt-3.5-turbo. Ліміт відповіді рахуємо від довжини статті, а не фіксовані
+# 3500: OpenAI резервує під max_tokens ліміт TPM (і наш TokenBucket теж), а
+# довгу статтю фіксований ліміт обрізав би посеред JSON.
+TRANSLATION_MODEL = "gpt-4o-mini"
+TRANSLATION_MAX_TOKENS = 16384  # максимум відповіді gpt-4o-mini
+
+
+def _translation_max_tokens(payload):
+    # Переклад приблизно тієї ж довжини, що й оригінал, плюс запас на
+    # німецьку (довші слова) і HTML-теги, що дробляться на дрібні токени
+    return min(int(len(payload) / CHARS_PER_TOKEN * 1.5) + 200, TRANSLATION_MAX_TOKENS)
+
+
+def _translate_article(openai_client, title, excerpt, content, lang, on_delta=None):
+    """Переклад статті з української на lang (en/de) одним запитом у JSON-режимі:
+    повертає dict з title/excerpt/content. Раніше кожне поле йшло окремим
+    запитом - три виклики й тричі той самий контекст на мову. Викликається з
+    потоків (_generate_post_from_plan, api_blog_translate) - лише мережевий
+    виклик, без БД. З on_delta відповідь читається потоком, і кожен шматок
+    тексту передається в on_delta."""
+    lang_name = "English" if lang == "en" else "German"
+    payload = json.dumps(
+        {"title": title, "excerpt": excerpt or "", "content": content or ""},
+        ensure_ascii=False,
+    )
+    response = limited_chat_completion(
+        openai_client,
+        model=TRANSLATION_MODEL,
+        messages=[
+            {"role": "system", "content": (
+                f"Translate the values of this JSON object from Ukrainian to {lang_name}. "
+                "Keep all HTML tags in content. "
+                'Return strict JSON with keys "title", "excerpt", "content".'
+            )},
+            {"role": "user", "content": payload},
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=_translation_max_tokens(payload),
+        temperature=0.3,
+        stream=on_delta is not None,
+    )
+    if on_delta is None:
+        raw = response.choices[0].message.content
+    else:
+        parts = []
+        for delta in _iter_deltas(response):
+            parts.append(delta)
+            on_delta(delta)
+        raw = "".join(parts)
+    translated = json.loads(raw)
+    return {
+        field: (translated.get(field) or "").strip()
+        for field in ("title", "excerpt", "content")
+    }
+
+
+def _generate_featured_image(openai_client, image_style, title, excerpt, dest_path):
+    """Промпт для DALL-E, генерація і завантаження обкладинки статті у файл
+    dest_path. Повертає True, якщо файл записано. Лише мережа і файл, без БД
+    (і без ORM-об'єктів - функція виконується в іншому потоці)."""
+
+    image_prompt_response = limited_chat_completion(
+        openai_client,
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": f"""Ти - експерт з створення промптів для генерації зображень.
+Створи короткий промпт (до 200 символів) англійською мовою для DALL-E, щоб згенерувати реалістичне фото для статті блогу.
+Промпт має описувати:
+- Головний об'єкт/сцену що відповідає темі
+- Стиль: {image_style}
+- Світло та композицію
+Відповідай ТІЛЬКИ промптом, без додаткового тексту."""},
+            {"role": "user", "content": f"Тема статті: {title}\n\nКороткий опис: {(excerpt or '')[:200]}"},
+        ],
+        max_tokens=100,
+        temperature=0.7,
+    )
+
+    image_prompt = image_prompt_response.choices[0].message.content.strip()
+
+    image_response = limited_image_generation(
+        openai_client,
+        model="dall-e-3",
+        prompt=image_prompt,
+        size="1792x1024",
+        quality="standard",
+        n=1,
+    )
+
+    image_url = image_response.data[0].url
+
+    # PNG 1792x1024 - кілька МБ: пишемо у файл частинами по мірі
+    # завантаження, а не тримаємо весь буфер response.content у пам'яті.
+    with requests.get(image_url, timeout=30, stream=True) as img_response:
+        if img_response.status_code != 200:
+            return False
+        try:
+            with open(dest_path, "wb") as f:
+                for chunk in img_response.iter_content(chunk_size=IMAGE_DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+        except Exception:
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            raise
+    return True
+
+
+def _plan_article_request(ai_settings, plan):
+    """Параметри chat.completions-запиту тексту статті за планом - спільні
+    для прямого виклику (_generate_post_from_plan) і рядка Batch API."""
     keywords = plan.keywords or ""
 
     if plan.additional_instructions:
         keywords += f"\n\nДодаткові інструкції: {plan.additional_instructions}"
 
-    prompt = ai_settings.get_blogger_prompt(topic, keywords)
+    prompt = ai_settings.get_blogger_prompt(plan.topic, keywords)
 
-    response = openai_client.chat.completions.create(
+    return dict(
         model="gpt-3.5-turbo",
         messages=[
             {"role": "system", "content": f"""Ти - досвідчений контент-райтер та SEO-спеціаліст.
@@ -402,100 +690,132 @@ def _generate_post_from_plan(plan):
         temperature=0.7,
     )
 
-    content = response.choices[0].message.content
-
-    import json
-    try:
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
-
-        result = json.loads(content.strip())
-    except json.JSONDecodeError:
-        result = {
-            "title": topic,
-            "content": content,
-            "excerpt": content[:200] if content else "",
-        }
-
-    featured_image_url = None
-    if ai_settings.generate_images:
-        try:
-            image_style = ai_settings.image_style or "professional photography, realistic, high quality"
-
-            image_prompt_response = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": f"""Ти - експерт з створення промптів для генерації зображень.
-Створи короткий промпт (до 200 символів) англійською мовою для DALL-E, щоб згенерувати реалістичне фото для статті блогу.
-Промпт має описувати:
-- Головний об'єкт/сцену що відповідає темі
-- Стиль: {image_style}
-- Світло та композицію
-Відповідай ТІЛЬКИ промптом, без додаткового тексту."""},
-                    {"role": "user", "content": f"Тема статті: {result.get('title', topic)}\n\nКороткий опис: {result.get('excerpt', '')[:200]}"},
-                ],
-                max_tokens=100,
-                temperature=0.7,
-            )
 
-            image_prompt = image_prompt_response.choices[0].message.content.strip()
-            print(f"🎨 Генерую зображення: {image_prompt[:80]}...")
-
-            image_response = openai_client.images.generate(
-                model="dall-e-3",
-                prompt=image_prompt,
-                size="1792x1024",
-                quality="standard",
-                n=1,
-            )
+def _generate_post_from_plan(plan, article_content=None):
+    """
+    Генерує BlogPost з BlogPlan через OpenAI (текст + SEO meta + опційно
+    зображення й автопереклад). Викликається і з адмін-роута (клік
+    адміна), і з фонового планувальника (_run_blog_automation нижче) -
+    працює виключно з plan.store_id, без залежності від g.store/request,
+    тож придатна для виклику поза HTTP-запитом (лише в app-контексті).
 
-            image_url = image_response.data[0].url
+    article_content - вже згенерована відповідь моделі з текстом статті
+    (результат Batch API); тоді запит тексту пропускається.
+    """
+    openai_client = get_openai_client()
+    if not OPENAI_AVAILABLE or not openai_client:
+        raise RuntimeError("AI не налаштовано")
 
-            import requests as req
-            img_response = req.get(image_url, timeout=30)
-            if img_response.status_code == 200:
-                from models.product import Image
+    store_id = plan.store_id
 
-                image_filename = f"blog_{uuid.uuid4().hex}.png"
+    old_post = None
+    if plan.blog_post_id:
+        old_post = BlogPost.query.get(plan.blog_post_id)
+        if old_post and old_post.featured_image:
+            current_app.logger.info(f"🔄 Regenerating post, will delete old image: {old_post.featured_image}")
 
-                if current_app.config["IMAGE_STORAGE"] == "database":
-                    image_data = img_response.content
+    if plan.status != "processing":
+        raise ValueError("План не взято в генерацію (BlogPlan.claim_for_generation)")
 
-                    existing_image = Image.query.filter_by(filename=image_filename).first()
-                    if not existing_image:
-                        new_image = Image(
-                            store_id=store_id,
-                            filename=image_filename,
-                            data=image_data,
-                            mime_type='image/png',
-                            size=len(image_data)
-                        )
-                        db.session.add(new_image)
-                        db.session.commit()
-                        print(f"💾 Зображення збережено в БД: {image_filename} ({len(image_data)} bytes)")
+    ai_settings = AISettings.get_cached(store_id)
 
-                    featured_image_url = f"/images/{image_filename}"
-                else:
-                    image_path = os.path.join(current_app.config['UPLOAD_FOLDER'], image_filename)
+    topic = plan.topic
 
-                    with open(image_path, 'wb') as f:
-                        f.write(img_response.content)
+    if article_content is None:
+        response = limited_chat_completion(openai_client, **_plan_article_request(ai_settings, plan))
+        article_content = response.choices[0].message.content
 
-                    featured_image_url = f"/static/uploads/{image_filename}"
+    result = _parse_ai_article(article_content, topic)
 
-                print(f"✅ Зображення збережено: {featured_image_url}")
+    # Зображення (промпт + DALL-E + завантаження) і переклади залежать лише
+    # від згенерованого тексту, тож усі ці мережеві виклики йдуть паралельно
+    # в потоках: генерація займає стільки, скільки найдовший з них, а не
+    # суму (раніше - до 8 послідовних запитів до OpenAI).
+    title = result.get("title", topic)
+    translate_languages = []
+    if ai_settings.auto_translate:
+        translate_languages = [
+            lang.strip() for lang in (ai_settings.auto_translate_languages or "en,de").split(",")
+            if lang.strip() in ("en", "de")
+        ]
+
+    # Обкладинка завантажується одразу у файл: у UPLOAD_FOLDER, або, якщо
+    # зображення зберігаються в БД, у тимчасовий файл.
+    image_filename = f"blog_{uuid.uuid4().hex}.png"
+    store_images_in_db = current_app.config["IMAGE_STORAGE"] == "database"
+    image_path = None
+    if ai_settings.generate_images:
+        if store_images_in_db:
+            image_fd, image_path = tempfile.mkstemp(suffix=".png")
+            os.close(image_fd)
+        else:
+            image_path = os.path.join(current_app.config['UPLOAD_FOLDER'], image_filename)
+
+    with ThreadPoolExecutor(max_workers=BLOG_AI_WORKERS, thread_name_prefix="blog-ai") as executor:
+        image_future = (
+            executor.submit(
+                _generate_featured_image,
+                openai_client,
+                ai_settings.image_style or "professional photography, realistic, high quality",
+                title,
+                result.get("excerpt", ""),
+                image_path,
+            )
+            if ai_settings.generate_images else None
+        )
+        translation_futures = {
+            lang: executor.submit(
+                _translate_article,
+                openai_client,
+                title,
+                result.get("excerpt", ""),
+                result.get("content", ""),
+                lang,
+            )
+            for lang in translate_languages
+        }
 
-        except Exception as img_error:
-            print(f"⚠️ Помилка генерації зображення: {img_error}")
+    featured_image_url = None
+    try:
+        if image_future is not None and image_future.result():
+            if store_images_in_db:
+                # Один bytes-буфер на INSERT (без ORM-об'єкта в сесії);
+                # ім'я файлу - свіжий uuid, перевірка на існування зайва.
+                # Комітиться разом зі статтею.
+                with open(image_path, "rb") as f:
+                    image_data = f.read()
+                db.session.execute(db.insert(Image).values(
+                    store_id=store_id,
+                    filename=image_filename,
+                    data=image_data,
+                    mime_type='image/png',
+                    size=len(image_data),
+                ))
+                current_app.logger.info("💾 Зображення збережено в БД: %s (%s bytes)", image_filename, len(image_data))
+                del image_data
+
+                featured_image_url = f"/images/{image_filename}"
+            else:
+                featured_image_url = f"/static/uploads/{image_filename}"
+
+            current_app.logger.info("✅ Зображення збережено: %s", featured_image_url)
+
+    except Exception as img_error:
+        current_app.logger.warning("⚠️ Помилка генерації зображення: %s", img_error, exc_info=True)
+    finally:
+        if store_images_in_db and image_path and os.path.exists(image_path):
+            os.remove(image_path)
+
+    translations = {}
+    for lang, future in translation_futures.items():
+        try:
+            translations[lang] = future.result()
+        except Exception as translate_error:
+            current_app.logger.warning("Auto-translate error (%s): %s", lang, translate_error, exc_info=True)
 
-    slug = BlogPost.generate_slug(result.get("title", topic))
-    existing = BlogPost.get_by_slug(slug, store_id=store_id)
-    if existing:
-        slug = f"{slug}-{uuid.uuid4().hex[:6]}"
+    slug = BlogPost.generate_slug(title)
 
-    publish_datetime = datetime.combine(plan.plan_date, datetime.strptime(ai_settings.publish_time, "%H:%M").time())
+    publish_datetime = datetime.combine(plan.plan_date, ai_settings.publish_time_parsed)
 
     if ai_settings.auto_publish:
         if publish_datetime <= datetime.utcnow():
@@ -505,9 +825,14 @@ def _generate_post_from_plan(plan):
     else:
         post_status = BlogPostStatus.DRAFT
 
-    post = BlogPost(
+    translated_fields = {}
+    for lang, fields in translations.items():
+        for field, value in fields.items():
+            translated_fields[f"{field}_{lang}"] = value
+
+    post = BlogPost.insert_with_unique_slug(
         store_id=store_id,
-        title=result.get("title", topic),
+        title=title,
         slug=slug,
         excerpt=result.get("excerpt", ""),
         content=result.get("content", ""),
@@ -521,110 +846,258 @@ def _generate_post_from_plan(plan):
         ai_topic=topic,
         blog_plan_id=plan.id,
         author=ai_settings.blogger_name or "AI",
+        **translated_fields,
     )
-    db.session.add(post)
-    db.session.flush()
 
     if old_post and old_post.featured_image and featured_image_url:
         delete_old_image(old_post.featured_image)
 
     plan.status = "generated"
+    plan.generation_started_at = None
     plan.blog_post_id = post.id
 
     db.session.commit()
 
-    if ai_settings.auto_translate:
-        try:
-            translate_languages = (ai_settings.auto_translate_languages or "en,de").split(",")
-            for lang in translate_languages:
-                lang = lang.strip()
-                if lang not in ["en", "de"]:
-                    continue
+    return post
 
-                lang_name = "English" if lang == "en" else "German"
 
-                title_resp = openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": f"Translate from Ukrainian to {lang_name}. Return ONLY translated text."},
-                        {"role": "user", "content": post.title},
-                    ],
-                    max_tokens=200,
-                    temperature=0.3,
-                )
+def _generate_plan_safely(plan_id, article_content=None):
+    """Генерує статтю з уже взятого плану; при помилці повертає план у
+    pending. Повертає BlogPost або None."""
+    plan = db.session.get(BlogPlan, plan_id)
+    if plan is None:
+        return None
+    try:
+        return _generate_post_from_plan(plan, article_content)
+    except Exception as e:
+        db.session.rollback()
+        BlogPlan.release_after_failure(plan_id)
+        current_app.logger.warning(f"Blog generation failed for plan #{plan_id}: {e}")
+        return None
 
-                excerpt_resp = openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": f"Translate from Ukrainian to {lang_name}. Return ONLY translated text."},
-                        {"role": "user", "content": post.excerpt or ""},
-                    ],
-                    max_tokens=300,
-                    temperature=0.3,
-                )
 
-                content_resp = openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": f"Translate this HTML content from Ukrainian to {lang_name}. Keep all HTML tags. Return ONLY translated HTML."},
-                        {"role": "user", "content": post.content or ""},
-                    ],
-                    max_tokens=3000,
-                    temperature=0.3,
-                )
+def _start_plan_generation(plan_ids, articles=None):
+    """Запускає генерацію статей з планів plan_ids (вже взятих через
+    BlogPlan.claim_for_generation) у фоновому потоці.
 
-                if lang == "en":
-                    post.title_en = title_resp.choices[0].message.content.strip()
-                    post.excerpt_en = excerpt_resp.choices[0].message.content.strip()
-                    post.content_en = content_resp.choices[0].message.content.strip()
-                elif lang == "de":
-                    post.title_de = title_resp.choices[0].message.content.strip()
-                    post.excerpt_de = excerpt_resp.choices[0].message.content.strip()
-                    post.content_de = content_resp.choices[0].message.content.strip()
+    Генерація - це кілька запитів до OpenAI (текст, обкладинка, переклади),
+    десятки секунд; раніше вона йшла прямо в обробнику і займала
+    gunicorn-воркер. Той самий підхід Thread + app object, що й
+    services/crm_daily_check.py; прогрес адмінка бачить за статусом плану
+    (api_blog_plan_status).
 
-            db.session.commit()
-        except Exception as translate_error:
-            print(f"Auto-translate error: {translate_error}")
+    articles - {plan_id: готова відповідь моделі з текстом} для планів,
+    текст яких уже згенеровано пакетом (_collect_plan_batch)."""
+    app = current_app._get_current_object()
+    Thread(target=_generate_plans_in_background, args=(app, plan_ids, articles or {}), daemon=True).start()
 
-    return post
+
+def _generate_plans_in_background(app, plan_ids, articles):
+    # Плани незалежні - до BLOG_PLAN_WORKERS одночасно, кожен у своєму
+    # потоці зі своїм app context і сесією; комміт - по кожному плану, бо
+    # адмінка опитує статус кожного окремо.
+    with ThreadPoolExecutor(max_workers=BLOG_PLAN_WORKERS, thread_name_prefix="blog-plan") as executor:
+        for plan_id in plan_ids:
+            executor.submit(_generate_plan_in_app_context, app, plan_id, articles.get(plan_id))
+
+
+def _generate_plan_in_app_context(app, plan_id, article_content=None):
+    with app.app_context():
+        try:
+            post = _generate_plan_safely(plan_id, article_content)
+            if post is not None:
+                app.logger.info(f"Generated blog post #{post.id} from plan #{plan_id}")
+                notify_cache_dirty("blog_stats")
+        except Exception as e:
+            app.logger.error(f"Blog generation thread failed for plan #{plan_id}: {e}")
+        finally:
+            db.session.remove()
 
 
 @blog_bp.route("/api/blog/generate-from-plan/<int:plan_id>", methods=["POST"])
 @admin_required
 def api_blog_generate_from_plan(plan_id):
-    """Генерація статті з плану (ручний запуск адміном)."""
+    """Генерація статті з плану (ручний запуск адміном) - у фоні; адмінка
+    опитує /api/blog/plan/<id>/status."""
+    if not OPENAI_AVAILABLE or not get_openai_client():
+        return jsonify({"error": _("AI не налаштовано")}), 400
     plan = BlogPlan.query.filter_by(id=plan_id, store_id=g.store.id).first_or_404()
-    if plan.status != "pending":
+    if not BlogPlan.claim_for_generation(plan.id, store_id=g.store.id):
         return jsonify({"error": _("План вже оброблено")}), 400
-    try:
-        post = _generate_post_from_plan(plan)
-        return jsonify({"success": True, "post_id": post.id})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": str(e)}), 500
+    _start_plan_generation([plan.id])
+    return jsonify({"success": True, "status": "processing"}), 202
 
 
 @blog_bp.route("/api/blog/generate-all-pending", methods=["POST"])
 @admin_required
 def api_blog_generate_all_pending():
-    """Генерація всіх pending статей."""
+    """Генерація всіх pending статей - у фоні, до BLOG_PLAN_WORKERS одночасно."""
+    if not OPENAI_AVAILABLE or not get_openai_client():
+        return jsonify({"error": _("AI не налаштовано")}), 400
     pending_plans = BlogPlan.get_pending_for_date(store_id=g.store.id)
-    generated = 0
+    claimed = BlogPlan.claim_many_for_generation([plan.id for plan in pending_plans], store_id=g.store.id)
+    plan_ids = [plan.id for plan in pending_plans if plan.id in claimed]
+    if plan_ids:
+        _start_plan_generation(plan_ids)
+    return jsonify({"success": True, "queued": len(plan_ids)}), 202
+
+
+@blog_bp.route("/api/blog/plan/<int:plan_id>/status")
+@admin_required
+def api_blog_plan_status(plan_id):
+    """Статус генерації плану для опитування з адмінки."""
+    status, post_id = db.session.query(BlogPlan.status, BlogPlan.blog_post_id).filter(
+        BlogPlan.id == plan_id, BlogPlan.store_id == g.store.id
+    ).first_or_404()
+    return jsonify({"status": status, "post_id": post_id})
+
+
+def _submit_plan_batch(store_id, plans):
+    """Відправляє запити тексту статей для планів plans (вже взятих через
+    BlogPlan.claim_for_generation) одним пакетом OpenAI Batch API.
+
+    Пакет обробляється до 24 год за половину ціни токенів - для "згенерувати
+    всі pending", де ніхто не чекає на кожну статтю окремо. Обкладинка й
+    переклади залежать від готового тексту, тож їх робить уже
+    _collect_plan_batch звичайним шляхом. Повертає id пакета."""
+    openai_client = get_openai_client()
+    ai_settings = AISettings.get_cached(store_id)
+    lines = [
+        json.dumps({
+            "custom_id": f"plan-{plan.id}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _plan_article_request(ai_settings, plan),
+        }, ensure_ascii=False)
+        for plan in plans
+    ]
+    plan_ids = [plan.id for plan in plans]
+    try:
+        batch_file = openai_client.files.create(
+            file=("blog_plans.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = openai_client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={"store_id": str(store_id)},
+        )
+    except Exception:
+        for plan_id in plan_ids:
+            BlogPlan.release_after_failure(plan_id)
+        raise
+    BlogPlan.attach_batch(plan_ids, batch.id)
+    return batch.id
 
-    for plan in pending_plans:
-        try:
-            with current_app.test_client() as client:
-                response = client.post(
-                    f"/api/blog/generate-from-plan/{plan.id}",
-                    headers={"Cookie": request.headers.get("Cookie", "")},
-                )
-                if response.status_code == 200:
-                    generated += 1
-        except Exception as e:
-            print(f"Error generating plan {plan.id}: {e}")
-            continue
 
-    return jsonify({"success": True, "generated": generated})
+# Пакет більше не зміниться - результати (які є) можна забирати
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def _collect_plan_batch(batch_id):
+    """Перевіряє пакет batch_id і, якщо він завершився, запускає дописування
+    статей (обкладинка, переклади, збереження) з готовими текстами; плани
+    без результату повертаються в pending. Повертає об'єкт batch OpenAI.
+
+    Викликається з опитування адмінки і з планувальника - плани забирає
+    атомарно BlogPlan.take_batch, тож статті не згенеруються двічі."""
+    openai_client = get_openai_client()
+    batch = openai_client.batches.retrieve(batch_id)
+    if batch.status not in BATCH_FINAL_STATUSES:
+        return batch
+
+    articles = {}
+    # expired/cancelled теж можуть мати частину готових відповідей
+    if batch.output_file_id:
+        output = openai_client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            plan_id = int(item["custom_id"].split("-", 1)[1])
+            articles[plan_id] = response["body"]["choices"][0]["message"]["content"]
+
+    plan_ids = BlogPlan.take_batch(batch_id)
+    ready = [plan_id for plan_id in plan_ids if plan_id in articles]
+    for plan_id in plan_ids:
+        if plan_id not in articles:
+            BlogPlan.release_after_failure(plan_id)
+    if ready:
+        _start_plan_generation(ready, articles)
+    current_app.logger.info(
+        f"Blog batch {batch_id} {batch.status}: {len(ready)} article(s) ready, "
+        f"{len(plan_ids) - len(ready)} plan(s) returned to pending"
+    )
+    return batch
+
+
+@blog_bp.route("/api/blog/generate-all-pending-batch", methods=["POST"])
+@admin_required
+def api_blog_generate_all_pending_batch():
+    """Генерація всіх pending статей через OpenAI Batch API (дешевше, до 24 год)."""
+    if not OPENAI_AVAILABLE or not get_openai_client():
+        return jsonify({"error": _("AI не налаштовано")}), 400
+    pending_plans = BlogPlan.get_pending_for_date(store_id=g.store.id)
+    claimed = BlogPlan.claim_many_for_generation([plan.id for plan in pending_plans], store_id=g.store.id)
+    plans = [plan for plan in pending_plans if plan.id in claimed]
+    if not plans:
+        return jsonify({"success": True, "queued": 0})
+    try:
+        batch_id = _submit_plan_batch(g.store.id, plans)
+    except Exception as e:
+        current_app.logger.error(f"Blog batch submission failed: {e}")
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"success": True, "queued": len(plans), "batch_id": batch_id}), 202
+
+
+@blog_bp.route("/api/blog/batch-status/<batch_id>")
+@admin_required
+def api_blog_batch_status(batch_id):
+    """Стан пакета Batch API; завершений пакет одразу забирається."""
+    if not db.session.query(
+        BlogPlan.query.filter_by(batch_id=batch_id, store_id=g.store.id).exists()
+    ).scalar():
+        abort(404)
+    try:
+        batch = _collect_plan_batch(batch_id)
+    except Exception as e:
+        current_app.logger.warning(f"Blog batch {batch_id} status check failed: {e}")
+        return jsonify({"error": str(e)}), 502
+    counts = batch.request_counts
+    return jsonify({
+        "status": batch.status,
+        "completed": counts.completed if counts else 0,
+        "failed": counts.failed if counts else 0,
+        "total": counts.total if counts else 0,
+    })
+
+
+def _publish_due_posts(store_id=None):
+    """Публікує scheduled пости, час яких настав (усіх магазинів, якщо
+    store_id не задано), і повертає їхні заголовки.
+
+    Один UPDATE ... RETURNING замість завантаження постів і окремого
+    UPDATE на кожен при flush-і. Рядки вибираються з FOR UPDATE SKIP
+    LOCKED: якщо паралельно публікує інший воркер (кнопка + планувальник),
+    його пости пропускаються, а не чекають на блокування рядка, і кожен
+    пост публікується й логується рівно одним викликом. Не комітить."""
+    due = db.select(BlogPost.id).where(
+        BlogPost.status == BlogPostStatus.SCHEDULED,
+        BlogPost.publish_date <= datetime.utcnow(),
+    )
+    if store_id is not None:
+        due = due.where(BlogPost.store_id == store_id)
+    return db.session.scalars(
+        db.update(BlogPost)
+        .where(BlogPost.id.in_(due.with_for_update(skip_locked=True)))
+        .values(status=BlogPostStatus.PUBLISHED)
+        .returning(BlogPost.title),
+        execution_options={"synchronize_session": False},
+    ).all()
 
 
 @blog_bp.route("/api/blog/auto-publish", methods=["POST"])
@@ -632,20 +1105,12 @@ def api_blog_generate_all_pending():
 def api_blog_auto_publish():
     """Автоматична публікація scheduled постів, час яких настав."""
     try:
-        scheduled_posts = BlogPost.query.filter(
-            BlogPost.status == BlogPostStatus.SCHEDULED,
-            BlogPost.publish_date <= datetime.utcnow(),
-            BlogPost.store_id == g.store.id,
-        ).all()
-
-        published_count = 0
-        for post in scheduled_posts:
-            post.status = BlogPostStatus.PUBLISHED
-            published_count += 1
-            current_app.logger.info(f"📰 Auto-published: {post.title}")
+        titles = _publish_due_posts(g.store.id)
+        db.session.commit()
 
-        if published_count > 0:
-            db.session.commit()
+        published_count = len(titles)
+        for title in titles:
+            current_app.logger.info(f"📰 Auto-published: {title}")
 
         return jsonify({
             "success": True,
@@ -653,6 +1118,7 @@ def api_blog_auto_publish():
             "message": f"Опубліковано {published_count} статей"
         })
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
 
@@ -676,80 +1142,113 @@ def api_blog_translate(post_id):
 
     post = BlogPost.query.filter_by(id=post_id, store_id=g.store.id).first_or_404()
     data = request.get_json() or {}
-    languages = data.get("languages", ["en", "de"])
+    languages = [lang for lang in dict.fromkeys(data.get("languages", ["en", "de"])) if lang in ("en", "de")]
 
     if not post.title or not post.content:
         return jsonify({"error": _("Стаття не має контенту для перекладу")}), 400
 
-    translated = {}
-
-    try:
-        for lang in languages:
-            if lang not in ["en", "de"]:
-                continue
+    # Мову, переклад якої вже є, вдруге не перекладаємо (повторний клік,
+    # retry) - лише з "force": true, наприклад після правок оригіналу.
+    skipped = []
+    if not data.get("force"):
+        skipped = [
+            lang for lang in languages
+            if getattr(post, f"title_{lang}") and getattr(post, f"content_{lang}")
+        ]
+        languages = [lang for lang in languages if lang not in skipped]
+    if not languages:
+        return jsonify({
+            "success": True,
+            "translated": {},
+            "skipped": skipped,
+            "message": "Переклад уже є",
+        })
 
-            lang_name = "English" if lang == "en" else "German"
+    if _wants_event_stream():
+        return _event_stream(_translate_post_events(openai_client, post, languages, skipped))
 
-            title_response = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": f"You are a professional translator. Translate the following text from Ukrainian to {lang_name}. Keep the same style and tone. Return ONLY the translated text, nothing else."},
-                    {"role": "user", "content": post.title},
-                ],
-                max_tokens=200,
-                temperature=0.3,
-            )
-            translated_title = title_response.choices[0].message.content.strip()
-
-            translated_excerpt = None
-            if post.excerpt:
-                excerpt_response = openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": f"You are a professional translator. Translate the following text from Ukrainian to {lang_name}. Keep the same style and tone. Return ONLY the translated text, nothing else."},
-                        {"role": "user", "content": post.excerpt},
-                    ],
-                    max_tokens=300,
-                    temperature=0.3,
+    try:
+        # Мови незалежні - по одному запиту на мову паралельно в потоках, як у
+        # _generate_post_from_plan: відповідь за час найдовшого запиту.
+        with ThreadPoolExecutor(max_workers=BLOG_AI_WORKERS, thread_name_prefix="blog-ai") as executor:
+            futures = {
+                lang: executor.submit(
+                    _translate_article, openai_client, post.title, post.excerpt, post.content, lang
                 )
-                translated_excerpt = excerpt_response.choices[0].message.content.strip()
-
-            content_response = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": f"You are a professional translator. Translate the following HTML content from Ukrainian to {lang_name}. Keep all HTML tags intact. Maintain the same formatting and structure. Return ONLY the translated HTML, nothing else."},
-                    {"role": "user", "content": post.content},
-                ],
-                max_tokens=3000,
-                temperature=0.3,
-            )
-            translated_content = content_response.choices[0].message.content.strip()
-
-            if lang == "en":
-                post.title_en = translated_title
-                post.excerpt_en = translated_excerpt
-                post.content_en = translated_content
-            elif lang == "de":
-                post.title_de = translated_title
-                post.excerpt_de = translated_excerpt
-                post.content_de = translated_content
-
-            translated[lang] = {
-                "title": translated_title,
-                "excerpt": translated_excerpt,
-                "content_preview": translated_content[:200] + "..." if len(translated_content) > 200 else translated_content
+                for lang in languages
             }
+        results = {lang: future.result() for lang, future in futures.items()}
+        return jsonify(_save_translations(post, results, skipped))
 
-        db.session.commit()
+    except Exception as e:
+        return jsonify({"error": f"Помилка перекладу: {str(e)}"}), 500
 
-        return jsonify({
-            "success": True,
-            "translated": translated,
-            "message": f"Стаття перекладена на {len(translated)} мов(и)"
-        })
 
+def _save_translations(post, results, skipped):
+    """Записує переклади {lang: {title, excerpt, content}} у пост, комітить
+    і повертає тіло відповіді api_blog_translate (skipped - мови, переклад
+    яких уже був)."""
+    translated = {}
+    for lang, fields in results.items():
+        translated_title = fields["title"]
+        translated_excerpt = fields["excerpt"] or None
+        translated_content = fields["content"]
+
+        setattr(post, f"title_{lang}", translated_title)
+        setattr(post, f"excerpt_{lang}", translated_excerpt)
+        setattr(post, f"content_{lang}", translated_content)
+
+        translated[lang] = {
+            "title": translated_title,
+            "excerpt": translated_excerpt,
+            "content_preview": translated_content[:200] + "..." if len(translated_content) > 200 else translated_content
+        }
+
+    db.session.commit()
+
+    return {
+        "success": True,
+        "translated": translated,
+        "skipped": skipped,
+        "message": f"Стаття перекладена на {len(translated)} мов(и)"
+    }
+
+
+# Як часто SSE-потік перекладу перевіряє, чи не закінчилися всі мови
+TRANSLATE_STREAM_POLL_SECONDS = 0.5
+
+
+def _translate_post_events(openai_client, post, languages, skipped):
+    """SSE-потік для api_blog_translate: {"lang", "delta"} по мірі перекладу
+    (мови паралельно, шматки з потоків збираються через чергу), в кінці -
+    те саме тіло, що й у JSON-відповіді, або {"error"}."""
+    title, excerpt, content = post.title, post.excerpt, post.content
+    deltas = queue.Queue()
+    try:
+        with ThreadPoolExecutor(max_workers=BLOG_AI_WORKERS, thread_name_prefix="blog-ai") as executor:
+            futures = {
+                lang: executor.submit(
+                    _translate_article, openai_client, title, excerpt, content, lang,
+                    on_delta=lambda delta, lang=lang: deltas.put((lang, delta)),
+                )
+                for lang in languages
+            }
+            while True:
+                try:
+                    lang, delta = deltas.get(timeout=TRANSLATE_STREAM_POLL_SECONDS)
+                except queue.Empty:
+                    # Потоки кладуть шматки до завершення своїх future -
+                    # порожня черга після завершення всіх означає кінець.
+                    if all(future.done() for future in futures.values()):
+                        break
+                    continue
+                yield _sse({"lang": lang, "delta": delta})
+
+        results = {lang: future.result() for lang, future in futures.items()}
+        yield _sse(_save_translations(post, results, skipped))
     except Exception as e:
-        return jsonify({"error": f"Помилка перекладу: {str(e)}"}), 500
+        db.session.rollback()
+        yield _sse({"error": f"Помилка перекладу: {str(e)}"})
 
 
 # =====================================================================
@@ -763,17 +1262,32 @@ def blog_page():
     page = request.args.get("page", 1, type=int)
     per_page = 9
 
-    query = BlogPost.query.filter(
-        BlogPost.status == BlogPostStatus.PUBLISHED,
-        BlogPost.store_id == g.store.id,
-        db.or_(
-            BlogPost.publish_date.is_(None),
-            BlogPost.publish_date <= datetime.utcnow()
-        )
-    ).order_by(BlogPost.publish_date.desc(), BlogPost.created_at.desc())
+    query = BlogPost.published_query(g.store.id).order_by(
+        BlogPost.publish_date.desc(), BlogPost.created_at.desc()
+    )
 
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    posts = pagination.items
+    # Для карток потрібні лише заголовки/уривки (і keywords для тегів), а не
+    # повний HTML статей (content, content_en, content_de) - решта колонок
+    # шаблоном pages/blog.html не читається.
+    # Контент довантажиться лише для поста без уривку (шаблон тоді показує
+    # початок тексту), а статті з плану уривок мають завжди.
+    # COUNT(*) OVER () - загальна кількість у тому ж запиті, як у списку
+    # компаній CRM, без окремого SELECT count(*) від paginate().
+    rows = (
+        query.options(load_only(
+            BlogPost.id, BlogPost.slug, BlogPost.featured_image, BlogPost.is_ai_generated,
+            BlogPost.title, BlogPost.title_en, BlogPost.title_de,
+            BlogPost.excerpt, BlogPost.excerpt_en, BlogPost.excerpt_de,
+            BlogPost.publish_date, BlogPost.created_at, BlogPost.keywords,
+        ))
+        .add_columns(db.func.count(BlogPost.id).over().label("total_count"))
+        .offset((max(page, 1) - 1) * per_page)
+        .limit(per_page)
+        .all()
+    )
+    posts = [post for post, _total in rows]
+    total = rows[0].total_count if rows else query.count()
+    total_pages = (total + per_page - 1) // per_page
 
     featured_post = posts[0] if posts else None
     other_posts = posts[1:] if len(posts) > 1 else []
@@ -783,9 +1297,8 @@ def blog_page():
         settings=settings,
         featured_post=featured_post,
         posts=other_posts,
-        pagination=pagination,
         page=page,
-        total_pages=pagination.pages,
+        total_pages=total_pages,
     )
 
 
@@ -793,28 +1306,26 @@ def blog_page():
 def blog_post_page(slug):
     """Сторінка окремого посту."""
     settings = SiteSettings.get_or_create(g.store.id)
-    post = BlogPost.get_by_slug(slug, store_id=g.store.id)
-
-    if not post or not post.is_published:
-        abort(404)
+    # Умова публікації - у тому ж SELECT (по uq_blog_posts_store_slug):
+    # чернетки й заплановані статті не завантажуються навіть для перевірки
+    post = BlogPost.published_query(g.store.id).filter(BlogPost.slug == slug).first_or_404()
 
     post.increment_views()
 
+    # id схожих статей - з кешу процесу; самі статті - одним запитом за PK
+    related_ids = _related_post_ids(
+        g.store.id, post.id, post.category, int(time.time() // BLOG_RELATED_TTL_SECONDS)
+    )
     related = []
-    if post.category:
-        related = BlogPost.query.filter(
-            BlogPost.status == BlogPostStatus.PUBLISHED,
-            BlogPost.category == post.category,
-            BlogPost.store_id == g.store.id,
-            BlogPost.id != post.id,
-        ).limit(3).all()
-
-    if not related:
-        related = BlogPost.query.filter(
-            BlogPost.status == BlogPostStatus.PUBLISHED,
-            BlogPost.store_id == g.store.id,
-            BlogPost.id != post.id,
-        ).order_by(BlogPost.views.desc()).limit(3).all()
+    if related_ids:
+        related_by_id = {
+            related_post.id: related_post
+            for related_post in BlogPost.query.filter(
+                BlogPost.id.in_(related_ids),
+                BlogPost.status == BlogPostStatus.PUBLISHED,
+            )
+        }
+        related = [related_by_id[i] for i in related_ids if i in related_by_id]
 
     return render_template(
         "pages/blog_post.html",
@@ -835,31 +1346,53 @@ def _run_blog_automation():
     і публікує BlogPost зі статусом SCHEDULED, час яких настав.
     """
     try:
-        due_plans = BlogPlan.get_pending_for_date(target_date=date_cls.today())
-        for plan in due_plans:
+        due_plans = [
+            (plan.id, plan.store_id)
+            for plan in BlogPlan.get_pending_for_date(target_date=date_cls.today())
+            if AISettings.get_cached(plan.store_id).blogger_auto_generate
+        ]
+        # Той самий claim, що й у ручного запуску, - план, який адмін уже
+        # генерує, планувальник не чіпає. Кожен план береться безпосередньо
+        # перед генерацією: плани йдуть один за одним, і взяті наперед пізні
+        # плани довгого проходу простояли б у processing довше
+        # GENERATION_TIMEOUT - і їх узяли б у генерацію вдруге.
+        generated = 0
+        for plan_id, store_id in due_plans:
+            if not BlogPlan.claim_for_generation(plan_id):
+                continue
             try:
-                ai_settings = AISettings.get_or_create(plan.store_id)
-                if not ai_settings.blogger_auto_generate:
-                    continue
-                post = _generate_post_from_plan(plan)
-                current_app.logger.info(f"🤖 Auto-generated blog post #{post.id} from plan #{plan.id} (store {plan.store_id})")
+                post = _generate_plan_safely(plan_id)
+                if post is not None:
+                    generated += 1
+                    current_app.logger.info(f"🤖 Auto-generated blog post #{post.id} from plan #{plan_id} (store {store_id})")
             except Exception as e:
                 db.session.rollback()
-                current_app.logger.warning(f"Blog auto-generation failed for plan #{plan.id}: {e}")
+                current_app.logger.warning(f"Blog auto-generation failed for plan #{plan_id}: {e}")
+        # Кеш лічильників - одне повідомлення на весь прохід, а не на статтю
+        if generated:
+            notify_cache_dirty("blog_stats")
     except Exception as e:
         current_app.logger.error(f"Blog automation (generate) job failed: {e}")
 
+    # Пакети Batch API забираються й без відкритої адмінки
     try:
-        due_posts = BlogPost.query.filter(
-            BlogPost.status == BlogPostStatus.SCHEDULED,
-            BlogPost.publish_date <= datetime.utcnow(),
+        open_batches = db.session.scalars(
+            db.select(BlogPlan.batch_id).where(BlogPlan.batch_id.is_not(None)).distinct()
         ).all()
-        published_count = 0
-        for post in due_posts:
-            post.status = BlogPostStatus.PUBLISHED
-            published_count += 1
+        for batch_id in open_batches:
+            try:
+                _collect_plan_batch(batch_id)
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.warning(f"Blog batch {batch_id} collection failed: {e}")
+    except Exception as e:
+        current_app.logger.error(f"Blog automation (batches) job failed: {e}")
+
+    try:
+        published_count = len(_publish_due_posts())
+        db.session.commit()
         if published_count:
-            db.session.commit()
+            notify_cache_dirty("blog_stats")
             current_app.logger.info(f"📰 Auto-published {published_count} scheduled blog post(s)")
     except Exception as e:
         db.session.rollback()
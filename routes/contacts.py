@@ -6,8 +6,6 @@
 КОНТАКТІВ") як шостий крок Phase 2 плану (SWOT 2026-08-08), тим самим
 підходом, що й попередні модулі.
 """
-from datetime import datetime
-
 from flask import Blueprint, request, redirect, url_for, flash, render_template, jsonify, g
 from flask_babel import gettext as _
 
@@ -32,12 +30,14 @@ def admin_contacts():
 
     contacts = pagination.items
 
-    today = datetime.utcnow().date()
+    # "Сьогодні" - CURRENT_DATE бази для обох меж діапазону
+    today = db.func.current_date()
     stats = {
         "total": ContactMessage.query.filter_by(store_id=g.store.id).count(),
         "unread": ContactMessage.query.filter_by(is_read=False, store_id=g.store.id).count(),
         "today": ContactMessage.query.filter(
-            db.func.date(ContactMessage.created_at) == today,
+            ContactMessage.created_at >= today,
+            ContactMessage.created_at < today + 1,
             ContactMessage.store_id == g.store.id,
         ).count(),
     }
@@ -76,7 +76,9 @@ def admin_contact_delete(contact_id):
 @admin_required
 def admin_contacts_mark_all_read():
     """Позначити всі заявки як прочитані."""
-    ContactMessage.query.filter_by(is_read=False, store_id=g.store.id).update({"is_read": True})
+    # synchronize_session=False - один UPDATE без перебору identity map:
+    # самі об'єкти заявок у цьому запиті не завантажені, синхронізувати нічого.
+    ContactMessage.query.filter_by(is_read=False, store_id=g.store.id).update({"is_read": True}, synchronize_session=False)
     db.session.commit()
     flash(_("Усі заявки позначено як прочитані."), "success")
     return redirect(url_for(".admin_contacts"))
@@ -86,7 +88,7 @@ def admin_contacts_mark_all_read():
 @admin_required
 def admin_contacts_delete_read():
     """Видалити всі прочитані заявки."""
-    ContactMessage.query.filter_by(is_read=True, store_id=g.store.id).delete()
+    ContactMessage.query.filter_by(is_read=True, store_id=g.store.id).delete(synchronize_session=False)
     db.session.commit()
     flash(_("Прочитані заявки видалено."), "info")
     return redirect(url_for(".admin_contacts"))
@@ -109,15 +111,19 @@ def api_contact():
         flash(_("Заповніть обов'язкові поля: ім'я, email, повідомлення."), "danger")
         return redirect(url_for("contacts_page"))
 
-    contact = ContactMessage(
-        store_id=g.store.id,
-        name=name,
-        email=email,
-        phone=phone or None,
-        subject=subject or None,
-        message=message,
+    # Публічна форма: ORM-об'єкт після вставки нам не потрібен, тож пишемо
+    # одним Core INSERT без unit-of-work/identity map. Python-дефолти колонок
+    # (is_read, created_at) Core застосовує так само, як і ORM.
+    db.session.execute(
+        db.insert(ContactMessage).values(
+            store_id=g.store.id,
+            name=name,
+            email=email,
+            phone=phone or None,
+            subject=subject or None,
+            message=message,
+        )
     )
-    db.session.add(contact)
     db.session.commit()
 
     if request.is_json:
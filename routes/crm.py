@@ -9,20 +9,76 @@ admin_required/db/моделі імпортуються напряму, без 
 app.py - жодних closure-специфічних залежностей тут не було (на відміну
 від Blog, де знадобилось виносити admin_auth/openai_client/image_storage).
 """
+import time
 from datetime import datetime
+from functools import lru_cache
 
-from flask import Blueprint, request, redirect, url_for, flash, render_template, jsonify, g, current_app
+from flask import Blueprint, request, redirect, url_for, flash, render_template, jsonify, g, current_app, abort
 from flask_babel import gettext as _
 
 from extensions import db
 from models.settings import SiteSettings
 from models.company import Company, AdminAlert, AlertSeverity, VerificationLog
 from services.admin_auth import admin_required
+from services.cache_invalidation import notify_cache_dirty, register_cache
+from services.pagination import fast_paginate
 from services.partner_verifier import partner_verifier
+from services.crm_daily_check import start_daily_check, DAILY_CHECK_TYPE
 from services.email_service import send_b2b_verification_approved, send_b2b_verification_rejected
 
 crm_bp = Blueprint("crm", __name__)
 
+# Список країн для фільтра CRM змінюється рідко (нова країна - лише з новим
+# партнером), а DISTINCT проходив усі компанії магазину на кожне відкриття.
+CRM_COUNTRIES_TTL_SECONDS = 300
+
+
+@lru_cache(maxsize=256)
+def _crm_countries(store_id, _time_bucket):
+    """(country_code, country) партнерів магазину для випадаючого фільтра.
+
+    _time_bucket - int(time.time() // CRM_COUNTRIES_TTL_SECONDS), як і в
+    routes/orders.py: запис кешу живе одне вікно. Кортежі, а не Row -
+    кеш не тримає нічого, прив'язаного до сесії.
+    """
+    return tuple(
+        (country_code, country)
+        for country_code, country in db.session.query(Company.country_code, Company.country).distinct().filter(
+            Company.country_code.isnot(None),
+            Company.store_id == store_id,
+        ).order_by(Company.country_code)
+    )
+
+
+# Лічильники алертів - коротке вікно кешу; дії з алертами (POST у CRM)
+# скидають його в усіх воркерах одразу, див. _invalidate_alert_stats.
+CRM_ALERT_STATS_TTL_SECONDS = 30
+
+
+@lru_cache(maxsize=256)
+def _alert_stats(store_id, _time_bucket):
+    """Лічильники алертів - одним агрегатом у БД, а не завантаженням усіх
+    алертів магазину в ORM-об'єкти і чотирма проходами по списку в Python."""
+    unresolved = AdminAlert.is_resolved == False
+    critical, warning, info, unread = db.session.query(
+        db.func.count(AdminAlert.id).filter(unresolved, AdminAlert.severity == "critical"),
+        db.func.count(AdminAlert.id).filter(unresolved, AdminAlert.severity == "warning"),
+        db.func.count(AdminAlert.id).filter(unresolved, AdminAlert.severity == "info"),
+        db.func.count(AdminAlert.id).filter(AdminAlert.is_read == False),
+    ).filter(AdminAlert.store_id == store_id).one()
+    return {"critical": critical, "warning": warning, "info": info, "unread": unread}
+
+
+register_cache("crm_alert_stats", _alert_stats.cache_clear)
+
+
+@crm_bp.after_request
+def _invalidate_alert_stats(response):
+    # Невдалі запити нічого не записали - кеш не чіпаємо
+    if response.status_code < 400 and request.method == "POST":
+        notify_cache_dirty("crm_alert_stats")
+    return response
+
 
 @crm_bp.route("/admin/crm")
 @admin_required
@@ -55,21 +111,40 @@ def admin_crm():
             )
         )
 
+    # COUNT(*) OVER () рахує всі рядки під фільтром у тому ж запиті, що й
+    # сторінка - без окремого SELECT count(*). Лише якщо сторінка порожня
+    # (номер сторінки за межами), загальну кількість доводиться рахувати окремо.
     query = query.order_by(Company.created_at.desc())
-    total = query.count()
-    companies = query.offset((page - 1) * per_page).limit(per_page).all()
+    rows = (
+        query.add_columns(db.func.count(Company.id).over().label("total_count"))
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+        .all()
+    )
+    companies = [company for company, _total in rows]
+    total = rows[0].total_count if rows else query.count()
     total_pages = (total + per_page - 1) // per_page
 
-    all_companies = Company.query.filter_by(store_id=g.store.id).all()
+    # Один GROUP BY (status, reliability_level) замість завантаження всіх
+    # компаній магазину в Python лише для того, щоб їх порахувати.
+    status_counts = {}
+    reliability_counts = {}
+    for status, reliability, count in (
+        db.session.query(Company.status, Company.reliability_level, db.func.count(Company.id))
+        .filter(Company.store_id == g.store.id)
+        .group_by(Company.status, Company.reliability_level)
+    ):
+        status_counts[status] = status_counts.get(status, 0) + count
+        reliability_counts[reliability] = reliability_counts.get(reliability, 0) + count
     stats = {
-        "total": len(all_companies),
-        "verified": len([c for c in all_companies if c.status == "verified"]),
-        "pending": len([c for c in all_companies if c.status == "pending"]),
-        "rejected": len([c for c in all_companies if c.status == "rejected"]),
-        "high_reliability": len([c for c in all_companies if c.reliability_level == "high"]),
-        "medium_reliability": len([c for c in all_companies if c.reliability_level == "medium"]),
-        "low_reliability": len([c for c in all_companies if c.reliability_level == "low"]),
-        "critical_reliability": len([c for c in all_companies if c.reliability_level == "critical"]),
+        "total": sum(status_counts.values()),
+        "verified": status_counts.get("verified", 0),
+        "pending": status_counts.get("pending", 0),
+        "rejected": status_counts.get("rejected", 0),
+        "high_reliability": reliability_counts.get("high", 0),
+        "medium_reliability": reliability_counts.get("medium", 0),
+        "low_reliability": reliability_counts.get("low", 0),
+        "critical_reliability": reliability_counts.get("critical", 0),
     }
     total_r = max(1, stats["total"])
     stats["high_reliability_pct"] = int(stats["high_reliability"] / total_r * 100)
@@ -84,10 +159,7 @@ def admin_crm():
     ).order_by(AdminAlert.created_at.desc()).all()
     unread_alerts_count = AdminAlert.query.filter_by(is_read=False, store_id=g.store.id).count()
 
-    countries = db.session.query(Company.country_code, Company.country).distinct().filter(
-        Company.country_code.isnot(None),
-        Company.store_id == g.store.id,
-    ).all()
+    countries = _crm_countries(g.store.id, int(time.time() // CRM_COUNTRIES_TTL_SECONDS))
 
     return render_template(
         "admin/crm.html",
@@ -113,6 +185,12 @@ def admin_crm_partner(id):
     settings = SiteSettings.get_or_create(g.store.id)
     company = Company.query.filter_by(id=id, store_id=g.store.id).first_or_404()
 
+    # Алерти і журнал перевірок навмисно беремо двома окремими запитами, а
+    # не selectinload(Company.alerts, Company.verification_logs): шаблону
+    # потрібні лише невирішені алерти і 20 останніх записів журналу, а
+    # selectinload завантажив би ВСЮ історію компанії (verification_logs до
+    # того ж lazy="dynamic" - eager-завантаження для нього не підтримується).
+    # N+1 тут немає: шаблон не звертається до зв'язків в циклі.
     company_alerts = AdminAlert.query.filter_by(
         company_id=id,
         is_resolved=False
@@ -138,12 +216,12 @@ def admin_crm_partner_verify(id):
     company = Company.query.filter_by(id=id, store_id=g.store.id).first_or_404()
 
     try:
-        previous_result = company.last_verification_data
+        previous_result = company.previous_verification
 
         result = partner_verifier.full_verification(
             company_name=company.name,
             vat_number=company.full_vat_number,
-            domain=company.website or company.domain,
+            domain=company.domain or company.website,
             hr_number=company.handelsregister_id,
             country_code=company.country_code,
             city=company.city,
@@ -153,7 +231,7 @@ def admin_crm_partner_verify(id):
         company.reliability_score = result.get("reliability_score", 0)
         company.reliability_level = result.get("reliability_level", "critical")
         company.last_verification_at = datetime.utcnow()
-        company.last_verification_data = result
+        company.remember_verification(result)
 
         if result.get("vat_result", {}).get("valid"):
             company.vat_verified = True
@@ -177,18 +255,17 @@ def admin_crm_partner_verify(id):
             response_data=result,
             changes_detected=len(result.get("changes", [])) > 0,
             changes_description=str(result.get("changes", [])) if result.get("changes") else None,
+            store_id=company.store_id,
+            commit=False,
+        )
+        AdminAlert.bulk_create_from_verification(
+            result.get("alerts", []),
+            company_id=company.id,
+            store_id=company.store_id,
+            data=result,
         )
 
-        for alert_data in result.get("alerts", []):
-            AdminAlert.create_alert(
-                alert_type=alert_data.get("type"),
-                title=alert_data.get("message", "Алерт верифікації"),
-                message=alert_data.get("message"),
-                company_id=company.id,
-                severity=alert_data.get("severity", "info"),
-                data=result,
-            )
-
+        # Оновлення компанії, лог і всі алерти - однією транзакцією.
         db.session.commit()
 
         return jsonify({
@@ -202,14 +279,35 @@ def admin_crm_partner_verify(id):
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+def _update_company_or_404(company_id, returning, **values):
+    """Змінює поля компанії поточного магазину одним UPDATE ... RETURNING
+    замість SELECT усього рядка (з vat/whois/hr JSON-ами) + flush. Повертає
+    рядок з колонками returning (для листа партнеру); 404, якщо компанії
+    немає. Комітить одразу - як і попередні обробники."""
+    company = db.session.execute(
+        db.update(Company)
+        .where(Company.id == company_id, Company.store_id == g.store.id)
+        .values(**values)
+        .returning(Company.id, *returning),
+        execution_options={"synchronize_session": False},
+    ).one_or_none()
+    if company is None:
+        db.session.rollback()
+        abort(404)
+    db.session.commit()
+    return company
+
+
 @crm_bp.route("/admin/crm/partner/<int:id>/approve", methods=["POST"])
 @admin_required
 def admin_crm_partner_approve(id):
     """Підтвердити партнера."""
-    company = Company.query.filter_by(id=id, store_id=g.store.id).first_or_404()
-    company.status = "verified"
-    company.verified_at = datetime.utcnow()
-    db.session.commit()
+    company = _update_company_or_404(
+        id,
+        (Company.contact_email, Company.name, Company.discount_percent),
+        status="verified",
+        verified_at=datetime.utcnow(),
+    )
 
     if company.contact_email:
         try:
@@ -230,10 +328,12 @@ def admin_crm_partner_approve(id):
 def admin_crm_partner_reject(id):
     """Відхилити партнера."""
     data = request.get_json() or {}
-    company = Company.query.filter_by(id=id, store_id=g.store.id).first_or_404()
-    company.status = "rejected"
-    company.rejection_reason = data.get("reason", "")
-    db.session.commit()
+    company = _update_company_or_404(
+        id,
+        (Company.contact_email, Company.name, Company.rejection_reason),
+        status="rejected",
+        rejection_reason=data.get("reason", ""),
+    )
 
     if company.contact_email:
         try:
@@ -254,10 +354,7 @@ def admin_crm_partner_reject(id):
 def admin_crm_partner_suspend(id):
     """Призупинити партнера."""
     data = request.get_json() or {}
-    company = Company.query.filter_by(id=id, store_id=g.store.id).first_or_404()
-    company.status = "suspended"
-    company.rejection_reason = data.get("reason", "")
-    db.session.commit()
+    _update_company_or_404(id, (), status="suspended", rejection_reason=data.get("reason", ""))
 
     return jsonify({"success": True})
 
@@ -266,11 +363,25 @@ def admin_crm_partner_suspend(id):
 @admin_required
 def admin_crm_partner_update(id):
     """Оновити B2B налаштування партнера."""
-    company = Company.query.filter_by(id=id, store_id=g.store.id).first_or_404()
-    company.credit_limit = float(request.form.get("credit_limit", 0))
-    company.payment_terms = int(request.form.get("payment_terms", 0))
-    company.discount_percent = float(request.form.get("discount_percent", 0))
-    db.session.commit()
+    company = _update_company_or_404(
+        id,
+        (Company.credit_limit, Company.payment_terms, Company.discount_percent),
+        credit_limit=float(request.form.get("credit_limit", 0)),
+        payment_terms=int(request.form.get("payment_terms", 0)),
+        discount_percent=float(request.form.get("discount_percent", 0)),
+    )
+
+    # Форма на сторінці партнера зберігається через fetch() - їй досить
+    # JSON, без редиректу і повторного рендеру всієї сторінки. Звичайний
+    # POST без JS і далі отримує flash + редирект.
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify({
+            "success": True,
+            "message": _("Налаштування оновлено!"),
+            "credit_limit": company.credit_limit,
+            "payment_terms": company.payment_terms,
+            "discount_percent": company.discount_percent,
+        })
 
     flash(_("Налаштування оновлено!"), "success")
     return redirect(url_for(".admin_crm_partner", id=id))
@@ -298,18 +409,11 @@ def admin_crm_alerts():
     elif filter_status == "resolved":
         query = query.filter(AdminAlert.is_resolved == True)
 
-    query = query.order_by(AdminAlert.created_at.desc())
-    total = query.count()
-    alerts = query.offset((page - 1) * per_page).limit(per_page).all()
-    total_pages = (total + per_page - 1) // per_page
+    pagination = fast_paginate(query.order_by(AdminAlert.created_at.desc()), page, per_page)
+    alerts = pagination.items
+    total_pages = pagination.pages
 
-    all_alerts = AdminAlert.query.filter_by(store_id=g.store.id).all()
-    stats = {
-        "critical": len([a for a in all_alerts if a.severity == "critical" and not a.is_resolved]),
-        "warning": len([a for a in all_alerts if a.severity == "warning" and not a.is_resolved]),
-        "info": len([a for a in all_alerts if a.severity == "info" and not a.is_resolved]),
-        "unread": len([a for a in all_alerts if not a.is_read]),
-    }
+    stats = _alert_stats(g.store.id, int(time.time() // CRM_ALERT_STATS_TTL_SECONDS))
 
     return render_template(
         "admin/crm_alerts.html",
@@ -323,13 +427,27 @@ def admin_crm_alerts():
     )
 
 
+def _update_alert_or_404(alert_id, **values):
+    """Один UPDATE ... RETURNING id по алерту поточного магазину замість
+    SELECT + зміни атрибутів + flush; 404, якщо такого алерту немає."""
+    updated_id = db.session.execute(
+        db.update(AdminAlert)
+        .where(AdminAlert.id == alert_id, AdminAlert.store_id == g.store.id)
+        .values(**values)
+        .returning(AdminAlert.id),
+        execution_options={"synchronize_session": False},
+    ).scalar()
+    if updated_id is None:
+        db.session.rollback()
+        abort(404)
+    db.session.commit()
+
+
 @crm_bp.route("/admin/crm/alert/<int:id>/read", methods=["POST"])
 @admin_required
 def admin_crm_alert_read(id):
     """Позначити алерт прочитаним."""
-    alert = AdminAlert.query.filter_by(id=id, store_id=g.store.id).first_or_404()
-    alert.mark_read()
-
+    _update_alert_or_404(id, is_read=True)
     return jsonify({"success": True})
 
 
@@ -338,13 +456,12 @@ def admin_crm_alert_read(id):
 def admin_crm_alert_resolve(id):
     """Вирішити алерт."""
     data = request.get_json() or {}
-    alert = AdminAlert.query.filter_by(id=id, store_id=g.store.id).first_or_404()
-
-    alert.is_resolved = True
-    alert.resolved_at = datetime.utcnow()
-    alert.resolution_note = data.get("note", "")
-    db.session.commit()
-
+    _update_alert_or_404(
+        id,
+        is_resolved=True,
+        resolved_at=datetime.utcnow(),
+        resolution_note=data.get("note", ""),
+    )
     return jsonify({"success": True})
 
 
@@ -352,93 +469,54 @@ def admin_crm_alert_resolve(id):
 @admin_required
 def admin_crm_alerts_mark_all_read():
     """Позначити всі алерти прочитаними."""
-    AdminAlert.query.filter_by(is_read=False, store_id=g.store.id).update({"is_read": True})
+    updated = AdminAlert.query.filter_by(is_read=False, store_id=g.store.id).update({"is_read": True}, synchronize_session=False)
     db.session.commit()
 
-    return jsonify({"success": True})
+    return jsonify({"success": True, "updated": updated})
 
 
 @crm_bp.route("/admin/crm/run-daily-check", methods=["POST"])
 @admin_required
 def admin_crm_run_daily_check():
-    """Запустити щоденну перевірку всіх партнерів."""
+    """Запустити щоденну перевірку всіх партнерів - у фоні, див.
+    services/crm_daily_check.py; відповідає одразу."""
     try:
-        companies = Company.query.filter(
-            Company.status.in_(["verified", "pending"]),
-            Company.store_id == g.store.id,
-        ).all()
-
-        checked = 0
-        alerts_created = 0
-
-        for company in companies:
-            try:
-                previous_result = company.last_verification_data
-
-                result = partner_verifier.full_verification(
-                    company_name=company.name,
-                    vat_number=company.full_vat_number,
-                    domain=company.website or company.domain,
-                    hr_number=company.handelsregister_id,
-                    country_code=company.country_code,
-                    city=company.city,
-                    previous_result=previous_result,
-                )
-
-                company.reliability_score = result.get("reliability_score", 0)
-                company.reliability_level = result.get("reliability_level", "critical")
-                company.last_verification_at = datetime.utcnow()
-                company.last_verification_data = result
-
-                if result.get("vat_result", {}).get("valid"):
-                    company.vat_verified = True
-                    company.vat_data = result["vat_result"]
-
-                if result.get("whois_result", {}).get("valid"):
-                    company.is_whois_verified = True
-                    company.whois_data = result["whois_result"]
-
-                if result.get("hr_result", {}).get("valid"):
-                    company.is_hr_verified = True
-                    company.hr_data = result["hr_result"]
-
-                VerificationLog.log_check(
-                    company_id=company.id,
-                    check_type="daily",
-                    status="success",
-                    is_valid=result.get("reliability_score", 0) >= 50,
-                    response_data=result,
-                    changes_detected=len(result.get("changes", [])) > 0,
-                )
-
-                for alert_data in result.get("alerts", []):
-                    AdminAlert.create_alert(
-                        alert_type=alert_data.get("type"),
-                        title=f"{company.name}: {alert_data.get('message', 'Алерт')}",
-                        message=alert_data.get("message"),
-                        company_id=company.id,
-                        severity=alert_data.get("severity", "info"),
-                    )
-                    alerts_created += 1
-
-                checked += 1
-
-            except Exception as e:
-                VerificationLog.log_check(
-                    company_id=company.id,
-                    check_type="daily",
-                    status="error",
-                    is_valid=False,
-                    error_message=str(e),
-                )
-
-        db.session.commit()
-
+        started_at, total = start_daily_check(g.store.id)
         return jsonify({
             "success": True,
-            "checked": checked,
-            "alerts": alerts_created,
+            "started_at": started_at.isoformat(),
+            "total": total,
         })
-
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
+
+
+@crm_bp.route("/admin/crm/daily-check-status")
+@admin_required
+def admin_crm_daily_check_status():
+    """Прогрес перевірки, запущеної в started_at: скільки компаній уже
+    перевірено (лог success/error) і скільки алертів створено з того часу."""
+    try:
+        since = datetime.fromisoformat(request.args.get("since", ""))
+    except ValueError:
+        return jsonify({"success": False, "error": "since"}), 400
+
+    checked, errors = db.session.query(
+        db.func.count(VerificationLog.id).filter(VerificationLog.status == "success"),
+        db.func.count(VerificationLog.id).filter(VerificationLog.status == "error"),
+    ).filter(
+        VerificationLog.store_id == g.store.id,
+        VerificationLog.check_type == DAILY_CHECK_TYPE,
+        VerificationLog.checked_at >= since,
+    ).one()
+    alerts = AdminAlert.query.filter(
+        AdminAlert.store_id == g.store.id,
+        AdminAlert.created_at >= since,
+    ).count()
+
+    return jsonify({
+        "success": True,
+        "checked": checked,
+        "errors": errors,
+        "alerts": alerts,
+    })
@@ -9,13 +9,16 @@
 З БД") як частина Phase 2 плану (SWOT 2026-08-08).
 """
 import io
+import os
 import uuid
 
 from flask import Blueprint, current_app, g, jsonify, request, send_file, url_for
 from flask_babel import gettext as _
+from sqlalchemy.orm import defer
 from werkzeug.utils import secure_filename
 
 from extensions import db
+from models.product import Image
 from services.admin_auth import admin_required
 from services.image_storage import allowed_file
 
@@ -33,6 +36,13 @@ media_bp = Blueprint("media", __name__)
 @admin_required
 def admin_upload():
     """Завантаження зображення в базу даних PostgreSQL."""
+    # Перевіряємо розмір за заголовком Content-Length ДО розбору форми і
+    # file.read() - інакше завеликий файл спершу повністю потрапляє в пам'ять
+    # лише для того, щоб бути відхиленим.
+    max_size = current_app.config.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024)
+    if request.content_length and request.content_length > max_size:
+        return jsonify({"error": f"Файл занадто великий (max {max_size // 1024 // 1024} MB)"}), 413
+
     if 'file' not in request.files:
         return jsonify({"error": _("Файл не обрано")}), 400
 
@@ -43,16 +53,13 @@ def admin_upload():
     content_type = file.content_type
 
     if file and allowed_file(file.filename, content_type):
-        from models.product import Image
-
-        secured_name = secure_filename(file.filename)
-        ext = secured_name.rsplit('.', 1)[1].lower()
-        filename = f"{uuid.uuid4().hex}.{ext}"
+        ext = os.path.splitext(secure_filename(file.filename))[1].lstrip('.').lower()
+        file_id = uuid.uuid4().hex
+        filename = f"{file_id}.{ext}"
 
         file_data = file.read()
         file_size = len(file_data)
 
-        max_size = current_app.config.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024)
         if file_size > max_size:
             return jsonify({"error": f"Файл занадто великий (max {max_size // 1024 // 1024} MB)"}), 400
 
@@ -65,7 +72,7 @@ def admin_upload():
                     upload_result = cloudinary.uploader.upload(
                         file,
                         folder="smartshop",
-                        public_id=filename.rsplit('.', 1)[0],
+                        public_id=file_id,
                         resource_type="image",
                         allowed_formats=['png', 'jpg', 'jpeg', 'gif', 'webp']
                     )
@@ -80,7 +87,7 @@ def admin_upload():
                     })
 
                 except Exception as e:
-                    print(f"Cloudinary upload error: {e}")
+                    current_app.logger.warning("Cloudinary upload error: %s", e)
                     # Fallback to database
 
         try:
@@ -114,19 +121,31 @@ def admin_upload():
 
         except Exception as e:
             db.session.rollback()
-            print(f"Database save error: {e}")
+            current_app.logger.error("Database save error: %s", e)
             return jsonify({"error": f"Помилка збереження: {str(e)}"}), 500
 
     return jsonify({"error": _("Недозволений тип файлу. Дозволено: png, jpg, jpeg, gif, webp")}), 400
 
 
+# Ім'я файлу в БД - uuid4().hex (див. admin_upload), тобто вміст за
+# конкретним URL не змінюється: браузер/CDN може кешувати його назавжди.
+IMAGE_CACHE_MAX_AGE = 31536000  # 1 рік
+
+
+def _image_etag(image):
+    return f"{image.size}-{image.filename}"
+
+
 @media_bp.route("/images/<filename>")
 def serve_image(filename):
-    """Віддає зображення з бази даних."""
-    from models.product import Image
+    """Віддає зображення з бази даних.
 
+    Спершу читаємо лише метадані (без колонки data): якщо клієнт уже має
+    цю картинку (If-None-Match збігається з ETag), відповідаємо 304 без
+    читання blob-а з БД. Інакше send_file(conditional=True) сам обробляє
+    If-Modified-Since/Range."""
     try:
-        image = Image.query.filter_by(filename=filename).first()
+        image = Image.query.options(defer(Image.data)).filter_by(filename=filename).first()
 
         if not image:
             current_app.logger.warning(f"❌ Image not found in database: {filename}")
@@ -136,17 +155,32 @@ def serve_image(filename):
                 as_attachment=False
             ), 404
 
+        etag = _image_etag(image)
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = IMAGE_CACHE_MAX_AGE
+            response.cache_control.immutable = True
+            return response
+
         image_io = io.BytesIO(image.data)
         image_io.seek(0)
 
-        current_app.logger.debug(f"✅ Serving image from database: {filename} ({image.size} bytes)")
+        current_app.logger.debug("Serving image from database: %s (%d bytes)", filename, image.size)
 
-        return send_file(
+        response = send_file(
             image_io,
             mimetype=image.mime_type,
             as_attachment=False,
-            download_name=image.filename
+            download_name=image.filename,
+            conditional=True,
+            etag=etag,
+            last_modified=image.created_at,
+            max_age=IMAGE_CACHE_MAX_AGE,
         )
+        response.cache_control.immutable = True
+        return response
     except Exception as e:
         current_app.logger.error(f"❌ Error serving image {filename}: {type(e).__name__}: {e}")
         return send_file(
@@ -6,35 +6,72 @@
 Винесено з app.py ("АДМІНКА: СТАТИСТИКА" + "АДМІНКА: ЗАМОВЛЕННЯ") як
 частина Phase 2 плану (SWOT 2026-08-08).
 """
+import time
+from functools import lru_cache
+
 from flask import Blueprint, current_app, g, redirect, render_template, request, url_for, flash
 from flask_babel import gettext as _
 
 from extensions import db
 from models.order import Order, OrderItem
+from models.warehouse import WarehouseTask
 from services.admin_auth import admin_required
 
 orders_bp = Blueprint("orders", __name__)
 
+# Зведення по замовленнях кешуємо на коротке вікно: /admin/orders і
+# /admin/stats перераховували 3-4 окремі count()/sum() на кожне
+# відкриття сторінки (кожен - повний прохід по індексу orders), а
+# цифри на дашборді, що відстають на кілька секунд, нікому не шкодять.
+ORDER_STATS_TTL_SECONDS = 30
+
+
+@lru_cache(maxsize=256)
+def _order_status_totals(store_id, _time_bucket):
+    """Один GROUP BY status замість окремих count()/sum() по кожному статусу.
+
+    _time_bucket - int(time.time() // ORDER_STATS_TTL_SECONDS): ключ
+    lru_cache змінюється раз на вікно, і старі записи витісняються самі.
+    Повертає {status: (кількість, сума amount)} - лише прості значення,
+    без ORM-об'єктів, щоб кеш не тримав сесію/з'єднання.
+    """
+    rows = (
+        db.session.query(
+            Order.status,
+            db.func.count(Order.id),
+            db.func.coalesce(db.func.sum(Order.amount), 0.0),
+        )
+        .filter(Order.store_id == store_id)
+        .group_by(Order.status)
+        .all()
+    )
+    return {status: (count, float(revenue or 0.0)) for status, count, revenue in rows}
+
+
+def _order_stats(store_id):
+    """Зведення для адмінки: total/paid/pending + дохід з оплачених."""
+    totals = _order_status_totals(store_id, int(time.time() // ORDER_STATS_TTL_SECONDS))
+    return {
+        "total": sum(count for count, _revenue in totals.values()),
+        "paid": totals.get("paid", (0, 0.0))[0],
+        "pending": totals.get("pending", (0, 0.0))[0],
+        "revenue": totals.get("paid", (0, 0.0))[1],
+    }
+
 
 @orders_bp.route("/admin/stats")
 @admin_required
 def admin_stats():
-    total_orders = Order.query.filter_by(store_id=g.store.id).count()
-    paid_orders = Order.query.filter_by(status="paid", store_id=g.store.id).count()
-    total_revenue = (
-        db.session.query(db.func.coalesce(db.func.sum(Order.amount), 0.0))
-        .filter(Order.status == "paid", Order.store_id == g.store.id)
-        .scalar()
-    )
+    stats = _order_stats(g.store.id)
     latest_orders = (
         Order.query.filter_by(store_id=g.store.id).order_by(Order.created_at.desc()).limit(20).all()
     )
 
     return render_template(
         "admin/stats.html",
-        total_orders=total_orders,
-        paid_orders=paid_orders,
-        total_revenue=total_revenue,
+        total_orders=stats["total"],
+        paid_orders=stats["paid"],
+        total_revenue=stats["revenue"],
         latest_orders=latest_orders,
     )
 
@@ -55,13 +92,7 @@ def admin_orders():
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     orders = pagination.items
 
-    stats = {
-        "total": Order.query.filter_by(store_id=g.store.id).count(),
-        "paid": Order.query.filter_by(status="paid", store_id=g.store.id).count(),
-        "pending": Order.query.filter_by(status="pending", store_id=g.store.id).count(),
-        "revenue": db.session.query(db.func.coalesce(db.func.sum(Order.amount), 0.0))
-            .filter(Order.status == "paid", Order.store_id == g.store.id).scalar(),
-    }
+    stats = _order_stats(g.store.id)
 
     return render_template(
         "admin/orders.html",
@@ -104,14 +135,12 @@ def admin_order_update_status(order_id):
         # Якщо статус змінився на "paid" - створюємо завдання для складу
         if new_status == "paid" and old_status != "paid":
             try:
-                from models.warehouse import WarehouseTask
-                existing_task = WarehouseTask.query.filter_by(order_id=order.id).first()
-                if not existing_task:
-                    task = WarehouseTask.create_from_order(
-                        order_id=order.id,
-                        priority=2 if getattr(order, 'is_b2b', False) else 3,
-                        notes=getattr(order, 'notes', '') or '',
-                    )
+                task = WarehouseTask.create_from_order(
+                    order_id=order.id,
+                    priority=2 if getattr(order, 'is_b2b', False) else 3,
+                    notes=getattr(order, 'notes', '') or '',
+                )
+                if task:
                     flash(_("📦 Завдання для складу #%(task_number)s створено!") % {"task_number": task.task_number}, "info")
             except Exception as e:
                 print(f"Error creating warehouse task: {e}")
@@ -143,10 +172,9 @@ def admin_order_delete(order_id):
     # WarehouseTask.order_id є NOT NULL - якщо не видалити задачу складу
     # явно, SQLAlchemy спробує занулити її при видаленні Order (через
     # backref "warehouse_task") і впаде на обмеженні БД.
-    from models.warehouse import WarehouseTask
-    WarehouseTask.query.filter_by(order_id=order_id, store_id=g.store.id).delete()
+    WarehouseTask.query.filter_by(order_id=order_id, store_id=g.store.id).delete(synchronize_session=False)
 
-    OrderItem.query.filter_by(order_id=order_id, store_id=g.store.id).delete()
+    OrderItem.query.filter_by(order_id=order_id, store_id=g.store.id).delete(synchronize_session=False)
     db.session.delete(order)
     db.session.commit()
     flash(_("Замовлення видалено."), "info")
@@ -101,7 +101,7 @@ def admin_categories_delete(category_id):
         delete_old_image(category.image_url)
 
     # Товари в цій категорії стануть без категорії
-    Product.query.filter_by(category_id=category_id, store_id=g.store.id).update({"category_id": None})
+    Product.query.filter_by(category_id=category_id, store_id=g.store.id).update({"category_id": None}, synchronize_session=False)
     db.session.delete(category)
     db.session.commit()
     flash(_("Категорія видалена. Товари залишились без категорії."), "info")
@@ -106,7 +106,7 @@ def new_store():
             errors.append(f"Адреса «{slug}» вже зайнята. Оберіть іншу.")
         if not email:
             errors.append(_("Email обов'язковий."))
-        elif User.get_by_email(email):
+        elif User.email_exists(email):
             errors.append(_("Користувач з таким email вже існує. Увійдіть у свій акаунт."))
         if not password or len(password) < 8:
             errors.append(_("Пароль має бути не менше 8 символів."))
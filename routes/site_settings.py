@@ -8,12 +8,12 @@
 """
 from flask import Blueprint, g, redirect, render_template, request, url_for, flash
 from flask_babel import gettext as _
-from werkzeug.security import generate_password_hash
 
 from extensions import db
 from models.settings import SiteSettings
 from services.admin_auth import admin_required
 from services.image_storage import delete_old_image
+from services.passwords import hash_password
 from services.theme_presets import (
     THEME_PRESETS, FONT_PRESETS, HOMEPAGE_LAYOUTS, FONT_SIZE_PRESETS,
     is_valid_hex_color,
@@ -22,6 +22,100 @@ from services.theme_presets import (
 site_settings_bp = Blueprint("site_settings", __name__)
 
 
+def _str_or_none(value):
+    return value or None
+
+
+def _upper_or_none(value):
+    return (value or "").upper() or None
+
+
+def _default(fallback):
+    return lambda value: value or fallback
+
+
+def _int_or(fallback):
+    def coerce(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return fallback
+    return coerce
+
+
+def _float_or(fallback):
+    def coerce(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return fallback
+    return coerce
+
+
+# Прості поля форми /admin/settings: (атрибут SiteSettings, coerce).
+# Ім'я поля форми збігається з атрибутом. Поля з особливою логікою
+# (пресети дизайну, колір, зображення, логін/пароль адміна) - окремо в
+# admin_settings().
+SETTINGS_FORM_FIELDS = (
+    # Основні
+    ("site_name", _str_or_none),
+    ("site_tagline", _str_or_none),
+    # Контакти
+    ("contact_email", _str_or_none),
+    ("contact_phone", _str_or_none),
+    ("contact_address", _str_or_none),
+    ("working_hours", _str_or_none),
+    ("google_maps_url", _str_or_none),
+    # Соцмережі
+    ("social_telegram", _str_or_none),
+    ("social_whatsapp", _str_or_none),
+    ("social_instagram", _str_or_none),
+    ("social_facebook", _str_or_none),
+    ("social_youtube", _str_or_none),
+    ("social_tiktok", _str_or_none),
+    # SEO
+    ("meta_title", _str_or_none),
+    ("meta_description", _str_or_none),
+    ("meta_keywords", _str_or_none),
+    # Аналітика
+    ("google_analytics_id", _str_or_none),
+    ("facebook_pixel_id", _str_or_none),
+    ("custom_head_code", _str_or_none),
+    # Магазин
+    ("default_currency", _default("EUR")),
+    ("products_per_page", _int_or(12)),
+    ("min_order_amount", _float_or(0.0)),
+    ("shipping_info", _str_or_none),
+    # Дані юрособи адміністратора
+    ("admin_company_name", _str_or_none),
+    ("admin_company_legal_name", _str_or_none),
+    ("admin_vat_number", _str_or_none),
+    ("admin_vat_country", _str_or_none),
+    ("admin_company_address", _str_or_none),
+    ("admin_company_city", _str_or_none),
+    ("admin_company_postal_code", _str_or_none),
+    ("admin_company_country", _str_or_none),
+    ("admin_company_country_code", _upper_or_none),
+    ("admin_handelsregister_id", _str_or_none),
+    ("admin_company_email", _str_or_none),
+    ("admin_company_phone", _str_or_none),
+    ("admin_company_website", _str_or_none),
+    # Юридичні тексти (Datenschutz/AGB) - порожнє поле повертає сторінку
+    # до загального шаблонного тексту (не перезаписує його порожнечею).
+    ("privacy_policy_text", _str_or_none),
+    ("terms_text", _str_or_none),
+)
+
+
+def _apply_settings_form(settings, form):
+    """Переносить прості поля форми в settings, пропускаючи незмінені -
+    вони не позначаються як змінені і не потрапляють в UPDATE."""
+    for attr, coerce in SETTINGS_FORM_FIELDS:
+        new_value = coerce(form.get(attr))
+        if getattr(settings, attr) != new_value:
+            setattr(settings, attr, new_value)
+
+
 @site_settings_bp.route("/admin/settings", methods=["GET", "POST"])
 @admin_required
 def admin_settings():
@@ -29,9 +123,7 @@ def admin_settings():
     settings = SiteSettings.get_or_create(g.store.id)
 
     if request.method == "POST":
-        # Основні
-        settings.site_name = request.form.get("site_name") or None
-        settings.site_tagline = request.form.get("site_tagline") or None
+        _apply_settings_form(settings, request.form)
 
         # Дизайн вітрини - валідуємо проти фіксованого набору пресетів,
         # ніколи не приймаємо довільне значення від форми.
@@ -69,43 +161,6 @@ def admin_settings():
                 delete_old_image(old_url)
             setattr(settings, image_field, new_url)
 
-        # Контакти
-        settings.contact_email = request.form.get("contact_email") or None
-        settings.contact_phone = request.form.get("contact_phone") or None
-        settings.contact_address = request.form.get("contact_address") or None
-        settings.working_hours = request.form.get("working_hours") or None
-        settings.google_maps_url = request.form.get("google_maps_url") or None
-
-        # Соцмережі
-        settings.social_telegram = request.form.get("social_telegram") or None
-        settings.social_whatsapp = request.form.get("social_whatsapp") or None
-        settings.social_instagram = request.form.get("social_instagram") or None
-        settings.social_facebook = request.form.get("social_facebook") or None
-        settings.social_youtube = request.form.get("social_youtube") or None
-        settings.social_tiktok = request.form.get("social_tiktok") or None
-
-        # SEO
-        settings.meta_title = request.form.get("meta_title") or None
-        settings.meta_description = request.form.get("meta_description") or None
-        settings.meta_keywords = request.form.get("meta_keywords") or None
-
-        # Аналітика
-        settings.google_analytics_id = request.form.get("google_analytics_id") or None
-        settings.facebook_pixel_id = request.form.get("facebook_pixel_id") or None
-        settings.custom_head_code = request.form.get("custom_head_code") or None
-
-        # Магазин
-        settings.default_currency = request.form.get("default_currency") or "EUR"
-        try:
-            settings.products_per_page = int(request.form.get("products_per_page", 12))
-        except ValueError:
-            settings.products_per_page = 12
-        try:
-            settings.min_order_amount = float(request.form.get("min_order_amount", 0))
-        except ValueError:
-            settings.min_order_amount = 0.0
-        settings.shipping_info = request.form.get("shipping_info") or None
-
         # ========== АДМІНІСТРАТОР ==========
         # Логін
         new_username = request.form.get("admin_username", "").strip()
@@ -121,29 +176,9 @@ def admin_settings():
             elif new_password != confirm_password:
                 flash(_("Паролі не співпадають."), "warning")
             else:
-                settings.admin_password_hash = generate_password_hash(new_password)
+                settings.admin_password_hash = hash_password(new_password)
                 flash(_("Пароль адміністратора змінено."), "success")
 
-        # Дані юрособи адміністратора
-        settings.admin_company_name = request.form.get("admin_company_name") or None
-        settings.admin_company_legal_name = request.form.get("admin_company_legal_name") or None
-        settings.admin_vat_number = request.form.get("admin_vat_number") or None
-        settings.admin_vat_country = request.form.get("admin_vat_country") or None
-        settings.admin_company_address = request.form.get("admin_company_address") or None
-        settings.admin_company_city = request.form.get("admin_company_city") or None
-        settings.admin_company_postal_code = request.form.get("admin_company_postal_code") or None
-        settings.admin_company_country = request.form.get("admin_company_country") or None
-        settings.admin_company_country_code = (request.form.get("admin_company_country_code") or "").upper() or None
-        settings.admin_handelsregister_id = request.form.get("admin_handelsregister_id") or None
-        settings.admin_company_email = request.form.get("admin_company_email") or None
-        settings.admin_company_phone = request.form.get("admin_company_phone") or None
-        settings.admin_company_website = request.form.get("admin_company_website") or None
-
-        # Юридичні тексти (Datenschutz/AGB) - порожнє поле повертає сторінку
-        # до загального шаблонного тексту (не перезаписує його порожнечею).
-        settings.privacy_policy_text = request.form.get("privacy_policy_text") or None
-        settings.terms_text = request.form.get("terms_text") or None
-
         db.session.commit()
         flash(_("Налаштування сайту збережено."), "success")
         return redirect(url_for(".admin_settings"))
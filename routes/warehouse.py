@@ -7,24 +7,172 @@
 Blog/CRM: спільні admin_required/db/моделі імпортуються напряму. Жодних
 closure-специфічних залежностей тут немає (як і в CRM).
 """
+import time
 from datetime import datetime, date, timedelta
+from functools import lru_cache
 
-from flask import Blueprint, request, redirect, url_for, flash, render_template, g
+from flask import Blueprint, request, redirect, url_for, flash, render_template, jsonify, g
 from flask_babel import gettext as _
 
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import joinedload, load_only
+
 from extensions import db
+from models.order import Order
 from models.product import Product
 from models.settings import SiteSettings
 from models.shipping import CarrierAccount
 from models.warehouse import (
     WarehouseTask, ShipmentStatus, LowStockAlert, StockMovement,
     ReplenishmentOrder, ReplenishmentStatus, ReplenishmentItem,
-    WarehouseExpense, ExpenseCategory,
+    WarehouseExpense, ExpenseCategory, ACTIVE_SHIPMENT_STATUSES,
 )
 from services.admin_auth import admin_required
+from services.cache_invalidation import notify_cache_dirty, register_cache
+from services.pagination import fast_paginate
 
 warehouse_bp = Blueprint("warehouse", __name__)
 
+# Лічильники в шапках сторінок складу однакові для всіх, хто відкриває
+# сторінку в межах кількох секунд - кешуємо їх на коротке вікно, як
+# зведення замовлень у routes/orders.py. Будь-який POST у розділі складу
+# (зміна статусу завдання, коригування залишку, поповнення) скидає кеш
+# усіх воркерів одразу (notify_cache_dirty); зміни ззовні (нові
+# замовлення) з'являються не пізніше ніж за WAREHOUSE_STATS_TTL_SECONDS.
+WAREHOUSE_STATS_TTL_SECONDS = 30
+
+
+def _stats_bucket():
+    return int(time.time() // WAREHOUSE_STATS_TTL_SECONDS)
+
+
+@lru_cache(maxsize=256)
+def _task_stats(store_id, _time_bucket):
+    """Лічильники завдань - одним запитом з COUNT(*) FILTER замість
+    окремого count() на кожен статус."""
+    today = db.func.current_date()
+    pending, processing, packed, shipped_today = db.session.query(
+        db.func.count(WarehouseTask.id).filter(WarehouseTask.status == ShipmentStatus.PENDING.value),
+        db.func.count(WarehouseTask.id).filter(WarehouseTask.status == ShipmentStatus.PROCESSING.value),
+        db.func.count(WarehouseTask.id).filter(WarehouseTask.status == ShipmentStatus.PACKED.value),
+        # Діапазон [сьогодні 00:00, завтра 00:00), а не date(shipped_at) =
+        # current_date: функція над колонкою не дає використати індекс.
+        # "Сьогодні" - лише CURRENT_DATE бази для обох меж, а не дата
+        # Python: біля півночі вони можуть розійтися на добу.
+        db.func.count(WarehouseTask.id).filter(
+            WarehouseTask.status == ShipmentStatus.SHIPPED.value,
+            WarehouseTask.shipped_at >= today,
+            WarehouseTask.shipped_at < today + 1,
+        ),
+    ).filter(WarehouseTask.store_id == store_id).one()
+    return {
+        "pending": pending,
+        "processing": processing,
+        "packed": packed,
+        "shipped_today": shipped_today,
+    }
+
+
+@lru_cache(maxsize=256)
+def _stock_stats(store_id, _time_bucket):
+    total_products, out_of_stock, low_stock = db.session.query(
+        db.func.count(Product.id),
+        db.func.count(Product.id).filter(Product.stock == 0),
+        db.func.count(Product.id).filter(
+            Product.stock > 0,
+            Product.stock <= Product.min_stock,
+            Product.min_stock > 0,
+        ),
+    ).filter(Product.is_active == True, Product.store_id == store_id).one()
+    return {
+        "total_products": total_products,
+        "out_of_stock": out_of_stock,
+        "low_stock": low_stock,
+        "unresolved_alerts": LowStockAlert.query.filter_by(is_resolved=False, store_id=store_id).count(),
+    }
+
+
+@lru_cache(maxsize=256)
+def _replenishment_stats(store_id, _time_bucket):
+    status_counts = dict(
+        db.session.query(ReplenishmentOrder.status, db.func.count(ReplenishmentOrder.id))
+        .filter(ReplenishmentOrder.store_id == store_id)
+        .group_by(ReplenishmentOrder.status)
+        .all()
+    )
+    return {
+        "draft": status_counts.get(ReplenishmentStatus.DRAFT.value, 0),
+        "pending": status_counts.get(ReplenishmentStatus.PENDING.value, 0),
+        "ordered": status_counts.get(ReplenishmentStatus.ORDERED.value, 0),
+        "shipped": status_counts.get(ReplenishmentStatus.SHIPPED.value, 0),
+    }
+
+
+# Витрати за місяць змінюються лише коли хтось додає витрату, тож їх
+# зведення по категоріях тримаємо довше за лічильники вище. Свій процес
+# скидає кеш одразу після POST; інші gunicorn-воркери побачать нову
+# витрату не пізніше ніж за EXPENSE_STATS_TTL_SECONDS.
+EXPENSE_STATS_TTL_SECONDS = 300
+
+# Форма нового поповнення: скільки товарів показувати у швидкому виборі
+# "низький залишок" і скільки збігів повертає пошук товару.
+LOW_STOCK_QUICK_ADD_LIMIT = 100
+PRODUCT_SEARCH_LIMIT = 20
+
+
+def _contains_pattern(search):
+    """ILIKE-шаблон "містить search": % і _ з введення екрануються, щоб не
+    працювали як wildcard. Використовувати з escape="\\"."""
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _expenses_by_category(store_id, since):
+    """Суми витрат магазину за категоріями з дати since і загальна сума.
+
+    Postgres одразу збирає {категорія: сума} у jsonb_object_agg поверх
+    GROUP BY - один рядок з готовим dict, без Python-циклу по рядках."""
+    per_category = (
+        db.select(
+            WarehouseExpense.category.label("category"),
+            db.func.sum(WarehouseExpense.amount).label("amount"),
+        )
+        .where(WarehouseExpense.expense_date >= since, WarehouseExpense.store_id == store_id)
+        .group_by(WarehouseExpense.category)
+        .subquery()
+    )
+    by_category, total = db.session.execute(
+        db.select(
+            db.func.jsonb_object_agg(per_category.c.category, per_category.c.amount, type_=JSONB),
+            db.func.coalesce(db.func.sum(per_category.c.amount), 0),
+        )
+    ).one()
+    return by_category or {}, total
+
+
+@lru_cache(maxsize=256)
+def _monthly_expense_stats(store_id, first_day, _time_bucket):
+    """Суми витрат за категоріями з first_day і загальна сума (кешується)."""
+    return _expenses_by_category(store_id, first_day)
+
+
+register_cache(
+    "warehouse_stats",
+    _task_stats.cache_clear,
+    _stock_stats.cache_clear,
+    _replenishment_stats.cache_clear,
+    _monthly_expense_stats.cache_clear,
+)
+
+
+@warehouse_bp.after_request
+def _invalidate_stats_after_write(response):
+    # Невдалі запити нічого не записали - кеш не чіпаємо
+    if response.status_code < 400 and request.method == "POST":
+        notify_cache_dirty("warehouse_stats")
+    return response
+
 
 @warehouse_bp.route("/admin/warehouse")
 @admin_required
@@ -34,35 +182,23 @@ def admin_warehouse():
     status_filter = request.args.get("status", "")
     per_page = 20
 
-    query = WarehouseTask.query.filter_by(store_id=g.store.id)
+    # Шаблон показує номер пов'язаного замовлення - підтягуємо його тим
+    # самим запитом (лише id), а не окремим SELECT на кожен рядок.
+    query = WarehouseTask.query.options(joinedload(WarehouseTask.order).load_only(Order.id))\
+        .filter_by(store_id=g.store.id)
 
     if status_filter:
         query = query.filter(WarehouseTask.status == status_filter)
 
     if not status_filter:
-        active_statuses = [
-            ShipmentStatus.PENDING.value,
-            ShipmentStatus.PROCESSING.value,
-            ShipmentStatus.PACKED.value,
-            ShipmentStatus.READY.value,
-        ]
-        query = query.filter(WarehouseTask.status.in_(active_statuses))
+        query = query.filter(WarehouseTask.status.in_(ACTIVE_SHIPMENT_STATUSES))
 
     query = query.order_by(WarehouseTask.priority.asc(), WarehouseTask.created_at.desc())
 
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     tasks = pagination.items
 
-    stats = {
-        "pending": WarehouseTask.query.filter_by(status=ShipmentStatus.PENDING.value, store_id=g.store.id).count(),
-        "processing": WarehouseTask.query.filter_by(status=ShipmentStatus.PROCESSING.value, store_id=g.store.id).count(),
-        "packed": WarehouseTask.query.filter_by(status=ShipmentStatus.PACKED.value, store_id=g.store.id).count(),
-        "shipped_today": WarehouseTask.query.filter(
-            WarehouseTask.status == ShipmentStatus.SHIPPED.value,
-            WarehouseTask.store_id == g.store.id,
-            db.func.date(WarehouseTask.shipped_at) == db.func.current_date()
-        ).count(),
-    }
+    stats = _task_stats(g.store.id, _stats_bucket())
 
     return render_template(
         "admin/warehouse/tasks.html",
@@ -187,30 +323,20 @@ def admin_warehouse_stock():
         )
 
     if search:
+        pattern = _contains_pattern(search)
         query = query.filter(
             db.or_(
-                Product.name.ilike(f"%{search}%"),
-                Product.sku.ilike(f"%{search}%")
+                Product.name.ilike(pattern, escape="\\"),
+                Product.sku.ilike(pattern, escape="\\")
             )
         )
 
     query = query.order_by(Product.stock.asc(), Product.name.asc())
 
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = fast_paginate(query, page, per_page)
     products = pagination.items
 
-    stats = {
-        "total_products": Product.query.filter_by(is_active=True, store_id=g.store.id).count(),
-        "out_of_stock": Product.query.filter_by(is_active=True, stock=0, store_id=g.store.id).count(),
-        "low_stock": Product.query.filter(
-            Product.is_active == True,
-            Product.stock > 0,
-            Product.stock <= Product.min_stock,
-            Product.min_stock > 0,
-            Product.store_id == g.store.id,
-        ).count(),
-        "unresolved_alerts": LowStockAlert.query.filter_by(is_resolved=False, store_id=g.store.id).count(),
-    }
+    stats = _stock_stats(g.store.id, _stats_bucket())
 
     return render_template(
         "admin/warehouse/stock.html",
@@ -233,13 +359,20 @@ def admin_warehouse_stock_adjust(product_id):
     adjustment = request.form.get("adjustment", 0, type=int)
     reason = request.form.get("reason", "adjustment")
     notes = request.form.get("notes", "")
+    # Модалка на сторінці залишків шле форму через fetch() і оновлює рядок
+    # товару сама - їй відповідаємо JSON замість редиректу на повний
+    # рендер списку. POST без JS і далі отримує flash + редирект.
+    wants_json = request.accept_mimetypes.best == "application/json"
 
     if adjustment == 0:
-        flash(_("Введіть кількість для коригування"), "warning")
+        message = _("Введіть кількість для коригування")
+        if wants_json:
+            return jsonify({"success": False, "category": "warning", "message": message}), 400
+        flash(message, "warning")
         return redirect(url_for(".admin_warehouse_stock"))
 
     try:
-        StockMovement.record_movement(
+        movement = StockMovement.record_movement(
             product_id=product_id,
             quantity=adjustment,
             movement_type="adjustment",
@@ -248,10 +381,23 @@ def admin_warehouse_stock_adjust(product_id):
             performed_by="admin",
             store_id=g.store.id,
         )
-        flash(_("✅ Залишок '%(name)s' скориговано на %(adjustment)+d") % {"name": product.name, "adjustment": adjustment}, "success")
     except ValueError as e:
-        flash(_("❌ Помилка: %(error)s") % {"error": str(e)}, "danger")
+        message = _("❌ Помилка: %(error)s") % {"error": str(e)}
+        if wants_json:
+            return jsonify({"success": False, "category": "danger", "message": message}), 400
+        flash(message, "danger")
+        return redirect(url_for(".admin_warehouse_stock"))
 
+    message = _("✅ Залишок '%(name)s' скориговано на %(adjustment)+d") % {"name": product.name, "adjustment": adjustment}
+    if wants_json:
+        return jsonify({
+            "success": True,
+            "category": "success",
+            "message": message,
+            "stock": movement.stock_after,
+            "min_stock": product.min_stock or 0,
+        })
+    flash(message, "success")
     return redirect(url_for(".admin_warehouse_stock"))
 
 
@@ -261,20 +407,38 @@ def admin_warehouse_stock_history(product_id):
     """Історія руху товару."""
     product = Product.query.filter_by(id=product_id, store_id=g.store.id).first_or_404()
 
-    page = request.args.get("page", 1, type=int)
+    # Keyset-пагінація (як у b2b_orders): журнал руху товару лише росте,
+    # і OFFSET на далеких сторінках перебирав би всі новіші записи.
+    # Курсор "<created_at>,<id>" - останній запис попередньої сторінки;
+    # беремо на рядок більше, щоб знати про наступну сторінку без COUNT.
     per_page = 50
-
-    query = StockMovement.query.filter_by(product_id=product_id, store_id=g.store.id)\
-        .order_by(StockMovement.created_at.desc())
-
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    movements = pagination.items
+    query = StockMovement.query.filter_by(product_id=product_id, store_id=g.store.id)
+
+    cursor = request.args.get("cursor", "")
+    if cursor:
+        try:
+            cursor_ts, cursor_id = cursor.rsplit(",", 1)
+            query = query.filter(
+                tuple_(StockMovement.created_at, StockMovement.id) < (datetime.fromisoformat(cursor_ts), int(cursor_id))
+            )
+        except ValueError:
+            # Зіпсований курсор - просто показуємо першу сторінку
+            cursor = ""
+
+    movements = query.order_by(StockMovement.created_at.desc(), StockMovement.id.desc())\
+        .limit(per_page + 1).all()
+    next_cursor = None
+    if len(movements) > per_page:
+        movements = movements[:per_page]
+        last = movements[-1]
+        next_cursor = f"{last.created_at.isoformat()},{last.id}"
 
     return render_template(
         "admin/warehouse/stock_history.html",
         product=product,
         movements=movements,
-        pagination=pagination,
+        next_cursor=next_cursor,
+        is_first_page=not cursor,
     )
 
 
@@ -296,12 +460,7 @@ def admin_warehouse_replenishment():
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     orders = pagination.items
 
-    stats = {
-        "draft": ReplenishmentOrder.query.filter_by(status=ReplenishmentStatus.DRAFT.value, store_id=g.store.id).count(),
-        "pending": ReplenishmentOrder.query.filter_by(status=ReplenishmentStatus.PENDING.value, store_id=g.store.id).count(),
-        "ordered": ReplenishmentOrder.query.filter_by(status=ReplenishmentStatus.ORDERED.value, store_id=g.store.id).count(),
-        "shipped": ReplenishmentOrder.query.filter_by(status=ReplenishmentStatus.SHIPPED.value, store_id=g.store.id).count(),
-    }
+    stats = _replenishment_stats(g.store.id, _stats_bucket())
 
     return render_template(
         "admin/warehouse/replenishment.html",
@@ -327,6 +486,8 @@ def admin_warehouse_replenishment_new():
             status="draft",
             created_by="admin",
         )
+        # flush лише видає id для номера - замовлення, номер і позиції
+        # комітяться разом нижче, одною транзакцією.
         db.session.add(order)
         db.session.flush()
         order.generate_order_number()
@@ -335,41 +496,110 @@ def admin_warehouse_replenishment_new():
         quantities = request.form.getlist("quantities")
         prices = request.form.getlist("prices")
 
+        # Усі товари позицій - одним запитом (лише потрібні колонки), а не
+        # окремим SELECT на кожен рядок форми.
+        requested_ids = {int(product_id) for product_id in product_ids if product_id}
+        products = {
+            product.id: product
+            for product in db.session.query(Product.id, Product.name, Product.sku).filter(
+                Product.id.in_(requested_ids),
+                Product.store_id == g.store.id,
+            )
+        } if requested_ids else {}
+
+        rows = []
+        # Рядки з кількістю чи ціною, але без (чужого або не обраного) товару
+        # не мовчки відкидаємо - адмін бачить, які позиції не збережено.
+        skipped_rows = []
         for i, product_id in enumerate(product_ids):
-            if product_id:
-                product = Product.query.filter_by(id=int(product_id), store_id=g.store.id).first()
-                if product:
-                    item = ReplenishmentItem(
-                        store_id=g.store.id,
-                        replenishment_id=order.id,
-                        product_id=product.id,
-                        product_name=product.name,
-                        product_sku=product.sku,
-                        quantity=int(quantities[i]) if i < len(quantities) and quantities[i] else 1,
-                        unit_price=float(prices[i]) if i < len(prices) and prices[i] else 0.0,
-                    )
-                    db.session.add(item)
-
-        order.calculate_totals()
+            product = products.get(int(product_id)) if product_id else None
+            if product is None:
+                has_quantity = i < len(quantities) and quantities[i]
+                has_price = i < len(prices) and prices[i]
+                if product_id or has_quantity or has_price:
+                    skipped_rows.append(i + 1)
+                continue
+            rows.append({
+                "store_id": g.store.id,
+                "replenishment_id": order.id,
+                "product_id": product.id,
+                "product_name": product.name,
+                "product_sku": product.sku,
+                "quantity": int(quantities[i]) if i < len(quantities) and quantities[i] else 1,
+                "unit_price": float(prices[i]) if i < len(prices) and prices[i] else 0.0,
+            })
+
+        # Позиції - одним executemany INSERT без ORM-об'єктів у сесії; суми
+        # рахуємо з тих самих даних, не перечитуючи order.items.
+        if rows:
+            db.session.execute(db.insert(ReplenishmentItem), rows)
+        order.subtotal = sum(row["quantity"] * row["unit_price"] for row in rows)
+        order.total = order.subtotal + (order.shipping_cost or 0.0)
         db.session.commit()
 
         flash(_("✅ Замовлення %(order_number)s створено") % {"order_number": order.order_number}, "success")
+        if skipped_rows:
+            flash(
+                _("⚠️ Рядки %(rows)s без обраного товару не збережено") % {
+                    "rows": ", ".join(str(row) for row in skipped_rows)
+                },
+                "warning",
+            )
         return redirect(url_for(".admin_warehouse_replenishment_detail", id=order.id))
 
-    low_stock_products = Product.query.filter(
-        Product.is_active == True,
-        Product.stock <= Product.min_stock,
-        Product.min_stock > 0,
-        Product.store_id == g.store.id,
-    ).all()
+    # Весь каталог у сторінку більше не вантажимо: товари для рядків
+    # замовлення шукаються через admin_warehouse_products_search по мірі
+    # введення. Тут лише товари з низьким залишком для швидкого додавання -
+    # відбір у SQL і з обмеженням, щоб сторінка не росла разом з каталогом.
+    low_stock_products = (
+        Product.query.options(load_only(Product.id, Product.name, Product.sku, Product.stock, Product.min_stock))
+        .filter(
+            Product.is_active == True,
+            Product.store_id == g.store.id,
+            Product.min_stock > 0,
+            Product.stock <= Product.min_stock,
+        )
+        .order_by(Product.name)
+        .limit(LOW_STOCK_QUICK_ADD_LIMIT)
+        .all()
+    )
 
     return render_template(
         "admin/warehouse/replenishment_new.html",
         low_stock_products=low_stock_products,
-        products=Product.query.filter_by(is_active=True, store_id=g.store.id).order_by(Product.name).all(),
     )
 
 
+@warehouse_bp.route("/admin/warehouse/products/search")
+@admin_required
+def admin_warehouse_products_search():
+    """Пошук активних товарів магазину за назвою/SKU для форми поповнення
+    (JSON, не більше PRODUCT_SEARCH_LIMIT збігів)."""
+    search = request.args.get("q", "").strip()
+    if not search:
+        return jsonify([])
+
+    pattern = _contains_pattern(search)
+    products = (
+        db.session.query(Product.id, Product.name, Product.sku)
+        .filter(
+            Product.is_active == True,
+            Product.store_id == g.store.id,
+            db.or_(
+                Product.name.ilike(pattern, escape="\\"),
+                Product.sku.ilike(pattern, escape="\\"),
+            ),
+        )
+        .order_by(Product.name)
+        .limit(PRODUCT_SEARCH_LIMIT)
+        .all()
+    )
+    return jsonify([
+        {"id": product.id, "name": product.name, "sku": product.sku or ""}
+        for product in products
+    ])
+
+
 @warehouse_bp.route("/admin/warehouse/replenishment/<int:id>", methods=["GET", "POST"])
 @admin_required
 def admin_warehouse_replenishment_detail(id):
@@ -440,22 +670,17 @@ def admin_warehouse_expenses():
 
     query = query.order_by(WarehouseExpense.expense_date.desc())
 
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = fast_paginate(query, page, per_page)
     expenses = pagination.items
 
     today = date.today()
     first_day = today.replace(day=1)
 
-    monthly_stats = db.session.query(
-        WarehouseExpense.category,
-        db.func.sum(WarehouseExpense.amount)
-    ).filter(
-        WarehouseExpense.expense_date >= first_day,
-        WarehouseExpense.store_id == g.store.id,
-    ).group_by(WarehouseExpense.category).all()
-
-    stats_by_category = {cat: amt for cat, amt in monthly_stats}
-    total_monthly = sum(stats_by_category.values())
+    stats_by_category, total_monthly = _monthly_expense_stats(
+        g.store.id, first_day, int(time.time() // EXPENSE_STATS_TTL_SECONDS)
+    )
+    # Копія: шаблону віддаємо свій dict, а не об'єкт з кешу.
+    stats_by_category = dict(stats_by_category)
 
     return render_template(
         "admin/warehouse/expenses.html",
@@ -518,50 +743,40 @@ def admin_warehouse_reports():
     else:  # year
         start_date = today.replace(month=1, day=1)
 
-    shipments = {
-        "total": WarehouseTask.query.filter(
-            WarehouseTask.created_at >= start_date, WarehouseTask.store_id == g.store.id
-        ).count(),
-        "shipped": WarehouseTask.query.filter(
+    # По одному запиту на таблицю (COUNT/SUM ... FILTER) замість окремого
+    # count()/scalar() на кожну цифру звіту. WHERE обмежує скан рядками,
+    # що потрапляють хоча б в один з лічильників.
+    total, shipped, delivered = db.session.query(
+        db.func.count(WarehouseTask.id).filter(WarehouseTask.created_at >= start_date),
+        db.func.count(WarehouseTask.id).filter(WarehouseTask.shipped_at >= start_date),
+        db.func.count(WarehouseTask.id).filter(WarehouseTask.delivered_at >= start_date),
+    ).filter(
+        WarehouseTask.store_id == g.store.id,
+        db.or_(
+            WarehouseTask.created_at >= start_date,
             WarehouseTask.shipped_at >= start_date,
-            WarehouseTask.shipped_at.isnot(None),
-            WarehouseTask.store_id == g.store.id,
-        ).count(),
-        "delivered": WarehouseTask.query.filter(
             WarehouseTask.delivered_at >= start_date,
-            WarehouseTask.delivered_at.isnot(None),
-            WarehouseTask.store_id == g.store.id,
-        ).count(),
-    }
-
-    replenishments = {
-        "total": ReplenishmentOrder.query.filter(
-            ReplenishmentOrder.created_at >= start_date, ReplenishmentOrder.store_id == g.store.id
-        ).count(),
-        "received": ReplenishmentOrder.query.filter(
-            ReplenishmentOrder.received_at >= start_date,
-            ReplenishmentOrder.received_at.isnot(None),
-            ReplenishmentOrder.store_id == g.store.id,
-        ).count(),
-        "total_cost": db.session.query(db.func.sum(ReplenishmentOrder.total)).filter(
+        ),
+    ).one()
+    shipments = {"total": total, "shipped": shipped, "delivered": delivered}
+
+    # count(*), а не count(id): усі колонки запиту є в
+    # ix_replenishment_orders_store_created, тож Postgres не читає таблицю.
+    total, received, total_cost = db.session.query(
+        db.func.count().filter(ReplenishmentOrder.created_at >= start_date),
+        db.func.count().filter(ReplenishmentOrder.received_at >= start_date),
+        db.func.coalesce(db.func.sum(ReplenishmentOrder.total).filter(ReplenishmentOrder.received_at >= start_date), 0),
+    ).filter(
+        ReplenishmentOrder.store_id == g.store.id,
+        db.or_(
+            ReplenishmentOrder.created_at >= start_date,
             ReplenishmentOrder.received_at >= start_date,
-            ReplenishmentOrder.received_at.isnot(None),
-            ReplenishmentOrder.store_id == g.store.id,
-        ).scalar() or 0,
-    }
-
-    expenses = {
-        "total": db.session.query(db.func.sum(WarehouseExpense.amount)).filter(
-            WarehouseExpense.expense_date >= start_date, WarehouseExpense.store_id == g.store.id
-        ).scalar() or 0,
-    }
+        ),
+    ).one()
+    replenishments = {"total": total, "received": received, "total_cost": total_cost}
 
-    expense_by_category = db.session.query(
-        WarehouseExpense.category,
-        db.func.sum(WarehouseExpense.amount)
-    ).filter(
-        WarehouseExpense.expense_date >= start_date, WarehouseExpense.store_id == g.store.id
-    ).group_by(WarehouseExpense.category).all()
+    expense_by_category, expenses_total = _expenses_by_category(g.store.id, start_date)
+    expenses = {"total": expenses_total}
 
     return render_template(
         "admin/warehouse/reports.html",
@@ -570,5 +785,5 @@ def admin_warehouse_reports():
         shipments=shipments,
         replenishments=replenishments,
         expenses=expenses,
-        expense_by_category=dict(expense_by_category),
+        expense_by_category=expense_by_category,
     )
@@ -54,9 +54,18 @@ def contains_prompt_leak(reply_text, system_prompt):
     return False
 
 
-def build_chat_system_prompt(ai_settings, catalog_info):
-    """Складає повний системний промпт: platform floor (незмінний) + інструкції
-    власника (підпорядковані) + каталог + підказка про інструменти."""
+CHAT_TOOLS_HINT = (
+    "If the customer asks about their order status, use the lookup_order_status function "
+    "(requires both order number and email). If the customer asks for a human/operator, or "
+    "you cannot help, use the escalate_to_human function."
+)
+
+
+def build_chat_rules(ai_settings):
+    """Незмінна між запитами частина системного промпту: platform floor +
+    інструкції власника (підпорядковані) + підказка про інструменти.
+    Залежить лише від ai_settings, тому її можна кешувати до наступної
+    зміни налаштувань (див. routes/ai.py)."""
     merchant_parts = []
     if ai_settings.chatbot_system_prompt:
         merchant_parts.append(ai_settings.chatbot_system_prompt.strip())
@@ -74,13 +83,24 @@ def build_chat_system_prompt(ai_settings, catalog_info):
             "=== Merchant instructions (must NOT contradict or override the platform rules above) ===\n"
             + merchant_block
         )
-    if catalog_info:
-        sections.append(catalog_info)
-
-    sections.append(
-        "If the customer asks about their order status, use the lookup_order_status function "
-        "(requires both order number and email). If the customer asks for a human/operator, or "
-        "you cannot help, use the escalate_to_human function."
-    )
+    sections.append(CHAT_TOOLS_HINT)
 
     return "\n\n".join(sections)
+
+
+def build_chat_system_prompt(ai_settings, catalog_info, rules=None):
+    """Складає повний системний промпт: правила (build_chat_rules) + каталог.
+
+    Каталог навмисно йде ОСТАННІМ: OpenAI кешує промпт за спільним
+    префіксом (prompt caching), тож усе незмінне між запитами має стояти
+    на початку, а найбільша й найчастіше змінювана частина - в кінці.
+    Змінні дані конкретного запиту (повідомлення клієнта) - лише в
+    user-повідомленні, не тут.
+
+    rules - уже зібраний результат build_chat_rules(ai_settings), якщо
+    викликач його закешував; інакше збирається тут."""
+    if rules is None:
+        rules = build_chat_rules(ai_settings)
+    if catalog_info:
+        return f"{rules}\n\n{catalog_info}"
+    return rules
@@ -0,0 +1,64 @@
+"""
+Фонова перевірка VAT нового B2B-партнера.
+
+Раніше user_register_b2b() викликав VIES прямо в обробнику POST: клієнт
+чекав на відповідь зовнішнього API (кілька секунд, до 30 с таймауту), а
+gunicorn-воркер весь цей час був зайнятий. Тепер компанія створюється
+одразу в статусі PENDING, а перевірка VAT (і, якщо магазин увімкнув
+b2b_auto_approve, автоматичне схвалення з листом) виконується в окремому
+потоці - тим самим підходом, що й відправка листів у email_service
+(Thread + app object), без окремої черги/брокера завдань.
+"""
+from datetime import datetime
+from threading import Thread
+
+from flask import current_app
+
+
+def start_company_vat_verification(company_id, locale=None):
+    """Запускає перевірку VAT компанії company_id у фоновому потоці.
+    Компанія вже має бути закомічена - потік читає її заново зі своєї сесії."""
+    app = current_app._get_current_object()
+    Thread(target=_verify_company_vat, args=(app, company_id, locale), daemon=True).start()
+
+
+def _verify_company_vat(app, company_id, locale):
+    from extensions import db
+    from models.company import Company, CompanyStatus
+    from models.settings import SiteSettings
+    from services.vat_checker import check_vat_number
+
+    # test_request_context, а не лише app_context: листи рендеряться через
+    # render_template, а глобальні context processor-и (кошик, імперсонація)
+    # читають session, якої поза запитом немає.
+    with app.test_request_context():
+        try:
+            company = db.session.get(Company, company_id)
+            if not company or not company.vat_number:
+                return
+
+            vat_result = check_vat_number(company.vat_number)
+            company.vat_verified = bool(vat_result.get("valid"))
+            company.vat_data = vat_result
+            if company.vat_verified:
+                company.vat_verified_at = datetime.utcnow()
+                settings = SiteSettings.get_or_create(company.store_id)
+                if getattr(settings, "b2b_auto_approve", False) and company.status == CompanyStatus.PENDING.value:
+                    company.status = CompanyStatus.VERIFIED.value
+            db.session.commit()
+
+            app.logger.info(
+                "B2B VAT check for company_id=%s: valid=%s, error=%s",
+                company_id, company.vat_verified, vat_result.get("error"),
+            )
+
+            if company.is_verified:
+                from services.email_service import send_b2b_verification_approved
+                send_b2b_verification_approved(
+                    company.contact_email, company.name, company.discount_percent or 0, locale=locale
+                )
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error("Background VAT check failed for company_id=%s: %s", company_id, e)
+        finally:
+            db.session.remove()
@@ -0,0 +1,88 @@
+"""
+Буферизований лічильник переглядів статей блогу.
+
+Раніше кожен перегляд /blog/<slug> робив views += 1 і commit: публічна
+сторінка на читання щоразу писала в БД і брала блокування рядка статті,
+тож популярна стаття серіалізувала своїх читачів. Тепер перегляд лише
+додається до лічильника в пам'яті процесу, а фоновий потік раз на
+VIEWS_FLUSH_SECONDS записує накопичене одним executemany
+UPDATE blog_posts SET views = views + :n по кожній переглянутій статті.
+
+Лічильник у кожного gunicorn-воркера свій - кожен і скидає свій, а
+views + :n на боці БД складає їх без втрат. Потік запускається ліниво
+при першому перегляді (після fork-у воркера), як і листи в
+email_service - Thread + app object, без окремого брокера. При
+нормальній зупинці процесу залишок скидається через atexit; при
+аварійній можна втратити перегляди останніх секунд - для лічильника
+переглядів це прийнятно.
+"""
+import atexit
+import time
+from collections import Counter
+from threading import Lock, Thread
+
+from flask import current_app
+
+VIEWS_FLUSH_SECONDS = 30
+
+_pending = Counter()
+_lock = Lock()
+_flusher_started = False
+
+
+def record_view(post_id):
+    """Додає перегляд статті post_id до буфера процесу (без запиту до БД)."""
+    global _flusher_started
+    with _lock:
+        _pending[post_id] += 1
+        if _flusher_started:
+            return
+        _flusher_started = True
+    app = current_app._get_current_object()
+    Thread(target=_flush_forever, args=(app,), daemon=True).start()
+    atexit.register(_flush_in_app_context, app)
+
+
+def flush_views():
+    """Записує накопичені перегляди в БД. Потрібен app context."""
+    from extensions import db
+    from models.blog import BlogPost
+
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return
+
+    table = BlogPost.__table__
+    try:
+        db.session.execute(
+            table.update()
+            .where(table.c.id == db.bindparam("post_id"))
+            .values(views=db.func.coalesce(table.c.views, 0) + db.bindparam("n")),
+            [{"post_id": post_id, "n": n} for post_id, n in pending.items()],
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        # Повертаємо перегляди в буфер - спробуємо наступного разу
+        with _lock:
+            _pending.update(pending)
+        raise
+
+
+def _flush_in_app_context(app):
+    with app.app_context():
+        try:
+            flush_views()
+        except Exception as e:
+            app.logger.warning(f"Could not flush blog post views: {e}")
+        finally:
+            from extensions import db
+            db.session.remove()
+
+
+def _flush_forever(app):
+    while True:
+        time.sleep(VIEWS_FLUSH_SECONDS)
+        _flush_in_app_context(app)
@@ -0,0 +1,123 @@
+"""
+Узгоджене скидання кешів процесу між gunicorn-воркерами через Postgres
+LISTEN/NOTIFY.
+
+Лічильники адмінки (блог, склад, CRM), налаштування ШІ і знімки
+SiteSettings кешуються в кожному воркері на коротке вікно. Запис скидав кеш лише свого
+процесу - інші воркери до кінця TTL віддавали старі цифри. Тепер запис
+викликає notify_cache_dirty(name): свій кеш скидається одразу, а
+pg_notify розсилає ім'я кешу решті воркерів, де його слухає фоновий потік
+start_cache_listener. Окремого брокера (Redis) не потрібно - канал іде
+тією ж базою. TTL кешів лишається страховкою на випадок втрачених
+повідомлень (перепідключення слухача теж скидає все).
+"""
+import os
+import select
+import time
+from threading import Thread
+
+import sqlalchemy as sa
+from flask import current_app, has_app_context
+
+from extensions import db
+
+CHANNEL = "smartshop_cache_dirty"
+
+# Як часто слухач прокидається без повідомлень - щоб помітити мертве
+# з'єднання, а не чекати на ньому вічно.
+LISTEN_POLL_SECONDS = 30
+RECONNECT_DELAY_SECONDS = 5
+
+# ім'я кешу -> функції скидання (lru_cache.cache_clear тощо)
+_caches = {}
+
+
+def register_cache(name, *clear_functions):
+    """Реєструє функції скидання кешу name (викликається при імпорті модуля)."""
+    _caches.setdefault(name, []).extend(clear_functions)
+
+
+def clear_local(name=None):
+    """Скидає кеш name (або всі зареєстровані) лише в поточному процесі."""
+    for cache_name in ([name] if name else list(_caches)):
+        for clear in _caches.get(cache_name, ()):
+            clear()
+
+
+def notify_cache_dirty(name):
+    """Скидає кеш name у цьому процесі і повідомляє інші воркери.
+
+    pg_notify іде окремим з'єднанням з пулу: сесію запиту не комітимо -
+    в after_request вона може тримати незавершені зміни view, що впав.
+    Викликати після коміту самого запису, інакше інші воркери можуть
+    перечитати ще старі дані."""
+    clear_local(name)
+    if not _is_postgres():
+        return
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(
+                sa.text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": CHANNEL, "payload": name},
+            )
+    except Exception as e:
+        current_app.logger.warning(f"Could not notify other workers about cache '{name}': {e}")
+
+
+def broadcast_cache_dirty(name):
+    """Як notify_cache_dirty, але без помилки поза app context - для
+    ORM-подій (after_commit), що бувають і в скриптах без застосунку."""
+    if not has_app_context():
+        clear_local(name)
+        return
+    notify_cache_dirty(name)
+
+
+def start_cache_listener(app):
+    """Запускає в цьому воркері потік, що слухає CHANNEL і скидає кеші.
+    Як і start_blog_scheduler, приймає app явним параметром."""
+    if os.environ.get("DISABLE_CACHE_LISTENER") == "1":
+        return
+    with app.app_context():
+        if not _is_postgres():
+            return
+    Thread(target=_listen_forever, args=(app,), daemon=True).start()
+
+
+def _is_postgres():
+    return db.engine.url.get_backend_name().startswith("postgres")
+
+
+def _listen_forever(app):
+    while True:
+        try:
+            _listen(app)
+        except Exception as e:
+            app.logger.warning(f"Cache invalidation listener reconnecting: {e}")
+        time.sleep(RECONNECT_DELAY_SECONDS)
+
+
+def _listen(app):
+    # Окреме з'єднання, від'єднане від пулу: LISTEN тримає його постійно,
+    # і займати ним слот пулу запитів не можна.
+    with app.app_context():
+        pooled = db.engine.raw_connection()
+    pooled.detach()
+    conn = pooled.dbapi_connection
+    try:
+        conn.rollback()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {CHANNEL}")
+        # Поки слухача не було, повідомлення могли загубитися
+        clear_local()
+
+        while True:
+            select.select([conn], [], [], LISTEN_POLL_SECONDS)
+            conn.poll()
+            names = {notify.payload for notify in conn.notifies}
+            conn.notifies.clear()
+            for name in names:
+                clear_local(name)
+    finally:
+        pooled.close()
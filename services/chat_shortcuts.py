@@ -0,0 +1,71 @@
+"""
+Дешеві "короткі шляхи" для чат-бота, що дозволяють відповісти без виклику
+OpenAI: привітання на початку розмови і повторні однакові перші питання.
+
+Значна частина перших повідомлень у чаті - просто "привіт"/"hello", на які
+модель щоразу відповідає одним і тим самим запрошенням до розмови, а ми
+щоразу платимо за весь системний промпт з каталогом. Тут лише чисті
+функції без Flask/БД - кеш відповідей і рішення, коли його застосовувати,
+живуть у routes/ai.py.
+"""
+import hashlib
+import re
+from functools import lru_cache
+
+_MAX_NORMALIZED_LENGTH = 256
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = " .,!?)(:;-–—👋🙂😊"
+
+GREETINGS = {
+    "привіт": "uk",
+    "вітаю": "uk",
+    "добрий день": "uk",
+    "доброго дня": "uk",
+    "добрий вечір": "uk",
+    "доброго ранку": "uk",
+    "hello": "en",
+    "hi": "en",
+    "hey": "en",
+    "good morning": "en",
+    "good afternoon": "en",
+    "good evening": "en",
+    "hallo": "de",
+    "guten tag": "de",
+    "guten morgen": "de",
+    "guten abend": "de",
+    "servus": "de",
+}
+
+# PLATFORM_FLOOR (п.1) вимагає не приховувати, що це AI - тож і шаблонна
+# відповідь прямо про це каже.
+GREETING_REPLIES = {
+    "uk": "Вітаю! Я ШІ-помічник цього магазину. Підкажу щодо товарів, замовлень чи доставки - що вас цікавить?",
+    "en": "Hello! I'm this store's AI assistant. I can help with products, orders or shipping - what are you looking for?",
+    "de": "Hallo! Ich bin der KI-Assistent dieses Shops. Ich helfe gern bei Produkten, Bestellungen oder Versand - wonach suchen Sie?",
+}
+
+
+def normalize_message(message):
+    """Нормалізує повідомлення для порівняння: нижній регістр, схлопнуті
+    пробіли, без кінцевої пунктуації/емодзі, не довше 256 символів."""
+    return _normalize(message)[:_MAX_NORMALIZED_LENGTH]
+
+
+def message_cache_key(message):
+    """Ключ кешу відповідей: sha256 ПОВНОГО нормалізованого повідомлення.
+
+    normalize_message обрізає текст, і два довгі питання з однаковим
+    початком отримали б відповідь одне одного."""
+    return hashlib.sha256(_normalize(message).encode("utf-8")).hexdigest()
+
+
+def _normalize(message):
+    normalized = _WHITESPACE_RE.sub(" ", (message or "").strip().lower())
+    return normalized.strip(_TRAILING_PUNCTUATION)
+
+
+@lru_cache(maxsize=1024)
+def canned_reply(normalized_message):
+    """Готова відповідь на привітання без жодного питання, або None."""
+    lang = GREETINGS.get(normalized_message)
+    return GREETING_REPLIES[lang] if lang else None
@@ -0,0 +1,150 @@
+"""
+Щоденна перевірка надійності B2B-партнерів магазину (VAT/WHOIS/HR через
+partner_verifier) у фоновому потоці.
+
+Раніше /admin/crm/run-daily-check проходив усі компанії прямо в запиті:
+кілька мережевих викликів на компанію, тож уже на десятках партнерів
+запит упирався в таймаут gunicorn і займав воркер. Тепер обробник лише
+запускає потік (той самий підхід Thread + app object, що й
+services/b2b_verification.py) і одразу відповідає; прогрес адмінка
+опитує через /admin/crm/daily-check-status - він рахується з
+VerificationLog/AdminAlert у БД, тож не залежить від того, в якому
+gunicorn-воркері крутиться потік.
+"""
+from datetime import datetime
+from threading import Thread
+
+from flask import current_app
+from sqlalchemy.orm import defer
+
+DAILY_CHECK_TYPE = "daily"
+
+
+def start_daily_check(store_id):
+    """Запускає перевірку партнерів магазину у фоні. Повертає (started_at,
+    кількість компаній) - за ними адмінка стежить за прогресом."""
+    from models.company import Company
+
+    company_ids = [
+        company_id for (company_id,) in Company.query.with_entities(Company.id).filter(
+            Company.status.in_(["verified", "pending"]),
+            Company.store_id == store_id,
+        )
+    ]
+    started_at = datetime.utcnow()
+    app = current_app._get_current_object()
+    Thread(target=_run_daily_check, args=(app, store_id, company_ids), daemon=True).start()
+    return started_at, len(company_ids)
+
+
+def _run_daily_check(app, store_id, company_ids):
+    from extensions import db
+
+    with app.app_context():
+        checked = 0
+        alerts_created = 0
+        try:
+            for company_id in company_ids:
+                alerts = verify_company(company_id, store_id)
+                if alerts is not None:
+                    checked += 1
+                    alerts_created += alerts
+            app.logger.info(
+                "CRM daily check for store_id=%s: %s/%s companies checked, %s alerts",
+                store_id, checked, len(company_ids), alerts_created,
+            )
+        finally:
+            db.session.remove()
+
+
+def verify_company(company_id, store_id=None):
+    """Перевіряє одну компанію і комітить результат - кожна компанія
+    окремо, щоб прогрес було видно в адмінці ще під час перевірки.
+    Повертає кількість створених алертів або None, якщо перевірка впала
+    або компанію вже видалено (тоді пишеться лог з помилкою - інакше
+    адмінка не дорахується компаній і опитуватиме прогрес без кінця)."""
+    from extensions import db
+    from models.company import Company, AdminAlert, VerificationLog
+    from services.partner_verifier import partner_verifier
+
+    # JSON-колонки з минулими результатами перевірок тут лише
+    # перезаписуються - не вантажимо їх; для порівняння є
+    # Company.previous_verification з окремих колонок.
+    company = db.session.get(
+        Company,
+        company_id,
+        options=[defer(Company.last_verification_data), defer(Company.vat_data),
+                 defer(Company.whois_data), defer(Company.hr_data)],
+    )
+    if company is None:
+        VerificationLog.log_check(
+            company_id=None,
+            check_type=DAILY_CHECK_TYPE,
+            status="error",
+            is_valid=False,
+            error_message=f"Company #{company_id} not found",
+            store_id=store_id,
+        )
+        return None
+
+    try:
+        result = partner_verifier.full_verification(
+            company_name=company.name,
+            vat_number=company.full_vat_number,
+            domain=company.domain or company.website,
+            hr_number=company.handelsregister_id,
+            country_code=company.country_code,
+            city=company.city,
+            previous_result=company.previous_verification,
+        )
+
+        company.reliability_score = result.get("reliability_score", 0)
+        company.reliability_level = result.get("reliability_level", "critical")
+        company.last_verification_at = datetime.utcnow()
+        company.remember_verification(result)
+
+        if result.get("vat_result", {}).get("valid"):
+            company.vat_verified = True
+            company.vat_data = result["vat_result"]
+
+        if result.get("whois_result", {}).get("valid"):
+            company.is_whois_verified = True
+            company.whois_data = result["whois_result"]
+
+        if result.get("hr_result", {}).get("valid"):
+            company.is_hr_verified = True
+            company.hr_data = result["hr_result"]
+
+        VerificationLog.log_check(
+            company_id=company.id,
+            check_type=DAILY_CHECK_TYPE,
+            status="success",
+            is_valid=result.get("reliability_score", 0) >= 50,
+            response_data=result,
+            changes_detected=len(result.get("changes", [])) > 0,
+            store_id=company.store_id,
+            commit=False,
+        )
+
+        # Алерти - одним executemany разом з логом і оновленням компанії:
+        # create_alert() робив окремий INSERT + commit на кожен алерт.
+        alerts_created = AdminAlert.bulk_create_from_verification(
+            result.get("alerts", []),
+            company_id=company.id,
+            store_id=company.store_id,
+            title_prefix=company.name,
+        )
+        db.session.commit()
+        return alerts_created
+
+    except Exception as e:
+        db.session.rollback()
+        VerificationLog.log_check(
+            company_id=company_id,
+            check_type=DAILY_CHECK_TYPE,
+            status="error",
+            is_valid=False,
+            error_message=str(e),
+            store_id=store_id,
+        )
+        return None
@@ -79,7 +79,7 @@ class DailyVerificationJob:
                 
                 try:
                     # Попередній результат для порівняння
-                    previous_result = company.last_verification_data
+                    previous_result = company.previous_verification
                     
                     # Повна верифікація
                     verification = partner_verifier.full_verification(
@@ -97,7 +97,7 @@ class DailyVerificationJob:
                     company.reliability_score = verification.get("reliability_score", 0)
                     company.reliability_level = verification.get("reliability_level", "critical")
                     company.last_verification_at = datetime.utcnow()
-                    company.last_verification_data = verification
+                    company.remember_verification(verification)
                     
                     # Оновлюємо статуси окремих перевірок
                     if verification.get("vat_result", {}).get("valid"):
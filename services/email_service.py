@@ -10,16 +10,66 @@ Email сервіс для SmartShop AI.
 """
 
 import os
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from flask import render_template, current_app
 from flask_mail import Mail, Message
 from flask_babel import force_locale, gettext as _
-from threading import Thread
 
 
 mail = Mail()
 
 DEFAULT_LOCALE = "uk"
 
+# Листи йдуть через невеликий спільний пул потоків замість нового Thread
+# на кожен лист: обробник (підтвердження партнера в CRM, реєстрація, ...)
+# повертається одразу після коміту, а масові розсилки (дайджест блогу,
+# алерти) не відкривають десятки одночасних SMTP-з'єднань. Тимчасові
+# збої SMTP (обрив, 4xx) повторюються з експоненційною паузою.
+MAIL_SEND_WORKERS = int(os.environ.get("MAIL_SEND_WORKERS", 3))
+MAIL_SEND_RETRIES = 3
+MAIL_RETRY_BACKOFF_SECONDS = 2
+
+_mail_executor = ThreadPoolExecutor(max_workers=MAIL_SEND_WORKERS, thread_name_prefix="mail")
+
+# Кожен потік пулу тримає власне SMTP-з'єднання між листами замість
+# TCP+TLS+AUTH на кожен лист (mail.send() відкриває і закриває його щоразу)
+# - серії листів (схвалення партнерів, алерти, дайджест) йдуть по
+# відкритому з'єднанню. Після MAIL_MAX_EMAILS листів Flask-Mail сам
+# перепідключається; з'єднання, що простояло довше
+# MAIL_CONNECTION_IDLE_SECONDS, закриваємо заздалегідь - сервери рвуть
+# неактивні сесії, і лист інакше впав би на першій спробі.
+MAIL_CONNECTION_IDLE_SECONDS = 60
+
+_smtp_local = threading.local()
+
+
+def _pooled_connection():
+    """SMTP-з'єднання поточного потоку пулу (відкриває нове за потреби)."""
+    connection = getattr(_smtp_local, "connection", None)
+    if connection is not None and time.monotonic() - _smtp_local.last_used > MAIL_CONNECTION_IDLE_SECONDS:
+        _drop_pooled_connection()
+        connection = None
+    if connection is None:
+        connection = mail.connect().__enter__()
+        _smtp_local.connection = connection
+    _smtp_local.last_used = time.monotonic()
+    return connection
+
+
+def _drop_pooled_connection():
+    """Закриває з'єднання потоку - після помилки воно може бути в
+    невизначеному стані, наступна спроба відкриє нове."""
+    connection = getattr(_smtp_local, "connection", None)
+    _smtp_local.connection = None
+    if connection is not None and connection.host is not None:
+        try:
+            connection.host.quit()
+        except Exception:
+            pass
+
 
 def _locale_or_default(locale):
     """Мова листа: явно передана (напр. order.locale) або дефолтна платформи."""
@@ -41,6 +91,8 @@ def init_mail(app):
     app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
     app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
     app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@smartshop.com')
+    # Скільки листів відправляти по одному SMTP-з'єднанню (див. _pooled_connection)
+    app.config['MAIL_MAX_EMAILS'] = int(os.environ.get('MAIL_MAX_EMAILS', 100))
     
     mail.init_app(app)
     
@@ -56,24 +108,41 @@ def init_mail(app):
 
 def send_async_email(app, msg):
     """
-    Відправка email в окремому потоці (не блокує request).
+    Відправка email у потоці пулу _mail_executor (не блокує request) по
+    SMTP-з'єднанню цього потоку. Тимчасові помилки SMTP повторюються до
+    MAIL_SEND_RETRIES разів.
     
     Args:
         app: Flask app context
         msg: Flask-Mail Message object
     """
     with app.app_context():
-        try:
-            mail.send(msg)
-            app.logger.info('Email sent successfully', extra={
-                'subject': msg.subject,
-                'recipients': msg.recipients
-            })
-        except Exception as e:
-            app.logger.error(f'Failed to send email: {str(e)}', extra={
-                'subject': msg.subject,
-                'recipients': msg.recipients
-            }, exc_info=True)
+        for attempt in range(1, MAIL_SEND_RETRIES + 1):
+            try:
+                _pooled_connection().send(msg)
+                app.logger.info('Email sent successfully', extra={
+                    'subject': msg.subject,
+                    'recipients': msg.recipients
+                })
+                return
+            except smtplib.SMTPResponseException as e:
+                # 4xx - тимчасова відмова сервера, 5xx - остаточна
+                error, transient = e, e.smtp_code < 500
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError) as e:
+                error, transient = e, True
+            except Exception as e:
+                error, transient = e, False
+
+            _drop_pooled_connection()
+            if not transient or attempt == MAIL_SEND_RETRIES:
+                break
+            app.logger.warning('Email send attempt %s failed, retrying: %s', attempt, error)
+            time.sleep(MAIL_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+        app.logger.error(f'Failed to send email: {str(error)}', extra={
+            'subject': msg.subject,
+            'recipients': msg.recipients
+        }, exc_info=error)
 
 
 def send_email(subject, recipients, html_body, text_body=None):
@@ -97,8 +166,8 @@ def send_email(subject, recipients, html_body, text_body=None):
         body=text_body or html_body
     )
     
-    # Відправка в окремому потоці
-    Thread(target=send_async_email, args=(current_app._get_current_object(), msg)).start()
+    # Відправка у фоновому пулі
+    _mail_executor.submit(send_async_email, current_app._get_current_object(), msg)
 
 
 # ==========================================
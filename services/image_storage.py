@@ -13,13 +13,17 @@ from werkzeug.utils import secure_filename
 
 from extensions import db
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
-ALLOWED_MIME_TYPES = {
-    'image/png',
-    'image/jpeg',
-    'image/gif',
-    'image/webp',
+# Розширення -> канонічний MIME-тип. Обидві множини нижче - frozenset,
+# похідні від цього словника, щоб список дозволених форматів жив в одному місці.
+IMAGE_MIME_BY_EXTENSION = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+    'webp': 'image/webp',
 }
+ALLOWED_EXTENSIONS = frozenset(IMAGE_MIME_BY_EXTENSION)
+ALLOWED_MIME_TYPES = frozenset(IMAGE_MIME_BY_EXTENSION.values())
 
 
 def allowed_file(filename, content_type=None):
@@ -27,10 +31,8 @@ def allowed_file(filename, content_type=None):
     if not filename or '.' not in filename:
         return False
 
-    filename = secure_filename(filename)
-
-    ext = filename.rsplit('.', 1)[1].lower()
-    if ext not in ALLOWED_EXTENSIONS:
+    _, _, ext = secure_filename(filename).rpartition('.')
+    if ext.lower() not in ALLOWED_EXTENSIONS:
         return False
 
     if content_type and content_type not in ALLOWED_MIME_TYPES:
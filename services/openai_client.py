@@ -8,6 +8,9 @@ app.py, з nonlocal-кешем). Винесено сюди, щоб blueprints (A
 відрізняється від попереднього closure-варіанту, там теж був один
 екземпляр на процес).
 """
+import atexit
+import os
+
 from flask import current_app
 
 try:
@@ -18,28 +21,73 @@ except ImportError:
     OPENAI_AVAILABLE = False
     _openai_module = None
 
+# HTTP/2 в httpx потребує окремого пакета h2 (extra httpx[http2]). Якщо його
+# немає - лишаємось на HTTP/1.1 keep-alive пулі, як і раніше.
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 _client = None
 
+# Масова генерація блогу тримає одночасно до BLOG_PLAN_WORKERS x
+# BLOG_AI_WORKERS запитів (плюс чат) - стільки з'єднань має лишатися в
+# пулі keep-alive, щоб не відкривати нові з TLS-handshake.
+OPENAI_MAX_CONNECTIONS = 100
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 50
+
 
 def get_openai_client():
     """Lazy-ініціалізація клієнта OpenAI з кастомним httpx-клієнтом (без proxy,
-    щоб SDK не намагався використати HTTP_PROXY з середовища)."""
+    щоб SDK не намагався використати HTTP_PROXY з середовища).
+
+    Один клієнт на процес: з'єднання з api.openai.com лишаються в пулі
+    keep-alive між запитами чату, тож TLS-handshake платимо лише раз. З h2
+    конкурентні запити воркера мультиплексуються в одному з'єднанні."""
     global _client
     if _client is None and OPENAI_AVAILABLE and current_app.config.get("OPENAI_API_KEY"):
         try:
             import httpx
 
             custom_http_client = httpx.Client(
+                http2=HTTP2_AVAILABLE,
                 timeout=60.0,
-                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                ),
             )
             _client = OpenAI(
                 api_key=current_app.config["OPENAI_API_KEY"],
                 http_client=custom_http_client,
             )
             sdk_version = getattr(_openai_module, "__version__", "unknown")
-            current_app.logger.info(f"OpenAI client initialized (SDK {sdk_version})")
+            current_app.logger.info(f"OpenAI client initialized (SDK {sdk_version}, http2={HTTP2_AVAILABLE})")
         except Exception as e:
             current_app.logger.error(f"Failed to initialize OpenAI client: {type(e).__name__}: {e}")
             _client = None
     return _client
+
+
+def close_openai_client():
+    """Закриває пул з'єднань клієнта (при зупинці процесу)."""
+    global _client
+    if _client is not None:
+        try:
+            _client.close()
+        except Exception:
+            pass
+        _client = None
+
+
+def _forget_client_after_fork():
+    # Сокети пулу, відкриті до fork-у, не можна ділити з батьківським
+    # процесом - дочірній (gunicorn-воркер) створить свій клієнт ліниво
+    global _client
+    _client = None
+
+
+atexit.register(close_openai_client)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_client_after_fork)
@@ -0,0 +1,83 @@
+"""
+Обмеження темпу масових запитів до OpenAI (генерація статей блогу,
+переклади, обкладинки).
+
+"Згенерувати всі pending" і переклади запускають десятки запитів з
+пулів потоків. Без обмеження вони впираються в ліміти акаунта (запитів і
+токенів на хвилину), отримують 429 і чекають backoff - пачка замість
+рівного потоку. Тут - відра токенів на процес (запити/хв і токени/хв,
+як у api_request_parallel_processor з openai-cookbook): потік чекає, поки
+у відрах є місце, і лише тоді робить запит. Токени рахуємо наближено
+(символи / 4 + max_tokens - OpenAI теж резервує max_tokens під ліміт), без
+tiktoken. Обкладинки (images.generate) мають в OpenAI окремий і набагато
+нижчий ліміт зображень на хвилину - для них своє відро
+(OPENAI_IMAGES_PER_MINUTE), чатовий RPM їх не стримує. Повтори після 429 і
+обривів з'єднання з урахуванням Retry-After робить сам SDK - масовим запитам даємо більше спроб (OPENAI_BULK_MAX_RETRIES).
+
+Ліміти - на один gunicorn-воркер: задавайте OPENAI_RPM_LIMIT /
+OPENAI_TPM_LIMIT / OPENAI_IMAGES_PER_MINUTE як ліміт акаунта, поділений на
+кількість воркерів.
+"""
+import os
+import time
+from threading import Lock
+
+OPENAI_RPM_LIMIT = int(os.environ.get("OPENAI_RPM_LIMIT", 500))
+OPENAI_TPM_LIMIT = int(os.environ.get("OPENAI_TPM_LIMIT", 90000))
+OPENAI_IMAGES_PER_MINUTE = int(os.environ.get("OPENAI_IMAGES_PER_MINUTE", 5))
+OPENAI_BULK_MAX_RETRIES = int(os.environ.get("OPENAI_BULK_MAX_RETRIES", 5))
+
+CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """Відро на capacity одиниць за хвилину, що поповнюється рівномірно.
+    Потокобезпечне; consume() блокує потік до появи місця."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = Lock()
+
+    def consume(self, amount):
+        # Запит, більший за все відро, чекає повного відра, а не вічно
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_requests_bucket = TokenBucket(OPENAI_RPM_LIMIT)
+_tokens_bucket = TokenBucket(OPENAI_TPM_LIMIT)
+_images_bucket = TokenBucket(OPENAI_IMAGES_PER_MINUTE)
+
+
+def estimate_tokens(messages, max_tokens=0):
+    """Наближена кількість токенів, яку запит займе в ліміті TPM."""
+    chars = sum(len(message.get("content") or "") for message in messages)
+    return chars // CHARS_PER_TOKEN + (max_tokens or 0)
+
+
+def limited_chat_completion(openai_client, **kwargs):
+    """chat.completions.create в межах лімітів процесу (і з більшою кількістю
+    повторів SDK). Підтримує ті самі аргументи, зокрема stream=True."""
+    _requests_bucket.consume(1)
+    _tokens_bucket.consume(estimate_tokens(kwargs.get("messages", ()), kwargs.get("max_tokens")))
+    client = openai_client.with_options(max_retries=OPENAI_BULK_MAX_RETRIES)
+    return client.chat.completions.create(**kwargs)
+
+
+def limited_image_generation(openai_client, **kwargs):
+    """images.generate в межах ліміту зображень процесу."""
+    _images_bucket.consume(kwargs.get("n") or 1)
+    client = openai_client.with_options(max_retries=OPENAI_BULK_MAX_RETRIES)
+    return client.images.generate(**kwargs)
@@ -0,0 +1,33 @@
+"""
+Пагінація адмін-списків без підзапиту в COUNT.
+
+query.paginate() з Flask-SQLAlchemy рахує загальну кількість через
+Query.count(), тобто SELECT count(*) FROM (<весь SELECT сторінки>) AS anon -
+з усіма колонками сутності в підзапиті. Для простих відфільтрованих
+списків (одна сутність, без DISTINCT/GROUP BY) достатньо
+SELECT count(*) FROM <таблиця> WHERE <ті самі умови>.
+"""
+from flask_sqlalchemy.pagination import QueryPagination
+
+from extensions import db
+
+
+class CountPagination(QueryPagination):
+    """QueryPagination з прямим COUNT(*) по фільтрах запиту. Той самий
+    інтерфейс (items/page/pages/has_next/...), тож шаблони не змінюються."""
+
+    def _query_count(self):
+        query = self._query_args["query"]
+        entity = query.column_descriptions[0]["entity"]
+        return (
+            query.order_by(None)
+            .with_entities(db.func.count())
+            .select_from(entity)
+            .scalar()
+        )
+
+
+def fast_paginate(query, page, per_page):
+    """Замінник query.paginate(page=..., per_page=..., error_out=False) для
+    запитів по одній сутності без DISTINCT/GROUP BY."""
+    return CountPagination(query=query, page=page, per_page=per_page, error_out=False)
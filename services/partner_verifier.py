@@ -4,6 +4,7 @@
 Розраховує загальний reliability score та створює алерти
 """
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from enum import Enum
@@ -165,11 +166,24 @@ class PartnerVerifier:
             is_german = True
         
         result["is_german"] = is_german
+
+        # Три зовнішні перевірки (VIES, WHOIS, Handelsregister) незалежні і
+        # майже весь час чекають на мережу - запускаємо їх одночасно, тож
+        # перевірка компанії триває як найповільніша з них, а не їх сума.
+        # Результати (і винятки - через future.result()) розбираємо нижче
+        # в тому ж порядку, що й раніше, тож алерти/скоринг не змінюються.
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="partner-verify") as executor:
+            vat_future = executor.submit(self.verify_vat, vat_number) if vat_number else None
+            whois_future = executor.submit(self.verify_domain, domain) if domain else None
+            hr_future = (
+                executor.submit(self.verify_handelsregister, company_name, hr_number, city)
+                if is_german else None
+            )
         
         # === VAT верифікація ===
         if vat_number:
             try:
-                vat_result = self.verify_vat(vat_number)
+                vat_result = vat_future.result()
                 result["vat_result"] = vat_result
                 
                 if vat_result.get("valid"):
@@ -212,7 +226,7 @@ class PartnerVerifier:
         # === WHOIS верифікація ===
         if domain:
             try:
-                whois_result = self.verify_domain(domain)
+                whois_result = whois_future.result()
                 result["whois_result"] = whois_result
                 
                 if whois_result.get("valid"):
@@ -269,11 +283,7 @@ class PartnerVerifier:
         # === Handelsregister (тільки для Німеччини) ===
         if is_german:
             try:
-                hr_result = self.verify_handelsregister(
-                    company_name, 
-                    hr_number, 
-                    city
-                )
+                hr_result = hr_future.result()
                 result["hr_result"] = hr_result
                 
                 if hr_result.get("valid"):
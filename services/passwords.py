@@ -0,0 +1,62 @@
+"""
+Хешування паролів користувачів і адміністратора магазину.
+
+Типовий generate_password_hash() з Werkzeug 3 - scrypt з параметрами, які
+ніхто в проєкті явно не обирав (і які змінюються між версіями Werkzeug).
+Тут параметри зафіксовані явно: argon2id (argon2-cffi) з бюджетом
+~50-150 мс на перевірку - стійкий до GPU-перебору і при цьому не з'їдає
+CPU воркера на кожному вході. Якщо argon2-cffi не встановлено, лишаємось
+на Werkzeug, як і раніше.
+
+Старі хеші (pbkdf2/scrypt з Werkzeug) продовжують перевірятися; після
+успішного входу User.check_password() перехешовує пароль у поточний
+формат (needs_rehash), тож база мігрує поступово, без скидання паролів.
+"""
+from werkzeug.security import generate_password_hash, check_password_hash
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    ARGON2_AVAILABLE = True
+except ImportError:
+    ARGON2_AVAILABLE = False
+
+ARGON2_PREFIX = "$argon2"
+
+if ARGON2_AVAILABLE:
+    _argon2 = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=2)
+else:
+    _argon2 = None
+
+
+def hash_password(password):
+    """Хеш пароля в поточному форматі (argon2id, якщо доступний)."""
+    if _argon2 is not None:
+        return _argon2.hash(password)
+    return generate_password_hash(password)
+
+
+def verify_password(stored_hash, password):
+    """Перевіряє пароль проти хешу будь-якого підтримуваного формату."""
+    if not stored_hash or password is None:
+        return False
+    if stored_hash.startswith(ARGON2_PREFIX):
+        if _argon2 is None:
+            return False
+        try:
+            return _argon2.verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(stored_hash, password)
+
+
+def needs_rehash(stored_hash):
+    """True, якщо хеш варто перерахувати в поточний формат/параметри."""
+    if _argon2 is None or not stored_hash:
+        return False
+    if not stored_hash.startswith(ARGON2_PREFIX):
+        return True
+    try:
+        return _argon2.check_needs_rehash(stored_hash)
+    except InvalidHashError:
+        return True
@@ -1,11 +1,73 @@
 """
 Сервіс для перевірки VAT номерів через VIES API (EU)
 """
+import copy
+import json
+import logging
+import os
 import re
+import time
 import requests
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Кеш результатів VIES. VIES повільний і має ліміти, а один і той самий
+# номер перевіряється кілька разів поспіль (AJAX на blur, потім submit,
+# потім фонова перевірка після реєстрації). Дійсні номери кешуємо на добу,
+# остаточно недійсні - на 5 хвилин (щоб виправлена одруківка швидко
+# перевірялась заново); таймаути/5xx VIES не кешуємо взагалі.
+VAT_CACHE_TTL_VALID = 24 * 60 * 60
+VAT_CACHE_TTL_INVALID = 5 * 60
+_VAT_CACHE_PREFIX = "vat:"
+
+# Redis спільний для всіх gunicorn-воркерів; без REDIS_URL (локально,
+# тести) - кеш у пам'яті процесу, як і в limiter (extensions.py).
+_redis_url = os.environ.get("REDIS_URL", "")
+_redis_client = redis.Redis.from_url(_redis_url) if (REDIS_AVAILABLE and _redis_url) else None
+_memory_cache: Dict[str, tuple] = {}
+_MEMORY_CACHE_MAX = 1024
+
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    if _redis_client is not None:
+        try:
+            cached = _redis_client.get(key)
+        except redis.RedisError as e:
+            logger.warning("VAT cache read failed: %s", e)
+            return None
+        return json.loads(cached) if cached else None
+
+    entry = _memory_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, result = entry
+    if expires_at < time.monotonic():
+        _memory_cache.pop(key, None)
+        return None
+    # Копія - щоб виклики не ділили (і не змінювали) один закешований dict
+    return copy.deepcopy(result)
+
+
+def _cache_set(key: str, result: Dict[str, Any], ttl: int) -> None:
+    if _redis_client is not None:
+        try:
+            _redis_client.setex(key, ttl, json.dumps(result))
+        except redis.RedisError as e:
+            logger.warning("VAT cache write failed: %s", e)
+        return
+
+    if len(_memory_cache) >= _MEMORY_CACHE_MAX:
+        _memory_cache.clear()
+    _memory_cache[key] = (time.monotonic() + ttl, copy.deepcopy(result))
+
 
 class VATChecker:
     """Перевірка VAT номерів через VIES (EU) API."""
@@ -133,7 +195,17 @@ class VATChecker:
         # Якщо номер починається з коду країни - прибираємо
         if vat.upper().startswith(country):
             vat = vat[len(country):]
-        
+
+        cache_key = f"{_VAT_CACHE_PREFIX}{country}{vat.upper()}"
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            # Дата - цієї перевірки, а не тієї, що потрапила в кеш
+            cached["request_date"] = result["request_date"]
+            self.last_check_result = cached
+            return cached
+
+        # TTL лише для остаточних відповідей VIES; None - не кешувати
+        cache_ttl = None
         try:
             # Запит до VIES API
             url = self.VIES_API_URL.format(country=country, vat_number=vat)
@@ -146,13 +218,18 @@ class VATChecker:
                 result["name"] = data.get("name")
                 result["address"] = data.get("address")
                 
-                if not result["valid"]:
+                if result["valid"]:
+                    cache_ttl = VAT_CACHE_TTL_VALID
+                else:
                     result["error"] = "VAT номер недійсний"
+                    cache_ttl = VAT_CACHE_TTL_INVALID
                     
             elif response.status_code == 400:
                 result["error"] = "Невірний формат VAT номера"
+                cache_ttl = VAT_CACHE_TTL_INVALID
             elif response.status_code == 404:
                 result["error"] = "VAT номер не знайдено"
+                cache_ttl = VAT_CACHE_TTL_INVALID
             else:
                 result["error"] = f"Помилка VIES API: {response.status_code}"
                 
@@ -162,7 +239,9 @@ class VATChecker:
             result["error"] = f"Помилка з'єднання: {str(e)}"
         except Exception as e:
             result["error"] = f"Невідома помилка: {str(e)}"
-        
+
+        if cache_ttl:
+            _cache_set(cache_key, result, cache_ttl)
         self.last_check_result = result
         return result
     
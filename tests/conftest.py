@@ -27,6 +27,7 @@ os.environ["MAIL_USERNAME"] = ""
 os.environ["BASE_DOMAIN"] = ""
 os.environ["DEMO_MODE"] = "false"
 os.environ["DISABLE_SCHEDULER"] = "1"
+os.environ["DISABLE_CACHE_LISTENER"] = "1"
 os.environ.setdefault("ADMIN_USERNAME", "admin")
 os.environ.setdefault("ADMIN_PASSWORD", "admin123")
 
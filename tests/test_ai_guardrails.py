@@ -5,7 +5,7 @@ AI-продавець - продуктова "фішка" платформи (б
 platform floor (AI Act прозорість, anti-prompt-injection, заборона
 розкривати чужі дані/видумувати обіцянки) завжди присутній і йде першим.
 """
-from services.ai_guardrails import build_chat_system_prompt, contains_prompt_leak, PLATFORM_FLOOR
+from services.ai_guardrails import build_chat_rules, build_chat_system_prompt, contains_prompt_leak, PLATFORM_FLOOR
 
 
 class _FakeAISettings:
@@ -65,3 +65,25 @@ def test_leak_detector_does_not_flag_normal_reply():
     prompt = build_chat_system_prompt(settings, "Каталог товарів:\n- Widget: 9.99 EUR")
     normal_reply = "We have the Widget in stock for 9.99 EUR. Would you like to order it?"
     assert contains_prompt_leak(normal_reply, prompt) is False
+
+
+def test_catalog_is_last_so_stable_prefix_can_be_cached():
+    """Каталог - найбільша і найчастіше змінювана частина промпту, тому він
+    іде останнім: усе до нього (floor, інструкції власника, підказка про
+    інструменти) - стабільний префікс для prompt caching OpenAI."""
+    settings = _FakeAISettings(system_prompt="Be nice.")
+    catalog = "Каталог товарів:\n- Widget: 9.99 EUR"
+    prompt = build_chat_system_prompt(settings, catalog)
+    assert prompt.endswith(catalog)
+    assert prompt.index("lookup_order_status") < prompt.index(catalog)
+    assert build_chat_system_prompt(settings, "") in prompt
+
+
+def test_precomputed_rules_give_same_prompt_as_fresh_build():
+    """routes/ai.py кешує build_chat_rules() між повідомленнями чату -
+    промпт із закешованими правилами має бути байт-у-байт тим самим."""
+    settings = _FakeAISettings(system_prompt="Be nice.", forbidden_topics="politics")
+    catalog = "Каталог товарів:\n- Widget: 9.99 EUR"
+    rules = build_chat_rules(settings)
+    assert build_chat_system_prompt(settings, catalog, rules=rules) == build_chat_system_prompt(settings, catalog)
+    assert build_chat_system_prompt(settings, catalog).startswith(rules)
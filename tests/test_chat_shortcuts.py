@@ -0,0 +1,37 @@
+"""
+Короткі шляхи чат-бота (services/chat_shortcuts.py): привітання отримують
+шаблонну відповідь без виклику OpenAI, а все інше - ні. Важливо, щоб
+класифікатор не "ковтав" справжні питання, які лише починаються з привітання.
+"""
+from services.chat_shortcuts import GREETING_REPLIES, canned_reply, message_cache_key, normalize_message
+
+
+def test_normalize_collapses_case_whitespace_and_trailing_punctuation():
+    assert normalize_message("  Привіт!!! ") == "привіт"
+    assert normalize_message("Good   Morning 👋") == "good morning"
+    assert len(normalize_message("a" * 1000)) == 256
+
+
+def test_cache_key_covers_the_whole_message():
+    prefix = "a" * 300
+    assert message_cache_key(prefix + " delivery?") != message_cache_key(prefix + " refund?")
+    assert message_cache_key("  Hello!! ") == message_cache_key("hello")
+
+
+def test_greetings_get_canned_reply_in_their_language():
+    assert canned_reply(normalize_message("Привіт!")) == GREETING_REPLIES["uk"]
+    assert canned_reply(normalize_message("Hello")) == GREETING_REPLIES["en"]
+    assert canned_reply(normalize_message("Guten Tag!")) == GREETING_REPLIES["de"]
+
+
+def test_real_questions_are_not_short_circuited():
+    assert canned_reply(normalize_message("Привіт, скільки коштує доставка?")) is None
+    assert canned_reply(normalize_message("hi, where is my order SM-2025-0001?")) is None
+    assert canned_reply(normalize_message("")) is None
+
+
+def test_canned_replies_disclose_ai():
+    """PLATFORM_FLOOR п.1 - бот не приховує, що він AI, навіть у шаблоні."""
+    assert "ШІ" in GREETING_REPLIES["uk"]
+    assert "AI" in GREETING_REPLIES["en"]
+    assert "KI" in GREETING_REPLIES["de"]
@@ -0,0 +1,34 @@
+"""
+services/passwords.py: нові паролі хешуються в поточному форматі (argon2id,
+якщо встановлено argon2-cffi), а старі Werkzeug-хеші (pbkdf2/scrypt), якими
+вже заповнена база, продовжують перевірятися і позначаються на перехешування.
+"""
+import pytest
+from werkzeug.security import generate_password_hash
+
+from services.passwords import ARGON2_AVAILABLE, hash_password, needs_rehash, verify_password
+
+
+def test_hash_roundtrip():
+    stored = hash_password("CorrectHorse1!")
+    assert verify_password(stored, "CorrectHorse1!") is True
+    assert verify_password(stored, "wrong-password") is False
+    assert needs_rehash(stored) is False
+
+
+def test_legacy_werkzeug_hash_still_verifies():
+    legacy = generate_password_hash("OldPass123!", method="pbkdf2:sha256")
+    assert verify_password(legacy, "OldPass123!") is True
+    assert verify_password(legacy, "nope") is False
+
+
+@pytest.mark.skipif(not ARGON2_AVAILABLE, reason="argon2-cffi не встановлено")
+def test_legacy_hash_is_flagged_for_rehash_to_argon2():
+    legacy = generate_password_hash("OldPass123!", method="pbkdf2:sha256")
+    assert needs_rehash(legacy) is True
+    assert hash_password("OldPass123!").startswith("$argon2id")
+
+
+def test_empty_hash_never_verifies():
+    assert verify_password(None, "anything") is False
+    assert verify_password("", "anything") is False
@@ -0,0 +1,64 @@
+"""Кеш результатів VIES у VATChecker: повторна перевірка того ж номера не
+ходить у мережу, а тимчасові збої VIES не кешуються."""
+import importlib
+
+from services.vat_checker import VATChecker
+
+# services/__init__.py реекспортує екземпляр vat_checker під тим самим
+# ім'ям, тож `from services import vat_checker` дав би не модуль
+vat_module = importlib.import_module("services.vat_checker")
+
+
+class _FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+
+    def json(self):
+        return self._payload
+
+
+def _patch_vies(monkeypatch, response):
+    calls = []
+
+    def fake_get(url, timeout):
+        calls.append(url)
+        return response
+
+    monkeypatch.setattr(vat_module, "_memory_cache", {})
+    monkeypatch.setattr(vat_module.requests, "get", fake_get)
+    return calls
+
+
+def test_valid_result_served_from_cache(monkeypatch):
+    calls = _patch_vies(monkeypatch, _FakeResponse(200, {"isValid": True, "name": "ACME GmbH"}))
+    checker = VATChecker()
+
+    first = checker.check_vat("DE", "123456789")
+    second = checker.check_vat("de", "DE 123 456 789")
+
+    assert first["valid"] is True
+    assert second["name"] == first["name"] == "ACME GmbH"
+    assert second is not first
+    assert len(calls) == 1
+
+
+def test_cached_result_is_a_copy(monkeypatch):
+    _patch_vies(monkeypatch, _FakeResponse(200, {"isValid": True, "name": "ACME GmbH"}))
+    checker = VATChecker()
+
+    first = checker.check_vat("DE", "123456789")
+    first["name"] = "changed by caller"
+    second = checker.check_vat("DE", "123456789")
+
+    assert second["name"] == "ACME GmbH"
+
+
+def test_vies_outage_is_not_cached(monkeypatch):
+    calls = _patch_vies(monkeypatch, _FakeResponse(503))
+    checker = VATChecker()
+
+    checker.check_vat("DE", "123456789")
+    checker.check_vat("DE", "123456789")
+
+    assert len(calls) == 2